@@ -1,8 +1,7 @@
 from rest_framework import serializers
 
 from src.apps.assignments.models import Task
-from src.apps.grades.models import Grade
-from src.apps.submissions.models import Answer
+from src.apps.courses.service.reassign import delete_answers
 from src.apps.users.models import User
 
 
@@ -24,7 +23,6 @@ class ReassignTaskToUserSerializer(serializers.Serializer):
         if not task:
             raise serializers.ValidationError(f"Task not found with id {task_id}")
 
-        Grade.objects.filter(answer__task=task, answer__user=user).delete()
-        Answer.objects.filter(task=task_id, user=user).delete()
+        delete_answers(task_id=task.pk, user_ids=[user.pk])
 
         return attrs
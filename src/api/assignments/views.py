@@ -20,7 +20,7 @@ from src.apps.assignments.filters import TaskFilter
 from src.apps.assignments.models import Task
 from src.apps.common.permissions import IsAdmin, IsAdminOrTeacher, IsEnrolledToCourse
 from src.apps.courses.models import CourseEnrollment
-from src.apps.grades.models import Grade
+from src.apps.courses.service.reassign import reassign
 from src.apps.submissions.models import Answer
 
 logger = logging.getLogger(__name__)
@@ -156,12 +156,16 @@ class TaskModelViewSet(viewsets.ModelViewSet):
     @method_decorator(transaction.atomic)
     def reassign_to_all(self, request, pk=None):
         task: Task = self.get_object()
-        Grade.objects.filter(answer__task=task).delete()
-        Answer.objects.filter(task=task).delete()
+        queued = reassign(task_id=task.pk)
         logger.info(
             f"tasks.reassign_to_all: Request user with {request.user.pk} "
-            f"reassigned task with id {task.pk} to all users"
+            f"reassigned task with id {task.pk} to all users. queued: {queued}"
         )
+        if queued:
+            return Response(
+                {"detail": f"Reassignment of task {task.name} to all users started"},
+                status=status.HTTP_202_ACCEPTED,
+            )
         return Response({"detail": f"Task {task.name} has been reassigned to all users"})
 
     @action(methods=["get"], detail=True, url_path="my-answer")
@@ -1,5 +1,8 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
@@ -7,15 +10,35 @@ from django.db.models import Q
 
 from src.api.chat.serializers import MessageReadSerializer
 from src.apps.chat.models import ChatRoom, Message
+from src.apps.chat.service import presence
+from src.apps.chat.service.messages import ChatRoomClosed, post_message
+from src.apps.chat.service.rooms import mark_read
+from src.apps.common.pagination import KeysetPagination
 
+from .presence import PresenceConsumerMixin
 
-class ChatConsumer(AsyncWebsocketConsumer):
+
+class ChatConsumer(PresenceConsumerMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time chat functionality.
     Each connection joins a specific chat room.
     """
 
+    history_page_size = 30
+    # messages sent on connect
+    recent_messages_limit = 20
+    # Typing indicators: only start/stop transitions reach the channel layer.
+    # "typing" expires after ``typing_timeout`` seconds without a typing frame,
+    # and a stop is held back for ``typing_debounce`` seconds so that a
+    # stop/start flap between keystrokes is never broadcast.
+    typing_timeout = 5.0
+    typing_debounce = 1.0
+
     async def connect(self):
+        self.is_typing = False
+        self._typing_deadline = 0.0
+        self._typing_timer = None
+
         self.chat_room_id = self.scope["url_route"]["kwargs"]["chat_room_id"]
         self.user = self.scope.get("user")
 
@@ -32,10 +55,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_group_name = f"chat_room_{self.chat_room_id}"
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
-        await self.send_recent_messages()
+        await self.join_presence()
+        await self.send_presence()
+        await self.send_initial_history()
 
     async def disconnect(self, code):
         if hasattr(self, "room_group_name"):
+            await self.stop_typing()
+            await self.leave_presence()
             await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data=None, bytes_data=None):
@@ -50,6 +77,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.handle_mark_as_read(data)
             elif message_type == "typing":
                 await self.handle_typing(data)
+            elif message_type == "load_history":
+                await self.handle_load_history(data)
         except json.JSONDecodeError:
             await self.send_error("Invalid JSON format")
         except Exception as e:
@@ -62,28 +91,86 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.send_error("Invalid message. Message content can't be empty")
             return
 
-        message = await self.create_message(content)
-        if message:
+        event = await self.create_message(content)
+        if event:
+            await self.stop_typing()
             # Send to all users in the room
+            await self.channel_layer.group_send(self.room_group_name, event)
+
+    async def handle_mark_as_read(self, data):
+        """
+        Move the reader's cursor up to ``message_id`` (everything up to the
+        newest message when omitted) and broadcast the new cursor.
+        """
+        last_read_id = await self.mark_as_read_up_to(data.get("message_id"))
+        if last_read_id is not None:
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {"type": "chat_message", "message_id": message.id, "sender_id": message.sender.id},
+                {
+                    "type": "message_read",
+                    "last_read_message_id": last_read_id,
+                    "read_by": self.user.id,
+                },
             )
 
-    async def handle_mark_as_read(self, data):
-        message_id = data.get("message_id")
-        if message_id:
-            success = await self.mark_message_as_read(message_id)
-            if success:
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {"type": "message_read", "message_id": message_id, "read_by": self.user.id},
-                )
+    async def handle_load_history(self, data):
+        """
+        Send one page of older messages in a single frame, oldest first.
+        ``cursor`` is the ``next_cursor`` of the previous page (omit it for
+        the newest page).
+        """
+        messages, next_cursor = await self.get_history_page(data.get("cursor"), data.get("limit"))
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "history",
+                    "messages": [
+                        MessageReadSerializer.personalize(message, self.user.id)
+                        for message in messages
+                    ],
+                    "next_cursor": next_cursor,
+                }
+            )
+        )
 
     async def handle_typing(self, data):
-        """Handle typing indicator"""
-        is_typing = data.get("is_typing", False)
+        """
+        Handle typing indicator. Repeated frames only push the expiry back;
+        the room hears about start and stop once each.
+        """
+        now = asyncio.get_running_loop().time()
+        if data.get("is_typing", False):
+            self._typing_deadline = now + self.typing_timeout
+            if not self.is_typing:
+                self.is_typing = True
+                await self.broadcast_typing(True)
+        elif self.is_typing:
+            self._typing_deadline = min(self._typing_deadline, now + self.typing_debounce)
+        else:
+            return
+
+        if self._typing_timer is None:
+            self._typing_timer = asyncio.create_task(self._expire_typing())
+
+    async def _expire_typing(self):
+        loop = asyncio.get_running_loop()
+        # the deadline moves while we sleep, so re-check instead of rescheduling
+        while (delay := self._typing_deadline - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        self._typing_timer = None
+        self.is_typing = False
+        await self.broadcast_typing(False)
+
+    async def stop_typing(self):
+        """Broadcast a stop right away (message sent, socket closed)."""
+        if self._typing_timer is not None:
+            self._typing_timer.cancel()
+            self._typing_timer = None
+        if self.is_typing:
+            self.is_typing = False
+            await self.broadcast_typing(False)
 
+    async def broadcast_typing(self, is_typing):
         await self.channel_layer.group_send(
             self.room_group_name,
             {
@@ -94,26 +181,47 @@ class ChatConsumer(AsyncWebsocketConsumer):
             },
         )
 
+    @staticmethod
+    def build_chat_event(message):
+        """Group event carrying the message serialized once by the sender."""
+        return {"type": "chat_message", "message": MessageReadSerializer.shared_data(message)}
+
     async def chat_message(self, event):
-        """Send chat message to WebSocket with proper context for current user"""
-        message = await self.get_message_by_id(event["message_id"])
-        if message:
-            # Serialize with current user context (same as REST API)
-            message_data = await self.serialize_message_for_user(message, self.user)
-            await self.send(text_data=json.dumps({"type": "message", "data": message_data}))
+        """Send chat message to WebSocket with the reader-dependent fields filled in"""
+        message_data = MessageReadSerializer.personalize(event["message"], self.user.id)
+        await self.send(text_data=json.dumps({"type": "message", "data": message_data}))
 
     async def message_read(self, event):
-        """Send message read notification to WebSocket"""
+        """Tell the sender that every message up to the cursor has been read"""
         if event["read_by"] != self.user.id:
             await self.send(
                 text_data=json.dumps(
                     {
                         "type": "message_read",
-                        "message_id": event["message_id"],
+                        "last_read_message_id": event["last_read_message_id"],
+                        # kept for clients that predate read cursors
+                        "message_id": event["last_read_message_id"],
                     }
                 )
             )
 
+    async def send_presence(self):
+        """Tell the client who of the room's participants is online right now"""
+        states = await sync_to_async(presence.lookup)(self.participant_ids)
+        await self.presence_changed(
+            {
+                "users": [
+                    {"user_id": user_id, "online": online} for user_id, online in states.items()
+                ]
+            }
+        )
+
+    async def presence_changed(self, event):
+        """Send the batched presence changes of the other participant to WebSocket"""
+        users = [user for user in event["users"] if user["user_id"] != self.user.id]
+        if users:
+            await self.send(text_data=json.dumps({"type": "presence", "users": users}))
+
     async def typing_status(self, event):
         """Send typing status to WebSocket"""
         if event["user_id"] != self.user.id:
@@ -130,88 +238,92 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def check_chat_room_access(self):
+        """Checked once per connection; the room is kept for the write path"""
         try:
-            ChatRoom.objects.get(
+            self.chat_room = ChatRoom.objects.get(
                 Q(teacher=self.user) | Q(student=self.user), id=self.chat_room_id, is_active=True
             )
-            return True
         except ChatRoom.DoesNotExist:
             return False
+        self.participant_ids = (self.chat_room.teacher_id, self.chat_room.student_id)
+        return True
 
     @database_sync_to_async
     def create_message(self, content):
-        """Create a new message in the database"""
+        """Create a new message in the database and return its broadcast event"""
         try:
-            chat_room = ChatRoom.objects.get(
-                Q(teacher=self.user) | Q(student=self.user), pk=self.chat_room_id, is_active=True
-            )
-            message = Message.objects.create(
-                chat_room=chat_room,
-                content=content,
-                sender=self.user,
-            )
-            chat_room.save(update_fields=["updated_at"])
-            return message
-        except ChatRoom.DoesNotExist:
+            message = post_message(self.chat_room, self.user, content)
+            return self.build_chat_event(message)
+        except ChatRoomClosed:
             return None
         except Exception as e:
             print(f"Error creating message: {e}")
             return None
 
     @database_sync_to_async
-    def get_message_by_id(self, message_id):
-        """Get message by ID"""
+    def mark_as_read_up_to(self, message_id=None):
+        """Move the read cursor; returns the new cursor or ``None`` if it did not move"""
         try:
-            return Message.objects.select_related("sender").get(id=message_id)
-        except Message.DoesNotExist:
+            chat_room = ChatRoom.objects.get(pk=self.chat_room_id)
+        except ChatRoom.DoesNotExist:
             return None
+        if message_id is not None:
+            # the cursor may only point at a message of this room
+            message_id = (
+                Message.objects.filter(pk=message_id, chat_room=chat_room)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if message_id is None:
+                return None
+        return mark_read(chat_room, self.user, message_id)
 
-    @database_sync_to_async
-    def serialize_message_for_user(self, message, user):
-        """Serialize message with user context (same as REST API)"""
-        from django.http import HttpRequest
-
-        # Create mock request for serializer context
-        request = HttpRequest()
-        request.user = user
-
-        serializer = MessageReadSerializer(message, context={"request": request})
-        return serializer.data
+    def _history(self):
+        return (
+            Message.objects.filter(chat_room_id=self.chat_room_id)
+            .select_related("sender__profile", "chat_room")
+            .prefetch_related("sender__groups")
+        )
 
     @database_sync_to_async
-    def mark_message_as_read(self, message_id):
-        """Mark a message as read"""
+    def get_history_page(self, cursor=None, limit=None):
+        """One keyset page over (created_at, id), newest first in the database."""
         try:
-            message = Message.objects.get(id=message_id, chat_room_id=self.chat_room_id)
-            # Only allow marking others' messages as read
-            if message.sender != self.user:
-                message.mark_as_read()
-                return True
-            return False
-        except Message.DoesNotExist:
-            return False
+            limit = int(limit) if limit else self.history_page_size
+        except (TypeError, ValueError):
+            limit = self.history_page_size
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        messages, next_cursor = paginator.paginate_forward(self._history(), cursor, limit)
+        # Return in chronological order
+        return [
+            MessageReadSerializer.shared_data(message) for message in reversed(messages)
+        ], next_cursor
 
     @database_sync_to_async
-    def get_recent_messages(self, limit=20):
-        """Get recent messages for the chat room"""
-        try:
-            chat_room = ChatRoom.objects.get(id=self.chat_room_id)
-            messages = (
-                Message.objects.filter(chat_room=chat_room)
-                .select_related("sender")
-                .order_by("-created_at")[:limit]
-            )
+    def get_recent_messages(self, limit=None):
+        """Get recent messages for the chat room, serialized in one thread hop"""
+        limit = limit or self.recent_messages_limit
+        messages = self._history().order_by("-created_at", "-id")[:limit]
+        # Return in chronological order
+        return [MessageReadSerializer.shared_data(message) for message in reversed(messages)]
 
-            # Return in chronological order
-            return list(reversed(messages))
-        except ChatRoom.DoesNotExist:
-            return []
+    async def send_initial_history(self):
+        """
+        Send the recent messages on connect, one ``message`` frame each.
+        Clients that connect with ``?history=page`` get them as a single
+        ``history`` frame with a ``next_cursor`` instead, the frame
+        ``load_history`` returns.
+        """
+        params = parse_qs(self.scope.get("query_string", b"").decode())
+        if params.get("history", [None])[0] == "page":
+            await self.handle_load_history({"limit": self.recent_messages_limit})
+        else:
+            await self.send_recent_messages()
 
     async def send_recent_messages(self):
         """Send recent messages when user connects"""
-        messages = await self.get_recent_messages()
-        for message in messages:
-            message_data = await self.serialize_message_for_user(message, self.user)
+        for data in await self.get_recent_messages():
+            message_data = MessageReadSerializer.personalize(data, self.user.id)
             await self.send(text_data=json.dumps({"type": "message", "data": message_data}))
 
     async def send_error(self, error_message):
@@ -0,0 +1,36 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from src.apps.chat.service import presence
+
+
+class PresenceConsumerMixin:
+    """
+    Keeps the connected user online for as long as the socket is open.
+    Call ``join_presence`` once the connection is accepted and
+    ``leave_presence`` from ``disconnect``.
+    """
+
+    heartbeat_interval = presence.HEARTBEAT_INTERVAL
+
+    async def join_presence(self):
+        backend = presence.get_backend()
+        if await sync_to_async(backend.connect)(self.scope["user"].id):
+            presence.get_broadcaster().push(self.scope["user"].id)
+        self._heartbeat = asyncio.create_task(self._keep_alive(backend))
+
+    async def leave_presence(self):
+        heartbeat = getattr(self, "_heartbeat", None)
+        if heartbeat is None:
+            return
+        heartbeat.cancel()
+        self._heartbeat = None
+        backend = presence.get_backend()
+        if await sync_to_async(backend.disconnect)(self.scope["user"].id):
+            presence.get_broadcaster().push(self.scope["user"].id)
+
+    async def _keep_alive(self, backend):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await sync_to_async(backend.touch)(self.scope["user"].id)
@@ -3,13 +3,17 @@ from .chat_room import (
     ChatRoomReadSerializer
 )
 from .message import (
+    ArchivedMessageReadSerializer,
     MessageReadSerializer,
+    MessageSearchHitSerializer,
     MessageWriteSerializer
 )
 
 __all__ = [
+    "ArchivedMessageReadSerializer",
     "ChatRoomWriteSerializer",
     "ChatRoomReadSerializer",
     "MessageReadSerializer",
+    "MessageSearchHitSerializer",
     "MessageWriteSerializer"
 ]
@@ -1,4 +1,3 @@
-from django.db.models import Q
 from rest_framework import serializers
 
 from src.api.chat.serializers.message.message_read_serializer import MessageReadSerializer
@@ -30,12 +29,18 @@ class ChatRoomReadSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_last_message(self, obj: ChatRoom):
-        last_message = obj.messages.last()
-        return MessageReadSerializer(last_message).data if last_message else None
+        last_message = obj.last_message
+        if last_message is None:
+            return None
+        # is_read reads the cursors of this room, don't load it again
+        last_message.chat_room = obj
+        return MessageReadSerializer(last_message).data
 
     def get_unread_count(self, obj: ChatRoom):
-        current_user = self.context["request"].user
-        return obj.messages.filter(~Q(sender=current_user), is_read=False).count()
+        # annotated by with_unread_count() in the views
+        if hasattr(obj, "unread_count"):
+            return obj.unread_count
+        return obj.unread_count_for(self.context["request"].user)
 
     def get_other_user(self, obj: ChatRoom):
         current_user = self.context["request"].user
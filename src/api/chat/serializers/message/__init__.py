@@ -1,4 +1,11 @@
+from .archived_message_read_serializer import ArchivedMessageReadSerializer
 from .message_write_serializer import MessageWriteSerializer
 from .message_read_serializer import MessageReadSerializer
+from .message_search_serializer import MessageSearchHitSerializer
 
-__all__ = ['MessageWriteSerializer', 'MessageReadSerializer']
\ No newline at end of file
+__all__ = [
+    'ArchivedMessageReadSerializer',
+    'MessageWriteSerializer',
+    'MessageReadSerializer',
+    'MessageSearchHitSerializer',
+]
\ No newline at end of file
@@ -0,0 +1,8 @@
+from src.apps.chat.models import ArchivedMessage
+
+from .message_read_serializer import MessageReadSerializer
+
+
+class ArchivedMessageReadSerializer(MessageReadSerializer):
+    class Meta(MessageReadSerializer.Meta):
+        model = ArchivedMessage
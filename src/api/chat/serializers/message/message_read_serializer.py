@@ -8,6 +8,8 @@ class MessageReadSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     is_my_message = serializers.SerializerMethodField()
     message_direction = serializers.SerializerMethodField()
+    # compared against the room's read cursor, so select_related("chat_room")
+    is_read = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Message
@@ -36,3 +38,20 @@ class MessageReadSerializer(serializers.ModelSerializer):
         if request and request.user:
             return "sent" if obj.sender_id == request.user.id else "received"
         return "unknown"
+
+    # Broadcasts: the message is serialized once by the sender and each
+    # listening socket only fills in the fields that depend on the reader.
+
+    @classmethod
+    def shared_data(cls, message):
+        """Reader-independent representation of ``message``."""
+        data = dict(cls(message).data)
+        data.pop("is_my_message", None)
+        data.pop("message_direction", None)
+        return data
+
+    @staticmethod
+    def personalize(data, user_id):
+        """Complete ``shared_data`` output for the reader ``user_id`` without DB access."""
+        mine = data["sender"]["id"] == user_id
+        return {**data, "is_my_message": mine, "message_direction": "sent" if mine else "received"}
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from src.apps.chat.service.search import render_snippet
+
+from .message_read_serializer import MessageReadSerializer
+
+
+class MessageSearchHitSerializer(MessageReadSerializer):
+    chat_room = serializers.IntegerField(source="chat_room_id", read_only=True)
+    snippet = serializers.SerializerMethodField()
+
+    class Meta(MessageReadSerializer.Meta):
+        fields = ["chat_room", "snippet", *MessageReadSerializer.Meta.fields]
+
+    def get_snippet(self, obj):
+        return render_snippet(obj, self.context["query"])
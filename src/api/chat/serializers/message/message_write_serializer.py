@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from src.apps.chat.models import Message
+from src.apps.chat.service.messages import ChatRoomClosed, post_message
 
 
 class MessageWriteSerializer(serializers.ModelSerializer):
@@ -9,6 +10,12 @@ class MessageWriteSerializer(serializers.ModelSerializer):
         fields = ["content", "file"]
 
     def create(self, validated_data):
-        validated_data["sender"] = self.context["request"].user
-        validated_data["chat_room"] = self.context["chat_room"]
-        return super().create(validated_data)
+        try:
+            return post_message(
+                self.context["chat_room"],
+                self.context["request"].user,
+                validated_data["content"],
+                validated_data.get("file"),
+            )
+        except ChatRoomClosed:
+            raise serializers.ValidationError("Chat room is not active.")
@@ -2,7 +2,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import ChatRoomModelViewSet, MessageModelViewSet
+from .views import ChatRoomModelViewSet, MessageModelViewSet, PresenceView
 
 router = DefaultRouter()
 router.register("rooms", ChatRoomModelViewSet, basename="chatroom")
@@ -16,6 +16,7 @@ urlpatterns = [
         MessageModelViewSet.as_view({"get": "list", "post": "create"}),
         name="room-messages",
     ),
+    path("presence/", PresenceView.as_view(), name="presence"),
 ]
 
 # This gives you:
@@ -24,3 +25,6 @@ urlpatterns = [
 # GET/POST /api/chat/messages/ - List/Create messages (with room filtering)
 # GET/PUT/DELETE /api/chat/messages/{id}/ - Message operations
 # GET/POST /api/chat/rooms/{room_id}/messages/ - Room-specific messages
+# GET /api/chat/rooms/{id}/archived_messages/ - History older than the hot window
+# GET /api/chat/messages/search/?q=... - Full-text search in the user's rooms
+# GET /api/chat/presence/?user_ids=1,2 - Online status of chat partners
@@ -1,23 +1,41 @@
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
-from src.apps.chat.models import ChatRoom, Message
+from src.apps.chat.models import ArchivedMessage, ChatRoom, Message
+from src.apps.chat.service import presence
+from src.apps.chat.service.rooms import mark_read, with_unread_count
+from src.apps.chat.service.search import MIN_QUERY_LENGTH, search_messages
+from src.apps.common.pagination import KeysetPagination, KeysetPaginationMixin
 
 from .serializers import (
+    ArchivedMessageReadSerializer,
     ChatRoomReadSerializer,
     ChatRoomWriteSerializer,
     MessageReadSerializer,
+    MessageSearchHitSerializer,
     MessageWriteSerializer,
 )
 
 
+class MessagePagination(KeysetPagination):
+    """Search hits and archived history are always paginated, newest first."""
+
+    page_size = 20
+
+    @classmethod
+    def is_requested(cls, request):
+        return True
+
+
 @extend_schema(tags=["Chat Rooms"])
-class ChatRoomModelViewSet(ModelViewSet):
+class ChatRoomModelViewSet(KeysetPaginationMixin, ModelViewSet):
     """
     ViewSet for managing chat rooms.
     Only shows chat rooms where current user is either teacher or student.
@@ -25,10 +43,16 @@ class ChatRoomModelViewSet(ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        rooms = ChatRoom.objects.filter(Q(teacher=user) | Q(student=user))
         return (
-            ChatRoom.objects.filter(Q(teacher=user) | Q(student=user))
-            .select_related("student", "teacher", "course")
-            .prefetch_related("messages")
+            with_unread_count(rooms, user)
+            .select_related(
+                "student__profile",
+                "teacher__profile",
+                "course",
+                "last_message__sender__profile",
+            )
+            .prefetch_related("student__groups", "teacher__groups", "last_message__sender__groups")
         )
 
     def get_serializer_class(self):
@@ -38,6 +62,10 @@ class ChatRoomModelViewSet(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset().order_by("-updated_at")
+        page = self.paginate_keyset(queryset, ordering=("-updated_at", "-id"))
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -62,16 +90,65 @@ class ChatRoomModelViewSet(ModelViewSet):
 
     @action(detail=True, methods=["post"])
     def mark_as_read(self, request, pk=None):
+        """
+        Mark the room read up to ``message_id`` (the last message by default).
+        The read cursor only moves forward.
+        """
         chat_room = get_object_or_404(self.get_queryset(), pk=pk)
 
-        unread_messages = chat_room.messages.filter(~Q(sender=request.user), is_read=False)
-        unread_messages.update(is_read=True)
-        return Response({"message": f"Marked {unread_messages.count()} messages as read."})
+        message_id = request.data.get("message_id")
+        if message_id is not None:
+            # the cursor may only point at a message of this room
+            try:
+                message_id = (
+                    Message.objects.filter(pk=int(message_id), chat_room=chat_room)
+                    .values_list("pk", flat=True)
+                    .first()
+                )
+            except (TypeError, ValueError):
+                message_id = None
+            if message_id is None:
+                raise ValidationError({"message_id": "No such message in this chat room."})
+
+        mark_read(chat_room, request.user, message_id)
+        return Response(
+            {
+                "message": "Marked messages as read.",
+                "last_read_message_id": chat_room.last_read_id_for(request.user.pk),
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("cursor", str, description="`next` cursor of the previous page"),
+            OpenApiParameter("page_size", int),
+        ],
+        responses=ArchivedMessageReadSerializer(many=True),
+    )
+    @action(detail=True, methods=["get"])
+    def archived_messages(self, request, pk=None):
+        """
+        Messages older than the hot window (see ``archive_chat_messages``),
+        newest first, one keyset page at a time.
+        """
+        chat_room = get_object_or_404(self.get_queryset(), pk=pk)
+        queryset = (
+            ArchivedMessage.objects.filter(chat_room=chat_room)
+            .select_related("sender__profile")
+            .prefetch_related("sender__groups")
+        )
+        paginator = MessagePagination(ordering=MessageModelViewSet.history_ordering)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        for message in page:
+            message.chat_room = chat_room
+        serializer = ArchivedMessageReadSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 @extend_schema(tags=["Chat Messages"])
-class MessageModelViewSet(ModelViewSet):
+class MessageModelViewSet(KeysetPaginationMixin, ModelViewSet):
     serializer_class = MessageReadSerializer
+    history_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
@@ -81,7 +158,7 @@ class MessageModelViewSet(ModelViewSet):
 
         base_queryset = Message.objects.filter(
             Q(chat_room__teacher=user) | Q(chat_room__student=user)
-        ).select_related("sender", "chat_room")
+        ).select_related("sender__profile", "chat_room")
 
         if room_id:
             base_queryset = base_queryset.filter(chat_room_id=room_id)
@@ -93,6 +170,47 @@ class MessageModelViewSet(ModelViewSet):
             return MessageWriteSerializer
         return MessageReadSerializer
 
+    def list(self, request, *args, **kwargs):
+        """
+        With ``?pagination=cursor`` returns the newest messages first, one
+        keyset page at a time; ``next`` loads older messages.
+        """
+        queryset = self.get_queryset().prefetch_related("sender__groups")
+        page = self.paginate_keyset(queryset, ordering=self.history_ordering)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Search terms"),
+            OpenApiParameter("room_id", int, description="Only search this room"),
+            OpenApiParameter("cursor", str, description="`next` cursor of the previous page"),
+            OpenApiParameter("page_size", int),
+        ],
+        responses=MessageSearchHitSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request, *args, **kwargs):
+        """
+        Full-text search over the messages of the current user's rooms.
+        Hits come newest first, one keyset page at a time, with a snippet in
+        which the matches are wrapped in ``<mark>``.
+        """
+        query = request.query_params.get("q", "").strip()
+        if len(query) < MIN_QUERY_LENGTH:
+            raise ValidationError({"q": f"Enter at least {MIN_QUERY_LENGTH} characters."})
+
+        queryset = search_messages(self.get_queryset(), query).prefetch_related("sender__groups")
+        paginator = MessagePagination(ordering=self.history_ordering)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = MessageSearchHitSerializer(
+            page, many=True, context={**self.get_serializer_context(), "query": query}
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
 
@@ -123,11 +241,49 @@ class MessageModelViewSet(ModelViewSet):
                 {"error": "Invalid chat room or no access"}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        # one INSERT plus one UPDATE of the room, see src.apps.chat.service.messages
         message = serializer.save()
 
-        # Update chat room's updated_at timestamp
-        message.chat_room.save(update_fields=["updated_at"])
-
         # Return the created message with full details
         response_serializer = MessageReadSerializer(message)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=["Chat Presence"],
+    parameters=[
+        OpenApiParameter(
+            "user_ids", str, required=True, description="Comma separated user ids, at most 100"
+        )
+    ],
+)
+class PresenceView(APIView):
+    """
+    Online status of the given users. Only the current user and their chat
+    partners are reported; other ids are left out.
+    """
+
+    max_user_ids = 100
+
+    def get(self, request):
+        try:
+            user_ids = {
+                int(value) for value in request.query_params.get("user_ids", "").split(",") if value
+            }
+        except ValueError:
+            raise ValidationError({"user_ids": "Expected comma separated integers."})
+        if len(user_ids) > self.max_user_ids:
+            raise ValidationError({"user_ids": f"At most {self.max_user_ids} ids are allowed."})
+
+        user = request.user
+        partners = ChatRoom.objects.filter(
+            Q(teacher=user, student_id__in=user_ids) | Q(student=user, teacher_id__in=user_ids)
+        ).values_list("teacher_id", "student_id")
+        visible = {user.pk} & user_ids
+        for teacher_id, student_id in partners:
+            visible.update((teacher_id, student_id))
+
+        states = presence.lookup(sorted(visible))
+        return Response(
+            [{"user_id": user_id, "online": online} for user_id, online in states.items()]
+        )
@@ -17,6 +17,4 @@ class CourseGroupReadLightSerializer(serializers.ModelSerializer):
 
     def get_members_count(self, obj: CourseGroup):
         """Get number of members"""
-        if hasattr(obj, "members_count"):
-            return obj.members_count
-        return obj.members.count()
+        return obj.members_count
@@ -62,36 +62,12 @@ class CourseGroupReadSerializer(serializers.ModelSerializer):
             return f"Expires at {obj.token_expires_at.strftime('%Y-%m-%d %H:%M')}"
         return "No expiration set"
 
-    def get_members_count(self, obj):
-        # 1) if annotated on the group instance
-        mc = getattr(obj, "members_count", None)
-        if mc is not None:
-            return mc
+    def get_members_count(self, obj: CourseGroup):
+        # stored counter, kept in sync by src.apps.courses.service.counters
+        return obj.members_count
 
-        # 2) check serializer context map prepared in the view
-        group_counts = self.context.get("group_counts") or {}
-        g = group_counts.get(getattr(obj, "id", None))
-        if g and "members_count" in g:
-            return g["members_count"]
-
-        # 3) fallback (rare): compute directly (one query)
-        from src.apps.courses.models.groups.course_enrollment import CourseEnrollment
-
-        return CourseEnrollment.objects.filter(group=obj).count()
-
-    def get_students_count(self, obj):
-        sc = getattr(obj, "students_count", None)
-        if sc is not None:
-            return sc
-
-        group_counts = self.context.get("group_counts") or {}
-        g = group_counts.get(getattr(obj, "id", None))
-        if g and "students_count" in g:
-            return g["students_count"]
-
-        from src.apps.courses.models.groups.course_enrollment import CourseEnrollment
-
-        return CourseEnrollment.objects.filter(group=obj, role="student").count()
+    def get_students_count(self, obj: CourseGroup):
+        return obj.students_count
 
     # def get_members_count(self, obj: CourseGroup):
     #     """Get number of members"""
@@ -107,8 +83,13 @@ class CourseGroupReadSerializer(serializers.ModelSerializer):
     def get_teachers(self, obj: CourseGroup):
         from src.api.users.serializers.users.users_list_serializer import UserListSerializer
 
-        qs = obj.teachers  # property from model
-        return UserListSerializer(qs, many=True, context=self.context).data
+        enrollments = getattr(obj, "teacher_enrollments", None)
+        if enrollments is not None:
+            # batched by CourseGroup.objects.with_teachers() / teachers_prefetch()
+            teachers = [enrollment.user for enrollment in enrollments]
+        else:
+            teachers = obj.teachers  # fallback: one query per group
+        return UserListSerializer(teachers, many=True, context=self.context).data
 
     @staticmethod
     def get_user_group_names(user):
@@ -1,8 +1,6 @@
-from django.db import transaction
 from rest_framework import serializers
 
-from src.apps.courses.models import CourseEnrollment
-from src.apps.users.models import User
+from src.apps.courses.service.enrollments import StudentsLimitExceeded, enroll_students
 
 
 class AddStudentsSerializer(serializers.Serializer):
@@ -20,41 +18,22 @@ class AddStudentsSerializer(serializers.Serializer):
         if not user.groups.filter(name="Admins").exists():
             raise serializers.ValidationError("Permission denied")
 
-        limit = getattr(group, "limit", None) or getattr(group, "students_limit", None)
-        if limit is not None:
-            current_students = group.members.filter(role="student").count()
-            if current_students + len(data["user_ids"]) > limit:
-                raise serializers.ValidationError(
-                    {"user_ids": f"Too many students, maximum limit is {limit}"}
-                )
-
         # optionally dedupe user_ids
         data["user_ids"] = list(dict.fromkeys(data["user_ids"]))
         return data
 
     def save(self):
-        """Creates/updates CourseEnrollment entries for provided user_ids.
-        Returns: {"created": <QuerySet of CourseEnrollment>, "errors": [..]}
+        """Enrolls/moves the provided user_ids into the group in bulk.
+        Returns: {"created": <QuerySet of CourseEnrollment>, "errors": [..], "report": [..]}
         """
         group = self.context["group"]
-        created_ids = []
-        errors = []
-
-        with transaction.atomic():
-            for uid in self.validated_data["user_ids"]:
-                try:
-                    u = User.objects.get(pk=uid)
-                except User.DoesNotExist:
-                    errors.append({"user_id": uid, "error": "not found"})
-                    continue
-                # TODO -> check update_or_create method from project managers,
-                #  do we need to update enrolled, if user enrolled for than one group?
-                enrollment, _ = CourseEnrollment.objects.update_or_create(
-                    user=u,
-                    course=group.course,
-                    defaults={"group": group, "role": "student"},
-                )
-                created_ids.append(enrollment.id)
-
-        enrollments = CourseEnrollment.objects.filter(id__in=created_ids).select_related("user")
-        return {"created": enrollments, "errors": errors}
+        try:
+            result = enroll_students(group, self.validated_data["user_ids"])
+        except StudentsLimitExceeded as exc:
+            raise serializers.ValidationError({"user_ids": str(exc)})
+
+        return {
+            "created": result["enrollments"],
+            "errors": result["errors"],
+            "report": result["report"],
+        }
@@ -1,7 +1,6 @@
-from django.db import transaction
 from rest_framework import serializers
 
-from src.apps.courses.models import CourseEnrollment
+from src.apps.courses.service.enrollments import unenroll_students
 
 
 class RemoveStudentsSerializer(serializers.Serializer):
@@ -28,16 +27,6 @@ class RemoveStudentsSerializer(serializers.Serializer):
 
     def save(self):
         group = self.context["group"]
-        removed = []
-        errors = []
-
-        with transaction.atomic():
-            for uid in self.validated_data["user_ids"]:
-                try:
-                    enrollment = CourseEnrollment.objects.get(user_id=uid, course=group.course)
-                    enrollment.delete()
-                    removed.append(uid)
-                except CourseEnrollment.DoesNotExist:
-                    errors.append({"user_id": uid, "error": "enrollment not found"})
-
-        return {"removed": removed, "errors": errors}
+        result = unenroll_students(group, self.validated_data["user_ids"])
+        removed = [row["user_id"] for row in result["report"] if row["status"] == "removed"]
+        return {"removed": removed, "errors": result["errors"], "report": result["report"]}
@@ -1,8 +1,7 @@
-from django.db import transaction
 from rest_framework import serializers
 
-from src.apps.courses.models import CourseEnrollment, CourseGroup
-from src.apps.users.models import User
+from src.apps.courses.models import CourseGroup
+from src.apps.courses.service.enrollments import enroll_teachers
 
 
 class AddTeachersSerializer(serializers.Serializer):
@@ -20,22 +19,9 @@ class AddTeachersSerializer(serializers.Serializer):
 
     def save(self):
         group: CourseGroup = self.context["group"]
-        created = []
-        errors = []
-        with transaction.atomic():
-            for uid in self.validated_data["user_ids"]:
-                try:
-                    u = User.objects.get(pk=uid)
-                except User.DoesNotExist:
-                    errors.append({"user_id": uid, "error": "not found"})
-                    continue
-                # one teacher enrollment per group
-                obj, _ = CourseEnrollment.objects.update_or_create(
-                    user=u,
-                    group=group,
-                    role="teacher",
-                    defaults={"course": group.course},
-                )
-                created.append(obj.id)
-        qs = CourseEnrollment.objects.filter(id__in=created).select_related("user")
-        return {"created": qs, "errors": errors}
+        result = enroll_teachers(group, self.validated_data["user_ids"])
+        return {
+            "created": result["enrollments"],
+            "errors": result["errors"],
+            "report": result["report"],
+        }
@@ -1,7 +1,7 @@
-from django.db import transaction
 from rest_framework import serializers
 
-from src.apps.courses.models import CourseEnrollment, CourseGroup
+from src.apps.courses.models import CourseGroup
+from src.apps.courses.service.enrollments import unenroll_teachers
 
 
 class RemoveTeachersSerializer(serializers.Serializer):
@@ -19,13 +19,6 @@ class RemoveTeachersSerializer(serializers.Serializer):
 
     def save(self):
         group: CourseGroup = self.context["group"]
-        removed, errors = [], []
-        with transaction.atomic():
-            for uid in self.validated_data["user_ids"]:
-                qs = CourseEnrollment.objects.filter(user_id=uid, group=group, role="teacher")
-                if qs.exists():
-                    qs.delete()
-                    removed.append(uid)
-                else:
-                    errors.append({"user_id": uid, "error": "enrollment not found"})
-        return {"removed": removed, "errors": errors}
+        result = unenroll_teachers(group, self.validated_data["user_ids"])
+        removed = [row["user_id"] for row in result["report"] if row["status"] == "removed"]
+        return {"removed": removed, "errors": result["errors"], "report": result["report"]}
@@ -38,17 +38,22 @@ class CourseStudentsInfoSerializer(serializers.ModelSerializer):
             "name": obj.group.name,
         }
 
-    def get_points(self, obj) -> float | int:
-        return 0
+    # Progress values are stored on the enrollment, see src.apps.courses.service.progress
+    def get_points(self, obj: CourseEnrollment) -> float | int:
+        return obj.total_points
 
     def get_course_status(self, obj: CourseEnrollment) -> str:
-        return "in_progress"  # 'finished', 'not_started'
+        if obj.finished_at:
+            return "finished"
+        if obj.started_at:
+            return "in_progress"
+        return "not_started"
 
     def get_progress(self, obj: CourseEnrollment) -> float:
-        return 0.0
+        return round(obj.progress, 2)
 
     def get_started_at(self, obj: CourseEnrollment):
-        return obj.enrolled_date
+        return obj.started_at
 
     def get_finished_at(self, obj: CourseEnrollment):
-        return obj.enrolled_date
+        return obj.finished_at
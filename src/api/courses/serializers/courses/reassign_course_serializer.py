@@ -1,7 +1,6 @@
 from rest_framework import serializers
 
-from src.apps.grades.models import Grade
-from src.apps.submissions.models import Answer
+from src.apps.courses.service.reassign import reassign
 from src.apps.users.models import User
 
 
@@ -12,20 +11,17 @@ class ReassignCourseSerializer(serializers.Serializer):
     )
 
     def validate(self, attrs):
-        user_ids = attrs.get("user_ids")
+        user_ids = list(dict.fromkeys(attrs.get("user_ids")))
+        found = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
         for user_id in user_ids:
-            if not User.objects.filter(pk=user_id).exists():
+            if user_id not in found:
                 raise serializers.ValidationError(f"User with id {user_id} not found")
+        attrs["user_ids"] = user_ids
         return attrs
 
     def save(self, **kwargs):
+        """Returns ``(reassigned_users, queued)``."""
         user_ids = self.validated_data.get("user_ids")
         course = self.context.get("course")
-        reassigned = 0
-        for user_id in user_ids:
-            user = User.objects.get(pk=user_id)
-            Grade.objects.filter(answer__user=user, answer__task__course=course).delete()
-            Answer.objects.filter(user=user, task__course=course).delete()
-            reassigned += 1
-
-        return reassigned
+        queued = reassign(course_id=course.pk, user_ids=user_ids)
+        return len(user_ids), queued
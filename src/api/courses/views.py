@@ -1,7 +1,7 @@
 import logging
 
 from django.db import transaction
-from django.db.models import Count, Prefetch, Q
+from django.db.models import Prefetch, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import OpenApiResponse, extend_schema
 from rest_framework import serializers, status, viewsets
@@ -40,6 +40,7 @@ from src.api.courses.serializers.courses.course_read_light_serializer import (
 )
 from src.api.submissions.serializers import AnswerReadSerializer
 from src.api.users.serializers import AllUsersSerializerLight, UserSerializer
+from src.apps.common.pagination import KeysetPaginationMixin
 from src.apps.common.permissions import (
     IsAdmin,
     IsAdminOrTeacher,
@@ -49,6 +50,14 @@ from src.apps.common.permissions import (
 from src.apps.common.utils.files.export_courses import export_courses_to_csv, export_courses_to_xlsx
 from src.apps.courses.filters import CourseFilter
 from src.apps.courses.models import Category, Course, CourseEnrollment, CourseGroup
+from src.apps.courses.models.groups.manager import teachers_prefetch
+from src.apps.courses.service.enrollments import (
+    AlreadyEnrolled,
+    StudentsLimitExceeded,
+    self_enroll_student,
+)
+from src.apps.courses.service.list_cache import cache_response, cache_stats, get_cached_response
+from src.apps.courses.service.scope import teacher_student_enrollments
 from src.apps.submissions.models import Answer
 from src.apps.users.filters import UserFilter
 from src.apps.users.models import User
@@ -58,7 +67,7 @@ logger = logging.getLogger(__name__)
 
 
 @extend_schema(tags=["Courses"])
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     serializer_class = CourseReadSerializer
     queryset = Course.objects.select_related("author", "category").all().order_by("name")
     filter_backends = [DjangoFilterBackend]
@@ -118,11 +127,32 @@ class CourseViewSet(viewsets.ModelViewSet):
             )
         )
 
+    def list(self, request, *args, **kwargs):
+        key, data = get_cached_response(request, "all")
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache_response(key, response.data)
+        return response
+
     @action(methods=["get"], detail=False, url_path="my-courses")
     def my_courses(self, request):
+        key, data = get_cached_response(request, "mine")
+        if data is not None:
+            return Response(data)
+        response = self._my_courses(request)
+        cache_response(key, response.data)
+        return response
+
+    def _my_courses(self, request):
         user = request.user
         course_ids = CourseEnrollment.objects.filter(user=user).values_list("course", flat=True)
         courses = Course.objects.filter(pk__in=course_ids).select_related("author", "category")
+        page = self.paginate_keyset(courses)
+        if page is not None:
+            serializer = CourseReadSerializer(page, many=True, context={"request": request})
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = CourseReadSerializer(courses, many=True, context={"request": request})
         return Response(serializer.data)
 
@@ -130,14 +160,21 @@ class CourseViewSet(viewsets.ModelViewSet):
     def tasks(self, request, pk=None):
         course: Course = self.get_object()
         course_tasks = course.tasks.all().select_related("course__category")
+        page = self.paginate_keyset(course_tasks, ordering=("created_at", "id"))
+        if page is not None:
+            serializer = TaskReadSerializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = TaskReadSerializer(course_tasks, many=True)
         return Response(serializer.data)
 
     @action(methods=["get"], detail=True)
     def groups(self, request, pk=None):
         course: Course = self.get_object()
-        groups = course.groups.select_related("course__category", "course__author")
-        # TODO -> optimize
+        groups = course.groups.select_related("course__category", "course__author").with_teachers()
+        page = self.paginate_keyset(groups)
+        if page is not None:
+            serializer = CourseGroupReadSerializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = CourseGroupReadSerializer(groups, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -156,33 +193,17 @@ class CourseViewSet(viewsets.ModelViewSet):
 
     @action(methods=["get"], detail=False, url_path="statistics")
     def statistics(self, request, pk=None):
-        qs = Course.objects.annotate(
-            students_count=Count(
-                "enrollments__user",
-                filter=Q(enrollments__role="student"),
-                distinct=True,
-            ),
-            teachers_count=Count(
-                "enrollments__user",
-                filter=Q(enrollments__role="teacher"),
-                distinct=True,
-            ),
-            groups_count=Count(
-                "groups",
-                filter=Q(groups__is_deleted=False),
-                distinct=True,
-            ),
-            tasks_count=Count(
-                "tasks",
-                filter=Q(tasks__is_deleted=False),
-                distinct=True,
-            ),
-        )
+        # Counters are stored on the row, see src.apps.courses.service.counters
+        qs = Course.objects.all()
 
         serializer = self.get_serializer(qs, many=True)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=["get"], detail=False, url_path="list-cache-stats")
+    def list_cache_stats(self, request):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
     @action(methods=["get"], detail=False, url_path="export-courses")
     def export_courses(self, request):
         file_type = request.query_params.get("file_type")
@@ -193,21 +214,10 @@ class CourseViewSet(viewsets.ModelViewSet):
             )
             return Response({"detail": "Invalid file format"}, status=status.HTTP_400_BAD_REQUEST)
 
-        qs = Course.objects.select_related("author", "category").annotate(
-            students_count=Count(
-                "enrollments__user", filter=Q(enrollments__role="student"), distinct=True
-            ),
-            teachers_count=Count(
-                "enrollments__user", filter=Q(enrollments__role="teacher"), distinct=True
-            ),
-            groups_count=Count("groups", filter=Q(groups__is_deleted=False), distinct=True),
-            tasks_count=Count("tasks", filter=Q(tasks__is_deleted=False), distinct=True),
-        )
-
-        data = self.get_serializer(qs, many=True).data
+        qs = Course.objects.all()
         if file_type == "csv":
-            return export_courses_to_csv(data)
-        return export_courses_to_xlsx(data)
+            return export_courses_to_csv(qs)
+        return export_courses_to_xlsx(qs)
 
     @transaction.atomic
     @action(methods=["post"], detail=True, url_path="deactivate")
@@ -238,6 +248,10 @@ class CourseViewSet(viewsets.ModelViewSet):
         students = CourseEnrollment.objects.filter(course=course, role="student").select_related(
             "user", "group", "course"
         )
+        page = self.paginate_keyset(students, ordering=("-enrolled_date", "-id"))
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(students, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -281,7 +295,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         if not User.objects.filter(pk=user_id).exists():
             return Response({"detail": "Invalid user_id"}, status=status.HTTP_400_BAD_REQUEST)
 
-        enrollments = CourseEnrollment.objects.filter(user_id=user_id)
+        enrollments = CourseEnrollment.objects.filter(user_id=user_id).select_related(
+            "user", "group", "course"
+        )
         serializer = self.get_serializer(enrollments, many=True)
         return Response(serializer.data)
 
@@ -299,14 +315,20 @@ class CourseViewSet(viewsets.ModelViewSet):
             )
             return Response(serializer.errors, status=400)
 
-        reassigned = serializer.save()
+        reassigned, queued = serializer.save()
         logger.info(
-            "courses.reassign | user=%s reassigned course=%s to users=%s",
+            "courses.reassign | user=%s reassigned course=%s to users=%s | queued=%s",
             request.user.pk,
             course.id,
             request.data.get("user_ids", []),
+            queued,
         )
 
+        if queued:
+            return Response(
+                {"detail": f"reassignment of '{course.pk}' course for {reassigned} users started"},
+                status=status.HTTP_202_ACCEPTED,
+            )
         return Response(
             {"detail": f"successfully reassigned '{course.pk}' course for {reassigned} users"}
         )
@@ -348,12 +370,16 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(methods=["get"], detail=False, url_path="light-list")
     def light_list(self, request):
         qs = super().get_queryset()
+        page = self.paginate_keyset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
 
 @extend_schema(tags=["Course Groups"])
-class CourseGroupViewSet(viewsets.ModelViewSet):
+class CourseGroupViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     serializer_class = CourseGroupReadSerializer
     queryset = CourseGroup.objects.select_related("course")
 
@@ -371,6 +397,8 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         qs = CourseGroup.objects.select_related("course__category", "course__author")
+        if self.action in ["list", "retrieve", "my_groups"]:
+            qs = qs.with_teachers()
 
         params = self.request.query_params
         search = params.get("search")
@@ -404,10 +432,7 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
         else:
             qs = qs.order_by("-created_at")
 
-        return qs.annotate(
-            members_count=Count("members", distinct=True),
-            students_count=Count("members", filter=Q(members__role="student"), distinct=True),
-        )
+        return qs
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -478,7 +503,13 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
         user = request.user
         group_ids = CourseEnrollment.objects.filter(user=user).values_list("group", flat=True)
         group_ids = [gid for gid in group_ids if gid is not None]
-        groups = CourseGroup.objects.filter(pk__in=group_ids)
+        groups = (
+            CourseGroup.objects.filter(pk__in=group_ids).select_related("course").with_teachers()
+        )
+        page = self.paginate_keyset(groups)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(groups, many=True)
         return Response(serializer.data)
 
@@ -502,7 +533,10 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
             for e in result["created"]
         ]
         logger.info(f"courses.group.add-teachers. Added {data} teachers by {request.user.pk}")
-        return Response({"added": data, "errors": result.get("errors", [])}, status=201)
+        return Response(
+            {"added": data, "errors": result.get("errors", []), "report": result.get("report", [])},
+            status=201,
+        )
 
     @action(detail=True, methods=["post"], url_path="remove-teachers")
     def remove_teachers(self, request, pk=None):
@@ -535,7 +569,7 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         result = serializer.save()
 
-        enrollments_qs = result.get("created")
+        enrollments_qs = result.get("created").prefetch_related(teachers_prefetch("group__members"))
         errors = result.get("errors", [])
 
         response_serializer = CourseEnrollmentReadSerializer(
@@ -545,7 +579,12 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
             f"course.group.add-students. Data {serializer.data}" f"\nadded by {request.user.pk}"
         )
         return Response(
-            {"enrolled": response_serializer.data, "errors": errors}, status=status.HTTP_201_CREATED
+            {
+                "enrolled": response_serializer.data,
+                "errors": errors,
+                "report": result.get("report", []),
+            },
+            status=status.HTTP_201_CREATED,
         )
 
     @extend_schema(responses={200: OpenApiResponse(response=serializers.DictField())})
@@ -575,9 +614,6 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
         List members of this group (students, assistants). Teachers may see all.
         """
         group = self.get_object()
-        counts = CourseEnrollment.objects.filter(group=group).aggregate(
-            members_count=Count("id"), students_count=Count("id", filter=Q(role="student"))
-        )
         enrollments = (
             CourseEnrollment.objects.filter(group=group)
             .select_related(
@@ -585,16 +621,17 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
                 "group__course__category",
                 "group__course__author",
             )
-            .prefetch_related(
-                # if CourseGroupReadSerializer is used inside
-                Prefetch(
-                    "group__members",
-                    queryset=CourseEnrollment.objects.select_related("user__profile"),
-                )
+            .prefetch_related(teachers_prefetch("group__members"))
+        )
+        page = self.paginate_keyset(enrollments, ordering=("-enrolled_date", "-id"))
+        if page is not None:
+            serializer = CourseEnrollmentReadSerializer(
+                page, many=True, context={"request": request}
             )
+            return self.get_keyset_paginated_response(serializer.data)
+        serializer = CourseEnrollmentReadSerializer(
+            enrollments, many=True, context={"request": request}
         )
-        context = {"request": request, "group_counts": {group.id: counts}}
-        serializer = CourseEnrollmentReadSerializer(enrollments, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(methods=["post"], detail=True, url_path="refresh-token")
@@ -659,20 +696,25 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
                 {"detail": "User is already enrolled"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        if group.students_limit and group.members.count() >= group.students_limit:
+        try:
+            # O(1) seat reservation on the stored counter, see self_enroll_student
+            self_enroll_student(group, request.user)
+        except StudentsLimitExceeded:
             logger.warning(
                 f"courses.group.enroll-by-token. User with "
                 f"id {request.user.pk} tried to enroll"
                 f" to group {group.pk}, but the students limit is reached"
             )
             return Response({"detail": "Too many students"}, status=status.HTTP_400_BAD_REQUEST)
+        except AlreadyEnrolled:
+            logger.warning(
+                f"courses.group.enroll-by-token. User with id {request.user.pk}"
+                f" tried to enroll to group {group.pk}, but user already enrolled to this course"
+            )
+            return Response(
+                {"detail": "User is already enrolled"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-        CourseEnrollment.objects.create(
-            user=request.user,
-            group=group,
-            course=group.course,
-            role="student",
-        )
         logger.info(
             f"courses.group.enroll-by-token. User"
             f" with id {request.user.pk} enrolled to group {group.pk}"
@@ -682,6 +724,10 @@ class CourseGroupViewSet(viewsets.ModelViewSet):
     @action(methods=["get"], detail=False, url_path="light-list")
     def light_list(self, request):
         qs = super().get_queryset()
+        page = self.paginate_keyset(qs)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -709,9 +755,11 @@ class AllUsersViewSet(viewsets.GenericViewSet):
 
 
 @extend_schema(tags=["Course Enrollments"])
-class CourseEnrollmentViewSet(viewsets.ModelViewSet):
+class CourseEnrollmentViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     serializer_class = CourseEnrollmentReadSerializer
-    queryset = CourseEnrollment.objects.select_related("user", "group", "course")
+    queryset = CourseEnrollment.objects.select_related(
+        "user", "group__course", "course"
+    ).prefetch_related(teachers_prefetch("group__members"))
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -771,7 +819,11 @@ class CourseEnrollmentViewSet(viewsets.ModelViewSet):
     @action(methods=["get"], detail=False)
     def my_enrollments(self, request):
         user = request.user
-        enrolled_courses = CourseEnrollment.objects.filter(user=user)
+        enrolled_courses = self.queryset.filter(user=user)
+        page = self.paginate_keyset(enrolled_courses, ordering=("-enrolled_date", "-id"))
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(enrolled_courses, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -788,11 +840,11 @@ class CourseEnrollmentViewSet(viewsets.ModelViewSet):
         """
         Returns a list of all students where teacher is enrolled.
         """
-        user = request.user
-        teacher_enrollment = CourseEnrollment.objects.filter(user=user, role="teacher").values_list(
-            "group_id", flat=True
-        )
-        students = CourseEnrollment.objects.filter(group_id__in=teacher_enrollment, role="student")
+        students = teacher_student_enrollments(request.user)
+        page = self.paginate_keyset(students, ordering=("-enrolled_date", "-id"))
+        if page is not None:
+            serializer = self.get_serializer(page, many=True, context={"request": request})
+            return self.get_keyset_paginated_response(serializer.data)
         serializer = self.get_serializer(students, many=True, context={"request": request})
 
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -3,9 +3,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
 from src.apps.common.permissions import IsAdminOrTeacher
+from src.apps.courses.service.progress import refresh_progress
+from src.apps.courses.service.scope import grades_for_teacher
 from src.apps.grades.models import Grade
 
-from ...apps.courses.models import CourseGroup
 from .serializers import GradeReadSerializer, GradeWriteSerializer
 
 
@@ -30,27 +31,31 @@ class GradeModelViewSet(ModelViewSet):
         if user.groups.filter(name="Admins").exists():
             return self.queryset
         if user.groups.filter(name="Teachers").exists():
-            teacher_groups = CourseGroup.objects.filter(
-                members__user=user, members__role="teacher"
-            ).distinct()
-            return (
-                self.queryset.filter(
-                    answer__user__enrollments__group__in=teacher_groups,
-                    answer__user__enrollments__role="student",
-                )
-                .select_related(
+            return grades_for_teacher(
+                self.queryset.select_related(
                     "answer__user",
                     "answer__task",
                     "answer__task__course",
                     "graded_by",
-                )
-                .distinct()
+                ),
+                user,
             )
 
         return self.queryset.filter(answer__user=user)
 
     def perform_create(self, serializer):
-        serializer.save(graded_by=self.request.user)
+        grade = serializer.save(graded_by=self.request.user)
+        self._refresh_student_progress(grade.answer)
 
     def perform_update(self, serializer):
-        serializer.save(graded_by=self.request.user)
+        grade = serializer.save(graded_by=self.request.user)
+        self._refresh_student_progress(grade.answer)
+
+    def perform_destroy(self, instance):
+        answer = instance.answer
+        instance.delete()
+        self._refresh_student_progress(answer)
+
+    @staticmethod
+    def _refresh_student_progress(answer):
+        refresh_progress([answer.task.course_id], user_ids=[answer.user_id])
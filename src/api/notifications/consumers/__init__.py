@@ -1 +1 @@
-from .notifications import NotificationConsumer
\ No newline at end of file
+from .notifications import NotificationConsumer
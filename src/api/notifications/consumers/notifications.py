@@ -1,10 +1,43 @@
 import json
+from urllib.parse import parse_qs
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 
+from src.api.chat.consumers.presence import PresenceConsumerMixin
+from src.api.notifications.serializers import NotificationReadSerializer
+from src.apps.common.pagination import KeysetPagination
+from src.apps.notifications.models import Notification
+
+
+class NotificationConsumer(PresenceConsumerMixin, AsyncWebsocketConsumer):
+    """
+    Live notifications of the connected user.
+
+    A client resuming after being offline passes where it stopped, either as
+    ``?cursor=<cursor>`` / ``?last_id=<notification id>`` on connect or later as
+    ``{"type": "resume", "cursor": ...}`` / ``{"type": "resume", "last_id": ...}``.
+    It gets the notifications created or changed since then in one ``replay``
+    frame, oldest first, from a range scan over the (receiver, updated_at, id)
+    index::
+
+        {"type": "replay", "data": {"notifications": [...], "cursor": "...", "has_more": false}}
+
+    ``cursor`` is where the next resume should start. With ``has_more`` the
+    client resumes again right away with it. Live events that arrive during a
+    replay may repeat a replayed notification; clients drop duplicates by id.
+
+    ``last_id`` carries no time, and the notification's own ``updated_at``
+    moves when it is edited, so a ``last_id`` resume replays everything
+    created after it or changed since it was created, that notification
+    included. Clients that keep the cursor get an exact replay.
+    """
+
+    replay_limit = 100
 
-class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         user = self.scope.get("user")
 
@@ -13,12 +46,87 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         else:
             self.group_name = f"user_notifications_{user.id}"
 
+            # join before replaying so nothing falls between the replay and live events
             await self.channel_layer.group_add(self.group_name, self.channel_name)
             await self.accept()
+            await self.join_presence()
+
+            params = parse_qs(self.scope.get("query_string", b"").decode())
+            resume = {key: params[key][0] for key in ("cursor", "last_id") if key in params}
+            if resume:
+                await self.handle_resume(resume)
 
     async def disconnect(self, close_code):
         if hasattr(self, "group_name"):
+            await self.leave_presence()
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data)
+            if data.get("type") == "resume":
+                await self.handle_resume(data)
+        except json.JSONDecodeError:
+            await self.send_error("Invalid JSON format")
+        except Exception as e:
+            await self.send_error(str(e))
+
+    async def handle_resume(self, data):
+        try:
+            notifications, cursor, has_more = await self.get_replay(
+                data.get("cursor"), data.get("last_id")
+            )
+        except (NotFound, TypeError, ValueError):
+            await self.send_error("Invalid cursor")
+            return
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "replay",
+                    "data": {
+                        "notifications": notifications,
+                        "cursor": cursor,
+                        "has_more": has_more,
+                    },
+                }
+            )
+        )
+
+    @database_sync_to_async
+    def get_replay(self, cursor=None, last_id=None):
+        """One page of the user's notifications changed after ``cursor``/``last_id``."""
+        user = self.scope["user"]
+        paginator = KeysetPagination(ordering=("updated_at", "id"))
+        queryset = (
+            Notification.objects.filter(receiver=user)
+            .select_related("receiver", "sender")
+            .prefetch_related("receiver__groups", "sender__groups")
+        )
+        if not cursor and last_id is not None:
+            last_id = int(last_id)
+            created_at = (
+                Notification.objects.filter(receiver=user, pk=last_id)
+                .values_list("created_at", flat=True)
+                .first()
+            )
+            # deleted since: only what was created after it
+            since = Q(pk__gt=last_id)
+            if created_at is not None:
+                # the client saw it no earlier than it was created
+                since |= Q(updated_at__gte=created_at)
+            queryset = queryset.filter(since)
+        notifications, next_cursor = paginator.paginate_forward(queryset, cursor, self.replay_limit)
+        if notifications:
+            cursor = next_cursor or paginator.cursor_for(notifications[-1])
+        serializer = NotificationReadSerializer(notifications, many=True)
+        return list(serializer.data), cursor, next_cursor is not None
+
+    async def send_error(self, error_message):
+        await self.send(text_data=json.dumps({"type": "error", "message": error_message}))
+
     async def send_answer_status_notification(self, event):
         await self.send(text_data=json.dumps(event["data"]))
+
+    async def notification_event(self, event):
+        """Typed events, e.g. from ``src.apps.notifications.service.broadcast``."""
+        await self.send(text_data=json.dumps({"type": event["event"], "data": event["data"]}))
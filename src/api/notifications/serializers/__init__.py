@@ -1,2 +1,4 @@
+from .notification_broadcast_serializer import NotificationBroadcastSerializer
+from .notification_mark_read_serializer import NotificationMarkReadSerializer
 from .notification_read_serializer import NotificationReadSerializer
-from .notification_write_serializer import NotificationWriteSerializer
\ No newline at end of file
+from .notification_write_serializer import NotificationWriteSerializer
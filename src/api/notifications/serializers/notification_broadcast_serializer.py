@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.notifications.service.broadcast import BROADCAST_EVENTS, DEFAULT_EVENT
+
+TARGETS = ("course", "group", "user_ids")
+
+
+class NotificationBroadcastSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=100)
+    content = serializers.CharField()
+    event = serializers.ChoiceField(choices=BROADCAST_EVENTS, default=DEFAULT_EVENT)
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=False)
+    group = serializers.PrimaryKeyRelatedField(queryset=CourseGroup.objects.all(), required=False)
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=10000,
+    )
+
+    def validate(self, attrs):
+        targets = [target for target in TARGETS if target in attrs]
+        if len(targets) != 1:
+            raise serializers.ValidationError("Choose exactly one of course, group or user_ids.")
+
+        user = self.context["request"].user
+        if user.is_superuser or "Admins" in user.cached_group_names:
+            return attrs
+        if "user_ids" in attrs:
+            raise serializers.ValidationError(
+                {"user_ids": "Only admins can notify an arbitrary set of users."}
+            )
+        target = targets[0]
+        if not CourseEnrollment.objects.filter(
+            user=user, role="teacher", **{target: attrs[target]}
+        ).exists():
+            raise serializers.ValidationError({target: f"You do not teach this {target}."})
+        return attrs
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=500,
+        help_text="Notifications to mark as read; all unread notifications when omitted.",
+    )
@@ -10,4 +10,13 @@ class NotificationReadSerializer(ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ["id", "title", "content", "receiver", "sender", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "title",
+            "content",
+            "receiver",
+            "sender",
+            "is_read",
+            "created_at",
+            "updated_at",
+        ]
@@ -1,18 +1,41 @@
 from django.db.models import Q
-from drf_spectacular.utils import extend_schema
-from rest_framework import viewsets
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
+from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from src.apps.common.pagination import KeysetPagination, KeysetPaginationMixin
+from src.apps.common.permissions.group_permissions import IsAdminOrTeacher
 from src.apps.notifications.models import Notification
+from src.apps.notifications.service import broadcast as broadcast_service
+from src.apps.notifications.service import unread
 
-from .serializers import NotificationReadSerializer, NotificationWriteSerializer
+from .serializers import (
+    NotificationBroadcastSerializer,
+    NotificationMarkReadSerializer,
+    NotificationReadSerializer,
+    NotificationWriteSerializer,
+)
+
+PAGE_PARAMETERS = [
+    OpenApiParameter("pagination", str, enum=["cursor"], description="Return keyset pages"),
+    OpenApiParameter("cursor", str, description="`next` cursor of the previous page"),
+    OpenApiParameter("page_size", int),
+]
+
+
+class NotificationPagination(KeysetPagination):
+    page_size = 20
 
 
 @extend_schema(tags=["Notifications"])
-class NotificationViewSet(viewsets.GenericViewSet):
+class NotificationViewSet(KeysetPaginationMixin, viewsets.GenericViewSet):
     queryset = Notification.objects.select_related("receiver", "sender").all()
     serializer_class = NotificationReadSerializer
+    keyset_pagination_class = NotificationPagination
+    # matches the (receiver, is_read, -created_at, -id) index
+    inbox_ordering = ("is_read", "-created_at", "-id")
+    outbox_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         if self.action == "inbox":
@@ -21,11 +44,19 @@ class NotificationViewSet(viewsets.GenericViewSet):
             return self.queryset.filter(sender=self.request.user.id)
         return self.queryset.filter(Q(receiver=self.request.user) | Q(sender=self.request.user))
 
-    def list(self, request):
-        queryset = self.get_queryset().order_by("is_read", "-created_at")
-        serializer = self.get_serializer(queryset, many=True)
+    def _list_response(self, queryset, ordering):
+        """The whole list, or one keyset page with ``?pagination=cursor``."""
+        page = self.paginate_keyset(queryset, ordering=ordering)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset.order_by(*ordering), many=True)
         return Response(serializer.data)
 
+    @extend_schema(parameters=PAGE_PARAMETERS)
+    def list(self, request):
+        return self._list_response(self.get_queryset(), self.inbox_ordering)
+
     # def create(self, request):
     #     serializer = self.get_serializer(data=request.data)
     #     serializer.is_valid(raise_exception=True)
@@ -38,16 +69,77 @@ class NotificationViewSet(viewsets.GenericViewSet):
     def get_serializer_class(self):
         if self.action in ["create", "update", "delete"]:
             return NotificationWriteSerializer
+        if self.action == "mark_read":
+            return NotificationMarkReadSerializer
+        if self.action == "broadcast":
+            return NotificationBroadcastSerializer
         return NotificationReadSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("unread", bool, description="Only unread notifications"),
+            *PAGE_PARAMETERS,
+        ]
+    )
     @action(detail=False, methods=["get"])
     def inbox(self, request):
+        """Received notifications, unread first, newest first."""
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        if request.query_params.get("unread") in ("1", "true", "True"):
+            queryset = queryset.filter(is_read=False)
+        return self._list_response(queryset, self.inbox_ordering)
 
+    @extend_schema(parameters=PAGE_PARAMETERS)
     @action(detail=False, methods=["get"])
     def outbox(self, request):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_response(self.get_queryset(), self.outbox_ordering)
+
+    @extend_schema(
+        responses=inline_serializer(
+            "NotificationUnreadCount", {"unread_count": serializers.IntegerField()}
+        )
+    )
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        """Badge count from the cached per-user counter."""
+        return Response({"unread_count": unread.unread_count(request.user.pk)})
+
+    @extend_schema(
+        responses=inline_serializer(
+            "NotificationMarkReadResult", {"updated": serializers.IntegerField()}
+        )
+    )
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request):
+        """Mark the given notifications, or all of them, as read in one UPDATE."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = unread.mark_read(request.user, serializer.validated_data.get("ids"))
+        return Response({"updated": updated})
+
+    @extend_schema(
+        responses={
+            202: inline_serializer(
+                "NotificationBroadcastResult", {"recipients": serializers.IntegerField()}
+            )
+        }
+    )
+    @action(detail=False, methods=["post"], permission_classes=[IsAdminOrTeacher])
+    def broadcast(self, request):
+        """
+        Notify a whole course, a group, or (admins only) a list of users. The
+        rows are written right away; the real-time push runs in Celery.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        recipients = broadcast_service.broadcast(
+            data["title"],
+            data["content"],
+            sender=request.user,
+            event=data["event"],
+            **{
+                target: data[target] for target in ("course", "group", "user_ids") if target in data
+            },
+        )
+        return Response({"recipients": recipients}, status=status.HTTP_202_ACCEPTED)
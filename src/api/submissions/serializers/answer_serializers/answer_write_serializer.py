@@ -2,6 +2,7 @@ from django.utils import timezone
 from rest_framework import serializers
 
 from src.apps.assignments.models import Task
+from src.apps.courses.service.progress import mark_started, refresh_progress
 from src.apps.submissions.models import Answer, AnswerFile
 
 
@@ -137,6 +138,7 @@ class AnswerWriteSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         files_data = validated_data.pop("files", None)
         answer = Answer.objects.create(**validated_data)
+        mark_started(answer.user_id, answer.task.course_id)
 
         if files_data:
             for file_data in files_data:
@@ -147,6 +149,7 @@ class AnswerWriteSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         files_data = validated_data.pop("files", None)
         request = self.context.get("request")
+        previous_status = instance.status
 
         if request:
             user_groups = request.user.cached_group_names
@@ -175,4 +178,6 @@ class AnswerWriteSerializer(serializers.ModelSerializer):
                     AnswerFile.objects.create(answer=instance, file=file_data)
 
         instance.save()
+        if instance.status != previous_status:
+            refresh_progress([instance.task.course_id], user_ids=[instance.user_id])
         return instance
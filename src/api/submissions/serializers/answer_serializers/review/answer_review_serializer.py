@@ -1,12 +1,9 @@
 from django.db import transaction
 from rest_framework import serializers
 
-from src.apps.common.utils import (
-    send_realtime_status_notification,
-    send_status_change_email_helper,
-)
+from src.apps.courses.service.progress import apply_review
 from src.apps.grades.models import Grade
-from src.apps.notifications.models import Notification
+from src.apps.notifications.service import digest
 from src.apps.submissions.models import Answer
 
 
@@ -139,6 +136,14 @@ class AnswerReviewSerializer(serializers.ModelSerializer):
                     current_percentage = existing_grade.percentage
                     current_letter = existing_grade.letter_grade
 
+            # Keep the student's stored course progress in step with this review
+            apply_review(
+                instance,
+                approved_delta=int(new_status == Answer.Status.approved)
+                - int(previous_status == Answer.Status.approved),
+                points_delta=(current_score or 0) - (old_score or 0),
+            )
+
             # Build & send notifications
             if status_changed or grade_changed:
                 # Human-friendly messages for known statuses
@@ -229,18 +234,30 @@ class AnswerReviewSerializer(serializers.ModelSerializer):
                         # Shouldn't happen due to outer guard, but keep safe
                         return instance
 
-                # Create/update notification safely (feedback always defined)
-                notification, _ = Notification.objects.update_or_create(
+                # Create/update notification safely (feedback always defined); delivery is
+                # merged with the student's other reviews in the digest window
+                grade = None
+                if current_score is not None and current_max_score is not None:
+                    grade = {
+                        "score": current_score,
+                        "max_score": current_max_score,
+                        "percentage": current_percentage,
+                        "letter": current_letter,
+                    }
+                digest.add(
                     receiver=instance.user,
                     title=title,
-                    defaults={
-                        "content": content,
-                        "feedback": current_feedback if not is_deleted else "",
-                        # "sender": self.context.get("request").user,
+                    content=content,
+                    feedback=current_feedback if not is_deleted else "",
+                    data={
+                        "answer_id": instance.pk,
+                        "task_id": instance.task_id,
+                        "task_number": instance.task.number,
+                        "task_name": instance.task.name,
+                        "status": instance.status,
+                        "grade": grade,
+                        "grade_removed": is_deleted,
                     },
                 )
 
-                send_realtime_status_notification(notification=notification)
-                send_status_change_email_helper(notification_instance=notification)
-
             return instance
@@ -16,14 +16,20 @@ from src.api.submissions.serializers import (
     AnswerReviewSerializer,
     AnswerWriteSerializer,
 )
+from src.apps.common.pagination import KeysetPaginationMixin
 from src.apps.common.permissions import IsAdminOrTeacher, IsEnrolledToCourse
 from src.apps.common.permissions.answers.answer_permissions import IsOwnerOfAnswer
-from src.apps.courses.models import CourseEnrollment, CourseGroup
+from src.apps.courses.models import CourseGroup
+from src.apps.courses.service.scope import (
+    answers_for_teacher,
+    teacher_can_access_answer,
+    teacher_group_ids,
+)
 from src.apps.submissions.models import Answer, AnswerFile
 
 
 @extend_schema(tags=["Answers"])
-class AnswerModelViewSet(ModelViewSet):
+class AnswerModelViewSet(KeysetPaginationMixin, ModelViewSet):
     queryset = Answer.objects.select_related("task", "user").prefetch_related("files", "grade")
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
@@ -53,18 +59,7 @@ class AnswerModelViewSet(ModelViewSet):
             if "Students" in user_groups:
                 return base_queryset.filter(user=user)
             if "Teachers" in user_groups:
-                teacher_groups = CourseGroup.objects.filter(teacher=user)
-                # Only get enrollments for the teacher's groups
-                student_enrollments = CourseEnrollment.objects.filter(
-                    group__in=teacher_groups, role="student"
-                )
-                student_user_ids = set(enrollment.user.id for enrollment in student_enrollments)
-                teacher_course_ids = set(group.course.id for group in teacher_groups)
-
-                return base_queryset.filter(
-                    user_id__in=student_user_ids,
-                    task__course_id__in=teacher_course_ids,  # Explicit course restriction
-                )
+                return answers_for_teacher(base_queryset, user)
             elif "Admins" in user_groups:
                 return base_queryset
         return base_queryset
@@ -104,15 +99,7 @@ class AnswerModelViewSet(ModelViewSet):
 
         # Teachers can only modify answers from their course group students
         if "Teachers" in user_groups:
-            teacher_groups = CourseEnrollment.objects.filter(
-                user=teacher_user, role="teacher"
-            ).values_list("group_id", flat=True)
-            return CourseEnrollment.objects.filter(
-                user=answer.user,
-                course=answer.task.course,
-                group_id__in=teacher_groups,
-                role="student",
-            ).exists()
+            return teacher_can_access_answer(teacher_user, answer)
 
         return False
 
@@ -131,32 +118,20 @@ class AnswerModelViewSet(ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Get all course groups where this user is the teacher
-        # teacher_groups = CourseGroup.objects.filter(teacher=user)
-        enrollment_groups = CourseEnrollment.objects.filter(user=user, role="teacher").values_list(
-            "group_id", flat=True
+        teacher_groups = list(
+            CourseGroup.objects.filter(id__in=teacher_group_ids(user)).select_related("course")
         )
-
-        teacher_groups = CourseGroup.objects.filter(id__in=enrollment_groups)
-        if not teacher_groups.exists():
+        if not teacher_groups:
             return Response(
                 {"detail": "No course groups found for this teacher"}, status=status.HTTP_200_OK
             )
 
-        # Get all students enrolled in these groups
-        student_enrollments = CourseEnrollment.objects.filter(
-            group__in=teacher_groups, role="student"
-        ).select_related("user", "course", "group")
-
-        # Extract course IDs and student user IDs
-        course_ids = set(enrollment.course.id for enrollment in student_enrollments)
-        student_user_ids = set(enrollment.user.id for enrollment in student_enrollments)
-
-        # Get all answers from these students for tasks in these courses
-        answers = (
-            self.queryset.filter(user_id__in=student_user_ids, task__course_id__in=course_ids)
-            .select_related("task__course", "user")
-            .prefetch_related("files", "grade")  # Include grade prefetch
+        # Answers of the teacher's students for tasks in the courses of their groups
+        group_filter = request.query_params.get("group_id")
+        answers = answers_for_teacher(
+            self.queryset.select_related("task__course", "user").prefetch_related("files", "grade"),
+            user,
+            group_id=group_filter or None,
         )
 
         # Optional: Filter by status (e.g., only in_review answers)
@@ -169,22 +144,12 @@ class AnswerModelViewSet(ModelViewSet):
         if course_filter:
             answers = answers.filter(task__course_id=course_filter)
 
-        # Optional: Filter by specific group
-        group_filter = request.query_params.get("group_id")
-        if group_filter:
-            # Get student IDs from specific group
-            group_student_ids = CourseEnrollment.objects.filter(
-                group_id=group_filter,
-                group__teacher=user,  # Ensure teacher owns this group
-                role="student",
-            ).values_list("user_id", flat=True)
-            answers = answers.filter(user_id__in=group_student_ids)
-
         # Order by most recent first
         answers = answers.order_by("-created_at")
 
-        # Serialize and return
-        serializer = self.get_serializer(answers, many=True)
+        # Serialize and return; with ?pagination=cursor only one keyset page and no COUNT
+        page = self.paginate_keyset(answers)
+        serializer = self.get_serializer(answers if page is None else page, many=True)
 
         # Add metadata about teacher's groups for frontend
         groups_data = []
@@ -194,31 +159,31 @@ class AnswerModelViewSet(ModelViewSet):
                     "id": group.id,
                     "name": group.name,
                     "course": {"id": group.course.id, "name": group.course.name},
-                    "student_count": CourseEnrollment.objects.filter(
-                        group=group, role="student"
-                    ).count(),
+                    "student_count": group.students_count,
                 }
             )
 
-        return Response(
-            {
-                "answers": serializer.data,
-                "teacher_groups": groups_data,
-                "total_answers": answers.count(),
-                "filters_available": {
-                    "status_choices": Answer.Status.choices,
-                    "courses": [
-                        {"id": group.course.id, "name": group.course.name}
-                        for group in teacher_groups
-                    ],
-                    "groups": [
-                        {"id": group.id, "name": group.name, "course_id": group.course.id}
-                        for group in teacher_groups
-                    ],
-                },
+        payload = {
+            "answers": serializer.data,
+            "teacher_groups": groups_data,
+            "filters_available": {
+                "status_choices": Answer.Status.choices,
+                "courses": [
+                    {"id": group.course.id, "name": group.course.name} for group in teacher_groups
+                ],
+                "groups": [
+                    {"id": group.id, "name": group.name, "course_id": group.course.id}
+                    for group in teacher_groups
+                ],
             },
-            status=status.HTTP_200_OK,
-        )
+        }
+        if page is None:
+            payload["total_answers"] = answers.count()
+        else:
+            payload["next"] = self._keyset_paginator.get_next_link()
+            payload["previous"] = self._keyset_paginator.get_previous_link()
+
+        return Response(payload, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post", "patch"], url_path="check")
     def check(self, request, pk=None):
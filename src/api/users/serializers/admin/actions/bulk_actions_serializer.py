@@ -1,12 +1,11 @@
 import logging
 
 from django.db import transaction
-from django.http import FileResponse, HttpResponse
+from django.http.response import HttpResponseBase
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
-from src.api.users.serializers.admin.files.export_user_serializer import ExportUserSerializer
 from src.apps.common.utils.files.export_users import export_users_to_csv, export_users_to_xlsx
 from src.apps.users.models import User
 
@@ -107,7 +106,7 @@ class BulkActionsSerializer(serializers.Serializer):
         elif action == "export_csv":
             result = self._export_to_csv(users)
 
-        if isinstance(result, (HttpResponse, FileResponse)):
+        if isinstance(result, HttpResponseBase):
             if warning:
                 result["X-Bulk-Warning"] = warning
             return result
@@ -176,15 +175,13 @@ class BulkActionsSerializer(serializers.Serializer):
     @staticmethod
     def _export_to_excel(users):
         """Export users to an Excel spreadsheet"""
-        data = ExportUserSerializer(users, many=True).data
-        response = export_users_to_xlsx(data)
+        response = export_users_to_xlsx(users)
         logger.info(f"users.BULK_ACTIONS. Export {users.count()} users in xlsx")
         return response
 
     @staticmethod
     def _export_to_csv(users):
         """Export users to CSV file"""
-        data = ExportUserSerializer(users, many=True).data
-        response = export_users_to_csv(data)
+        response = export_users_to_csv(users)
         logger.info(f"users.BULK_ACTIONS. Export {users.count()} users in csv")
         return response
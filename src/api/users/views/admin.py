@@ -4,11 +4,10 @@ from datetime import timedelta
 
 from django.contrib.auth.tokens import default_token_generator
 from django.db import transaction
-from django.db.models import Count
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.utils import timezone
-from django.http import HttpResponse, FileResponse
+from django.http.response import HttpResponseBase
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import status, viewsets
@@ -183,7 +182,7 @@ class AdminUserModelViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         result = serializer.perform_bulk_action()
 
-        if isinstance(result, (HttpResponse, FileResponse)):
+        if isinstance(result, HttpResponseBase):
             logger.info("users.bulk_actions SUCCESS result_type=%s", type(result).__name__)
             return result
 
@@ -195,12 +194,10 @@ class AdminUserModelViewSet(viewsets.ModelViewSet):
 
     @action(methods=['get'], detail=False, url_path="groups")
     def groups(self, request):
-        groups = CourseGroup.objects.select_related(
-            "course"
-        ).annotate(members_count=Count("members", distinct=True))
+        groups = list(CourseGroup.objects.select_related("course"))
 
         total_enrolled_members_count = sum(group.members_count for group in groups)
-        groups_count = groups.count()
+        groups_count = len(groups)
 
         serializer = self.get_serializer(groups, many=True)
         return Response({
@@ -218,14 +215,10 @@ class AdminUserModelViewSet(viewsets.ModelViewSet):
             logger.warning("users.export_users UNSUPPORTED file_type=%s", file_type)
             return Response({"detail": "Unsupported file type"}, status=400)
 
-        qs = User.objects.select_related("profile").all()
-        serializer = self.get_serializer(qs, many=True)
-        data = serializer.data
-        records = len(data)
-
-        resp = export_users_to_csv(data) if file_type == "csv" else export_users_to_xlsx(data)
-        logger.info("users.export_users SUCCESS file_type=%s records=%s status=%s",
-                    file_type, records, getattr(resp, "status_code", None))
+        qs = User.objects.all()
+        resp = export_users_to_csv(qs) if file_type == "csv" else export_users_to_xlsx(qs)
+        logger.info("users.export_users SUCCESS file_type=%s status=%s",
+                    file_type, getattr(resp, "status_code", None))
         return resp
 
     @action(methods=["post"], detail=False, url_path="import-users")
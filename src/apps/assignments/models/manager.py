@@ -1,6 +1,18 @@
 from django.db import models
 
+from src.apps.courses.models.courses.manager import CounterAwareQuerySet
 
-class ActiveTaskManager(models.Manager):
+
+class TaskQuerySet(CounterAwareQuerySet):
+    tracked_fields = frozenset({"course", "course_id", "is_deleted"})
+
+    def _touch(self, course_ids, group_ids=()):
+        from src.apps.courses.service.progress import refresh_progress
+
+        super()._touch(course_ids, group_ids)
+        refresh_progress(course_ids)
+
+
+class ActiveTaskManager(models.Manager.from_queryset(TaskQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
@@ -2,7 +2,7 @@ from ckeditor_uploader.fields import RichTextUploadingField
 from django.core.validators import FileExtensionValidator
 from django.db import models
 
-from src.apps.assignments.models.manager import ActiveTaskManager
+from src.apps.assignments.models.manager import ActiveTaskManager, TaskQuerySet
 from src.apps.common.models import BaseModel
 from src.apps.common.utils import unique_image_path, validate_image_size
 from src.apps.courses.models import Course
@@ -29,7 +29,7 @@ class Task(BaseModel):
     enable_context_menu_for_students = models.BooleanField(default=True)
     allow_resubmitting_task = models.BooleanField(default=True)
     objects = ActiveTaskManager()
-    all_objects = models.Manager()
+    all_objects = TaskQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.number}. {self.name} for {self.course.name} task"
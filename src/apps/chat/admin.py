@@ -3,7 +3,7 @@ from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
 
-from .models import ChatRoom, Message
+from .models import ArchivedMessage, ChatRoom, Message
 
 
 @admin.register(ChatRoom)
@@ -31,7 +31,14 @@ class ChatRoomAdmin(ModelAdmin):
         "student__last_name",
         "course__name",
     ]
-    readonly_fields = ("id", "created_at", "updated_at")
+    readonly_fields = (
+        "id",
+        "last_message",
+        "teacher_last_read_id",
+        "student_last_read_id",
+        "created_at",
+        "updated_at",
+    )
     list_per_page = 25
     list_select_related = ["teacher", "student", "course"]
     raw_id_fields = ["teacher", "student", "course"]
@@ -40,6 +47,9 @@ class ChatRoomAdmin(ModelAdmin):
         ("Chat Room Information", {
             "fields": ("id", "teacher", "student", "course", "is_active")
         }),
+        ("Messages", {
+            "fields": ("last_message", "teacher_last_read_id", "student_last_read_id")
+        }),
         ("Dates", {
             "fields": ("created_at", "updated_at")
         }),
@@ -72,13 +82,11 @@ class MessageAdmin(ModelAdmin):
         "chat_room",
         "sender",
         "content_preview",
-        "is_read",
         "read_badge",
         "has_file",
         "created_at_display",
     ]
     list_filter = [
-        "is_read",
         "created_at",
     ]
     search_fields = [
@@ -96,7 +104,7 @@ class MessageAdmin(ModelAdmin):
     
     fieldsets = (
         ("Message Information", {
-            "fields": ("id", "chat_room", "sender", "content", "file", "is_read")
+            "fields": ("id", "chat_room", "sender", "content", "file")
         }),
         ("Dates", {
             "fields": ("created_at", "updated_at")
@@ -131,4 +139,25 @@ class MessageAdmin(ModelAdmin):
         return "-"
     
     class Meta:
-        icon = "message"
\ No newline at end of file
+        icon = "message"
+
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(ModelAdmin):
+    """Read-only view of messages moved out by ``archive_chat_messages``."""
+
+    list_display = ["id", "chat_room", "sender", "created_at"]
+    list_filter = ["created_at"]
+    search_fields = ["sender__email", "chat_room__teacher__email", "chat_room__student__email"]
+    list_per_page = 25
+    list_select_related = ["chat_room", "sender"]
+    raw_id_fields = ["chat_room", "sender"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    class Meta:
+        icon = "inventory_2"
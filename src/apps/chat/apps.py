@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ChatConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.apps.chat"
+
+    def ready(self):
+        from .signals import update_room_state  # noqa E402
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from src.apps.chat.models import ArchivedMessage, Message
+from src.apps.chat.service.archive import (
+    DEFAULT_BATCH_SIZE,
+    HOT_WINDOW_DAYS,
+    archivable_messages,
+    archive_messages,
+    recent_history_latency,
+    table_stats,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move chat messages older than the hot window from Chat_Messages to "
+        "Chat_Messages_Archive in batches, and report table size and recent "
+        "history latency before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=HOT_WINDOW_DAYS,
+            help=f"Days of messages kept in the hot table (default: {HOT_WINDOW_DAYS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Messages moved per transaction (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report what would be archived"
+        )
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="Run VACUUM ANALYZE on the hot table afterwards (PostgreSQL)",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["keep_days"])
+        before = self._snapshot()
+
+        if options["dry_run"]:
+            pending = archivable_messages(cutoff).count()
+            self.stdout.write(f"{pending} messages older than {cutoff:%Y-%m-%d} would be archived")
+            self._report([("before", before)])
+            return
+
+        moved = 0
+        for count in archive_messages(cutoff, options["batch_size"]):
+            moved += count
+            if options["verbosity"] > 1:
+                self.stdout.write(f"archived {moved} messages")
+        self.stdout.write(f"archived {moved} messages older than {cutoff:%Y-%m-%d}")
+
+        if options["vacuum"] and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"VACUUM ANALYZE {connection.ops.quote_name(Message._meta.db_table)}"
+                )
+
+        self._report([("before", before), ("after", self._snapshot())])
+
+    @staticmethod
+    def _snapshot():
+        return {
+            "hot": table_stats(Message),
+            "archive": table_stats(ArchivedMessage),
+            "latency": recent_history_latency(),
+        }
+
+    def _report(self, snapshots):
+        self.stdout.write(
+            f"{'':>8} {'hot rows':>10} {'hot size':>12} {'archive rows':>13} "
+            f"{'archive size':>13} {'history ms':>11}"
+        )
+        for label, snapshot in snapshots:
+            latency = snapshot["latency"]
+            self.stdout.write(
+                f"{label:>8} {snapshot['hot']['rows']:>10} "
+                f"{self._size(snapshot['hot']['bytes']):>12} "
+                f"{snapshot['archive']['rows']:>13} "
+                f"{self._size(snapshot['archive']['bytes']):>13} "
+                f"{'-' if latency is None else f'{latency:.3f}':>11}"
+            )
+
+    @staticmethod
+    def _size(size):
+        if size is None:
+            return "-"
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.0f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpRequest
+
+from src.api.chat.consumers import ChatConsumer
+from src.api.chat.serializers import MessageReadSerializer
+from src.apps.chat.models import ChatRoom, Message
+from src.apps.common.utils import QueryCounter
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.users.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _Listener(ChatConsumer):
+    """A consumer whose socket only records what would be sent."""
+
+    def __init__(self, user):
+        super().__init__()
+        self.user = user
+        self.sent_bytes = 0
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        self.sent_bytes += len(text_data or "")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of broadcasting one chat message to N listeners: the "
+        "message is serialized once by the sender and each listener only adds "
+        "the reader-dependent fields. Test data is created in a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--listeners",
+            default="1,10,100,500",
+            help="Comma separated listener counts (default: 1,10,100,500)",
+        )
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=50,
+            help="Messages broadcast per listener count (default: 50)",
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also run the previous strategy: fetch and serialize per listener",
+        )
+
+    def handle(self, *args, **options):
+        listener_counts = [int(value) for value in options["listeners"].split(",") if value]
+        try:
+            with transaction.atomic():
+                self._run(listener_counts, options["messages"], options["compare"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, listener_counts, messages, compare):
+        room, sender, readers = self._fixtures()
+        header = f"{'listeners':>9} {'strategy':>12} {'ms/message':>11} {'queries/message':>16}"
+        self.stdout.write(header)
+        for count in listener_counts:
+            listeners = [_Listener(readers[index % len(readers)]) for index in range(count)]
+            rows = [("once", self._fan_out(room, sender, listeners, messages))]
+            if compare:
+                rows.append(("per listener", self._per_listener(room, sender, count, messages)))
+            for strategy, (elapsed, queries) in rows:
+                self.stdout.write(
+                    f"{count:>9} {strategy:>12} {elapsed * 1000 / messages:>11.3f} "
+                    f"{queries / messages:>16.2f}"
+                )
+
+    def _fixtures(self):
+        suffix = int(time.time() * 1000)
+        teacher = User.objects.create(email=f"bench-teacher-{suffix}@example.com")
+        student = User.objects.create(email=f"bench-student-{suffix}@example.com")
+        course = Course.objects.create(name="Fan-out benchmark", description="benchmark")
+        group = CourseGroup.objects.create(name="Fan-out benchmark", course=course)
+        CourseEnrollment.objects.create(user=teacher, course=course, group=group, role="teacher")
+        CourseEnrollment.objects.create(user=student, course=course, group=group, role="student")
+        room = ChatRoom.objects.create(teacher=teacher, student=student, course=course)
+        # every socket belongs to one of the two participants (several tabs/devices)
+        return room, student, [teacher, student]
+
+    def _measure(self, work):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            work()
+            elapsed = time.perf_counter() - started
+        return elapsed, counter.count
+
+    def _fan_out(self, room, sender, listeners, messages):
+        async def deliver(event):
+            for listener in listeners:
+                await listener.chat_message(event)
+
+        def work():
+            for index in range(messages):
+                message = Message.objects.create(chat_room=room, sender=sender, content=f"{index}")
+                event = ChatConsumer.build_chat_event(message)
+                # the channel layer serializes the event once per group_send
+                json.dumps(event)
+                asyncio.run(deliver(event))
+
+        return self._measure(work)
+
+    def _per_listener(self, room, sender, listeners, messages):
+        readers = [room.teacher, room.student]
+
+        def work():
+            for index in range(messages):
+                message = Message.objects.create(chat_room=room, sender=sender, content=f"{index}")
+                for listener in range(listeners):
+                    loaded = Message.objects.select_related("sender", "chat_room").get(
+                        id=message.id
+                    )
+                    request = HttpRequest()
+                    request.user = readers[listener % len(readers)]
+                    data = MessageReadSerializer(loaded, context={"request": request}).data
+                    json.dumps({"type": "message", "data": data})
+
+        return self._measure(work)
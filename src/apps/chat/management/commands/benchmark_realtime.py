@@ -0,0 +1,341 @@
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+
+import django
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from src.api.chat.consumers import ChatConsumer
+from src.api.notifications.consumers import NotificationConsumer
+from src.apps.chat.models import ChatRoom
+from src.apps.chat.service import presence
+from src.apps.common.utils import QueryCounter
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.users.models import User
+
+MARKER = "bench:"
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _latency_summary(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies) if latencies else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "In-process benchmark of ChatConsumer and NotificationConsumer over "
+        "WebsocketCommunicator and the in-memory channel layer: K rooms x M "
+        "sockets send messages, typing events and read receipts. Reports "
+        "throughput, delivery latency percentiles, DB queries per message and "
+        "peak memory, and writes the results as JSON. Seeds its own users, "
+        "course and rooms in the configured database and deletes them again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=10, help="Chat rooms (default: 10)")
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=2,
+            help="Sockets per room, alternating teacher and student (default: 2)",
+        )
+        parser.add_argument(
+            "--messages", type=int, default=50, help="Messages sent per room (default: 50)"
+        )
+        parser.add_argument(
+            "--typing",
+            type=int,
+            default=5,
+            help="Typing frames sent before each message (default: 5)",
+        )
+        parser.add_argument(
+            "--notifications",
+            type=int,
+            default=20,
+            help="Notifications pushed to each participant (default: 20)",
+        )
+        parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+        parser.add_argument(
+            "--output",
+            default="realtime-benchmark.json",
+            help="Where to write the JSON results (default: realtime-benchmark.json)",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        settings = {
+            "CHANNEL_LAYERS": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+            "PRESENCE_BACKEND": "src.apps.chat.service.presence.InMemoryPresenceBackend",
+        }
+        run_id = uuid.uuid4().hex[:8]
+        try:
+            # inside the try, so a seed that fails half way is cleaned up too
+            rooms = self._seed(run_id, options["rooms"])
+            with override_settings(**settings):
+                tracemalloc.start()
+                try:
+                    results = async_to_sync(self._run)(rooms, options)
+                    results["memory"] = {
+                        "tracemalloc_peak_bytes": tracemalloc.get_traced_memory()[1],
+                        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                    }
+                finally:
+                    tracemalloc.stop()
+        finally:
+            self._cleanup(run_id)
+
+        report = {
+            "benchmark": "realtime",
+            "commit": self._commit(),
+            "created_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "config": {
+                key: options[key]
+                for key in ("rooms", "participants", "messages", "typing", "notifications", "seed")
+            },
+            "results": results,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        self._print(results)
+        self.stdout.write(f"results written to {options['output']}")
+
+    # fixtures
+
+    def _seed(self, run_id, room_count):
+        course = Course.objects.create(name=f"Realtime benchmark {run_id}", description="benchmark")
+        group = CourseGroup.objects.create(name=f"Realtime benchmark {run_id}", course=course)
+        rooms = []
+        for index in range(room_count):
+            teacher = User.objects.create(email=f"bench-{run_id}-t{index}@example.com")
+            student = User.objects.create(email=f"bench-{run_id}-s{index}@example.com")
+            CourseEnrollment.objects.create(
+                user=teacher, course=course, group=group, role="teacher"
+            )
+            CourseEnrollment.objects.create(
+                user=student, course=course, group=group, role="student"
+            )
+            rooms.append(ChatRoom.objects.create(teacher=teacher, student=student, course=course))
+        return rooms
+
+    def _cleanup(self, run_id):
+        User.objects.filter(email__startswith=f"bench-{run_id}-").delete()
+        Course.objects.filter(name=f"Realtime benchmark {run_id}").delete()
+
+    # run
+
+    async def _connect(self, consumer, path, user, kwargs=None):
+        communicator = WebsocketCommunicator(consumer.as_asgi(), path)
+        communicator.scope["user"] = user
+        if kwargs is not None:
+            communicator.scope["url_route"] = {"kwargs": kwargs}
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError(f"{consumer.__name__} refused {user.email}")
+        return communicator
+
+    async def _run(self, rooms, options):
+        participants = options["participants"]
+        sockets = {}
+        for room in rooms:
+            users = [room.teacher, room.student]
+            sockets[room.pk] = [
+                await self._connect(
+                    ChatConsumer,
+                    f"/ws/chat/{room.pk}/",
+                    users[index % 2],
+                    {"chat_room_id": str(room.pk)},
+                )
+                for index in range(participants)
+            ]
+        notification_sockets = {}
+        for room in rooms:
+            for user in (room.teacher, room.student):
+                notification_sockets[user.pk] = await self._connect(
+                    NotificationConsumer, "/ws/notifications/", user
+                )
+
+        chat = await self._chat_phase(rooms, sockets, options)
+        notifications = await self._notification_phase(notification_sockets, options)
+
+        for communicator in [*notification_sockets.values()] + [
+            communicator for room_sockets in sockets.values() for communicator in room_sockets
+        ]:
+            await communicator.disconnect()
+        task = presence.get_broadcaster().task
+        if task is not None:
+            await task
+        return {"chat": chat, "notifications": notifications}
+
+    async def _chat_phase(self, rooms, sockets, options):
+        """
+        Every room sends its messages one after another (the next one once the
+        previous reached all sockets of the room); rooms run concurrently.
+        """
+        sent_at = {}
+        pending = {}
+        latencies = []
+
+        async def receive(communicator):
+            while True:
+                frame = json.loads(await communicator.receive_from(timeout=60))
+                if frame["type"] != "message":
+                    continue
+                key = frame["data"]["content"].split(" ", 1)[0]
+                if key not in sent_at:
+                    continue
+                latencies.append((time.perf_counter() - sent_at[key]) * 1000)
+                remaining, delivered = pending[key]
+                pending[key] = (remaining - 1, delivered)
+                if remaining == 1:
+                    delivered.set()
+
+        async def talk(room):
+            room_sockets = sockets[room.pk]
+            for index in range(options["messages"]):
+                sender = room_sockets[index % len(room_sockets)]
+                for _ in range(options["typing"]):
+                    await sender.send_to(
+                        text_data=json.dumps({"type": "typing", "is_typing": True})
+                    )
+                key = f"{MARKER}{room.pk}:{index}"
+                padding = "x" * self.rng.randint(10, 200)
+                delivered = asyncio.Event()
+                pending[key] = (len(room_sockets), delivered)
+                sent_at[key] = time.perf_counter()
+                await sender.send_to(
+                    text_data=json.dumps({"type": "send_message", "content": f"{key} {padding}"})
+                )
+                await asyncio.wait_for(delivered.wait(), timeout=60)
+                reader = room_sockets[(index + 1) % len(room_sockets)]
+                await reader.send_to(text_data=json.dumps({"type": "mark_as_read"}))
+
+        receivers = [
+            asyncio.create_task(receive(communicator))
+            for room_sockets in sockets.values()
+            for communicator in room_sockets
+        ]
+        counter = QueryCounter()
+        # consumers run their queries in the thread-sensitive executor, so the
+        # counter goes on that thread's connection
+        await sync_to_async(lambda: connection.execute_wrappers.append(counter))()
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(talk(room) for room in rooms))
+            elapsed = time.perf_counter() - started
+        finally:
+            await sync_to_async(lambda: connection.execute_wrappers.remove(counter))()
+        for receiver in receivers:
+            receiver.cancel()
+
+        sent = options["messages"] * len(rooms)
+        return {
+            "messages_sent": sent,
+            "deliveries": len(latencies),
+            "typing_frames": sent * options["typing"],
+            "read_receipts": sent,
+            "elapsed_s": elapsed,
+            "messages_per_s": sent / elapsed if elapsed else None,
+            "deliveries_per_s": len(latencies) / elapsed if elapsed else None,
+            "delivery_latency": _latency_summary(latencies),
+            "db_queries": counter.count,
+            "db_queries_per_message": counter.count / sent if sent else None,
+        }
+
+    async def _notification_phase(self, notification_sockets, options):
+        """Each user gets one notification at a time; users run concurrently."""
+        channel_layer = get_channel_layer()
+        latencies = []
+        count = options["notifications"]
+
+        async def push(user_id, communicator):
+            for index in range(count):
+                started = time.perf_counter()
+                await channel_layer.group_send(
+                    f"user_notifications_{user_id}",
+                    {"type": "send_answer_status_notification", "data": {"index": index}},
+                )
+                await communicator.receive_from(timeout=60)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(push(user_id, communicator) for user_id, communicator in notification_sockets.items())
+        )
+        elapsed = time.perf_counter() - started
+        total = count * len(notification_sockets)
+        return {
+            "notifications_sent": total,
+            "elapsed_s": elapsed,
+            "notifications_per_s": total / elapsed if elapsed else None,
+            "delivery_latency": _latency_summary(latencies),
+        }
+
+    # output
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _print(self, results):
+        chat, notifications = results["chat"], results["notifications"]
+        latency = chat["delivery_latency"]
+        self.stdout.write(
+            f"chat: {chat['messages_sent']} messages, {chat['deliveries']} deliveries, "
+            f"{chat['messages_per_s']:.1f} messages/s, "
+            f"{chat['db_queries_per_message']:.2f} queries/message"
+        )
+        self.stdout.write(
+            f"  delivery latency ms p50={latency['p50_ms']:.2f} "
+            f"p95={latency['p95_ms']:.2f} p99={latency['p99_ms']:.2f}"
+        )
+        latency = notifications["delivery_latency"]
+        self.stdout.write(
+            f"notifications: {notifications['notifications_sent']} sent, "
+            f"{notifications['notifications_per_s']:.1f}/s, "
+            f"latency ms p50={latency['p50_ms']:.2f} p95={latency['p95_ms']:.2f} "
+            f"p99={latency['p99_ms']:.2f}"
+        )
+        memory = results["memory"]
+        self.stdout.write(
+            f"memory: tracemalloc peak {memory['tracemalloc_peak_bytes'] / 1024 / 1024:.1f} MB, "
+            f"max RSS {memory['max_rss_kb'] / 1024:.1f} MB"
+        )
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_room_state(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+
+    def unread(sender_field):
+        return Coalesce(
+            Subquery(
+                Message._base_manager.filter(chat_room=OuterRef('pk'), is_read=False)
+                .exclude(sender_id=OuterRef(sender_field))
+                .order_by()
+                .values('chat_room')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+
+    ChatRoom._base_manager.update(
+        last_message=Subquery(
+            Message._base_manager.filter(chat_room=OuterRef('pk'))
+            .order_by('-created_at', '-pk')
+            .values('pk')[:1]
+        ),
+        teacher_unread_count=unread('teacher_id'),
+        student_unread_count=unread('student_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='student_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='teacher_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_room_state, migrations.RunPython.noop),
+    ]
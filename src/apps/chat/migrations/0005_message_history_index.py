@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_room_last_message_unread_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat_room', 'created_at', 'id'], name='Chat_Messag_chat_ro_232b9e_idx'),
+        ),
+    ]
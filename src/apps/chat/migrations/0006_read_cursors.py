@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def derive_read_cursors(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+
+    def newest_read(sender_field):
+        return Coalesce(
+            Subquery(
+                Message._base_manager.filter(
+                    chat_room=OuterRef('pk'), sender_id=OuterRef(sender_field), is_read=True
+                )
+                .order_by()
+                .values('chat_room')
+                .annotate(newest=Max('pk'))
+                .values('newest')
+            ),
+            0,
+        )
+
+    ChatRoom._base_manager.update(
+        teacher_last_read_id=newest_read('student_id'),
+        student_last_read_id=newest_read('teacher_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_message_history_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='student_last_read_id',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='teacher_last_read_id',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(derive_read_cursors, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='chatroom',
+            name='student_unread_count',
+        ),
+        migrations.RemoveField(
+            model_name='chatroom',
+            name='teacher_unread_count',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat_room', 'sender', 'id'], name='Chat_Messag_chat_ro_2d9fcd_idx'),
+        ),
+    ]
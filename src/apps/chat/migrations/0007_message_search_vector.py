@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:39
+
+import django.contrib.postgres.search
+import src.apps.chat.models.search
+from django.db import migrations, models
+
+SEARCH_INDEX = 'Chat_Messages_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    # GIN exists on PostgreSQL only; other backends fall back to LIKE
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX "{SEARCH_INDEX}" ON "Chat_Messages" USING gin ("search_vector")'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{SEARCH_INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_read_cursors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=src.apps.chat.models.search.SearchDocument('content'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
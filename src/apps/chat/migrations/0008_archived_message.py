@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:41
+
+import django.db.models.deletion
+import src.apps.chat.models.message
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_message_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('content', models.TextField()),
+                ('file', models.FileField(blank=True, null=True, upload_to='chat_files/')),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_messages', to='chat.chatroom')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_sent_messages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived message',
+                'verbose_name_plural': 'Archived messages',
+                'db_table': 'Chat_Messages_Archive',
+                'ordering': ('created_at',),
+                'indexes': [models.Index(fields=['chat_room', 'created_at', 'id'], name='Chat_Messag_chat_ro_d26ca9_idx')],
+            },
+            bases=(src.apps.chat.models.message.RecipientReadStateMixin, models.Model),
+        ),
+    ]
@@ -1,4 +1,5 @@
+from .archived_message import ArchivedMessage
 from .chat_room import ChatRoom
 from .message import Message
 
-__all__ = ["ChatRoom", "Message"]
+__all__ = ["ArchivedMessage", "ChatRoom", "Message"]
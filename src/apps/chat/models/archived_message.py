@@ -0,0 +1,37 @@
+from django.db import models
+
+from src.apps.common.models import BaseModel
+from src.apps.users.models import User
+
+from .chat_room import ChatRoom
+from .message import RecipientReadStateMixin
+
+
+class ArchivedMessage(RecipientReadStateMixin, BaseModel):
+    """
+    Messages moved out of ``Chat_Messages`` by ``archive_chat_messages``.
+    Rows keep their original id and timestamps, so read cursors and keyset
+    cursors stay valid for them.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    chat_room = models.ForeignKey(
+        ChatRoom, on_delete=models.CASCADE, related_name="archived_messages"
+    )
+    sender = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_sent_messages"
+    )
+    content = models.TextField()
+    file = models.FileField(upload_to="chat_files/", null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.sender.first_name}: {self.content[:50]}..."
+
+    class Meta:
+        db_table = "Chat_Messages_Archive"
+        verbose_name = "Archived message"
+        verbose_name_plural = "Archived messages"
+        ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["chat_room", "created_at", "id"]),
+        ]
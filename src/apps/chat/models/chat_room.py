@@ -1,12 +1,12 @@
 from django.core.exceptions import ValidationError
 from django.db import models
 
-from src.apps.common.models import BaseModel
+from src.apps.common.models import BaseModel, StoredCountersMixin
 from src.apps.courses.models import Course, CourseEnrollment
 from src.apps.users.models import User
 
 
-class ChatRoom(BaseModel):
+class ChatRoom(StoredCountersMixin, BaseModel):
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name="teacher_chat_rooms")
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="student_chat_rooms")
     course = models.ForeignKey(
@@ -14,6 +14,21 @@ class ChatRoom(BaseModel):
     )
     is_active = models.BooleanField(default=True)
 
+    # Maintained by src.apps.chat.service.rooms
+    last_message = models.ForeignKey(
+        "chat.Message",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    # Read cursors: id of the newest message each participant has read
+    teacher_last_read_id = models.BigIntegerField(default=0, editable=False)
+    student_last_read_id = models.BigIntegerField(default=0, editable=False)
+
+    stored_counter_fields = ("last_message", "teacher_last_read_id", "student_last_read_id")
+
     def clean(self):
         if self.teacher_id and self.student_id:
             # Check if they share any course where one is teacher and other is student
@@ -41,6 +56,22 @@ class ChatRoom(BaseModel):
             f"{max(self.student_id, self.teacher_id)}"
         )
 
+    def last_read_id_for(self, user_id):
+        if user_id == self.teacher_id:
+            return self.teacher_last_read_id
+        if user_id == self.student_id:
+            return self.student_last_read_id
+        return 0
+
+    def unread_count_for(self, user):
+        """Messages from the other participant newer than ``user``'s read cursor."""
+        if user.pk not in (self.teacher_id, self.student_id):
+            return 0
+        other_id = self.student_id if user.pk == self.teacher_id else self.teacher_id
+        return self.messages.filter(
+            sender_id=other_id, id__gt=self.last_read_id_for(user.pk)
+        ).count()
+
     def get_other_user(self, current_user):
         """Get the other participant in the chat"""
         return self.student if current_user == self.teacher else self.teacher
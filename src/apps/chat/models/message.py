@@ -1,23 +1,36 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from src.apps.common.models import BaseModel
 from src.apps.users.models import User
 
 from .chat_room import ChatRoom
+from .search import SearchDocument
 
 
-class Message(BaseModel):
+class RecipientReadStateMixin:
+    @property
+    def is_read(self):
+        """Whether the recipient's read cursor has passed this message."""
+        room = self.chat_room
+        recipient_id = room.student_id if self.sender_id == room.teacher_id else room.teacher_id
+        return self.pk is not None and self.pk <= room.last_read_id_for(recipient_id)
+
+
+class Message(RecipientReadStateMixin, BaseModel):
     chat_room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="messages")
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sent_messages")
     content = models.TextField()
-    is_read = models.BooleanField(default=False)
 
     file = models.FileField(upload_to="chat_files/", null=True, blank=True)
 
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save(update_fields=["is_read"])
+    # Kept current by the database on insert and edit. The GIN index on it is
+    # created by migration 0007 on PostgreSQL only.
+    search_vector = models.GeneratedField(
+        expression=SearchDocument("content"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"{self.sender.first_name}: {self.content[:50]}..."
@@ -27,3 +40,9 @@ class Message(BaseModel):
         verbose_name = "Message"
         verbose_name_plural = "Messages"
         ordering = ("created_at",)
+        indexes = [
+            # keyset history, see MessageModelViewSet.list and ChatConsumer
+            models.Index(fields=["chat_room", "created_at", "id"]),
+            # unread counts: messages of one sender past the reader's cursor
+            models.Index(fields=["chat_room", "sender", "id"]),
+        ]
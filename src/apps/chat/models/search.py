@@ -0,0 +1,25 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Func
+
+SEARCH_CONFIG = "simple"
+
+
+class SearchDocument(Func):
+    """
+    Search document of a text column: ``to_tsvector`` on PostgreSQL and the
+    lower-cased text elsewhere (SQLite test runs, matched with ``LIKE``).
+    Immutable on both, so it can back a stored generated column.
+    """
+
+    function = "LOWER"
+    arity = 1
+    output_field = SearchVectorField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="to_tsvector",
+            template=f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)",
+            **extra_context,
+        )
@@ -0,0 +1,91 @@
+"""
+Rolling hot window for chat messages.
+
+``Chat_Messages`` only keeps recent messages; older ones are moved in
+batches to ``Chat_Messages_Archive`` (``ArchivedMessage``) with an
+``INSERT ... SELECT`` followed by a ``DELETE`` of the same ids, one
+transaction per batch. History, unread counts and search therefore scan a
+table whose size follows the traffic of the window instead of growing
+forever.
+
+A room's ``last_message`` is never archived, so the room list keeps working
+without looking at the archive.
+"""
+
+import statistics
+import time
+
+from django.db import connection, transaction
+
+from src.apps.chat.models import ArchivedMessage, ChatRoom, Message
+
+HOT_WINDOW_DAYS = 180
+DEFAULT_BATCH_SIZE = 2000
+
+
+def archivable_messages(cutoff):
+    last_messages = ChatRoom._base_manager.filter(last_message__isnull=False).values(
+        "last_message_id"
+    )
+    return Message._base_manager.filter(created_at__lt=cutoff).exclude(pk__in=last_messages)
+
+
+def _move(ids):
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in ArchivedMessage._meta.concrete_fields)
+    placeholders = ", ".join(["%s"] * len(ids))
+    source, target = quote(Message._meta.db_table), quote(ArchivedMessage._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {target} ({columns}) "
+            f"SELECT {columns} FROM {source} WHERE id IN ({placeholders})",
+            ids,
+        )
+        # raw DELETE: nothing references these rows, and the post_delete
+        # bookkeeping of Message does not apply to archived messages
+        cursor.execute(f"DELETE FROM {source} WHERE id IN ({placeholders})", ids)
+        return cursor.rowcount
+
+
+def archive_messages(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Move messages older than ``cutoff`` to the archive; yields the size of each batch."""
+    while True:
+        ids = list(
+            archivable_messages(cutoff).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield _move(ids)
+
+
+def table_stats(model):
+    """Row count and, on PostgreSQL, total size in bytes (table, indexes and TOAST)."""
+    stats = {"rows": model._base_manager.count(), "bytes": None}
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            # quoted, or PostgreSQL folds the mixed-case table name to lower case
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+            stats["bytes"] = cursor.fetchone()[0]
+    return stats
+
+
+def recent_history_latency(sample_rooms=20, limit=20, repeats=3):
+    """
+    Median time in milliseconds of the query behind the first history page
+    (``ChatConsumer.get_recent_messages``) over the most recently active rooms.
+    """
+    room_ids = list(
+        ChatRoom._base_manager.order_by("-updated_at").values_list("pk", flat=True)[:sample_rooms]
+    )
+    timings = []
+    for _ in range(repeats):
+        for room_id in room_ids:
+            started = time.perf_counter()
+            list(
+                Message._base_manager.filter(chat_room_id=room_id).order_by("-created_at", "-id")[
+                    :limit
+                ]
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings) if timings else None
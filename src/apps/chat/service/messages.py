@@ -0,0 +1,31 @@
+"""
+Write path of chat messages, shared by ``ChatConsumer`` and the REST API.
+
+Callers validate access to the room once (per connection or per request)
+and pass the room in; sending is then one INSERT of the message plus one
+UPDATE of the room row (``record_message``) guarded by ``is_active``. The
+room is never saved through the model, so ``ChatRoom.clean()`` and its
+shared-course check do not run per message.
+"""
+
+from django.db import transaction
+
+from src.apps.chat.models import Message
+from src.apps.chat.service.rooms import record_message
+
+
+class ChatRoomClosed(Exception):
+    """The room was deactivated or removed after access was checked."""
+
+
+def post_message(room, sender, content, file=None):
+    """Store a message in ``room``; raises ``ChatRoomClosed`` for inactive rooms."""
+    with transaction.atomic():
+        message = Message(chat_room=room, sender=sender, content=content, file=file)
+        # moved here rather than by the post_save signal, so a closed room
+        # rolls the insert back
+        message._room_state_recorded = True
+        message.save(force_insert=True)
+        if not record_message(message):
+            raise ChatRoomClosed(f"Chat room {room.pk} is not active")
+    return message
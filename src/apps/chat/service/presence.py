@@ -0,0 +1,199 @@
+"""
+Online/offline presence of users, shared by every ASGI worker.
+
+Each open WebSocket (chat or notifications) holds one reference on its
+user's presence key; the user is online while the count is above zero. The
+key carries a TTL that the sockets refresh with a heartbeat, so a worker
+that dies without running ``disconnect`` cannot keep its users online for
+longer than ``PRESENCE_TTL``.
+
+Online/offline transitions are collected per event loop and flushed every
+``BROADCAST_DELAY`` seconds: one ``presence_changed`` event per chat room
+that involves any of the changed users, instead of one per room per change.
+
+The backend is chosen by ``settings.PRESENCE_BACKEND``; tests use
+``InMemoryPresenceBackend``.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+from src.apps.chat.models import ChatRoom
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 20
+PRESENCE_TTL = HEARTBEAT_INTERVAL * 3
+BROADCAST_DELAY = 1.0
+KEY_PREFIX = "presence:user"
+DEFAULT_BACKEND = "src.apps.chat.service.presence.RedisPresenceBackend"
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+class RedisPresenceBackend:
+    # DECR and delete the key at zero in one step, so a concurrent connect
+    # can not be wiped out between the two
+    _release_script = """
+        local count = redis.call('DECR', KEYS[1])
+        if count <= 0 then
+            redis.call('DEL', KEYS[1])
+        end
+        return count
+    """
+
+    def __init__(self):
+        self.redis = get_redis_connection("default")
+        self._release = self.redis.register_script(self._release_script)
+
+    def connect(self, user_id):
+        """Add a connection; returns whether the user just came online."""
+        pipe = self.redis.pipeline()
+        pipe.incr(_key(user_id))
+        pipe.expire(_key(user_id), PRESENCE_TTL)
+        count, _ = pipe.execute()
+        return count == 1
+
+    def disconnect(self, user_id):
+        """Drop a connection; returns whether the user just went offline."""
+        return self._release(keys=[_key(user_id)]) <= 0
+
+    def touch(self, user_id):
+        self.redis.expire(_key(user_id), PRESENCE_TTL)
+
+    def lookup(self, user_ids):
+        """``{user_id: online}`` in a single MGET."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        counts = self.redis.mget([_key(user_id) for user_id in user_ids])
+        return {user_id: bool(count and int(count) > 0) for user_id, count in zip(user_ids, counts)}
+
+
+class InMemoryPresenceBackend:
+    """Process-local stand-in for tests and single-process development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # user_id -> (count, expires_at)
+
+    def _count(self, user_id, now):
+        count, expires_at = self._entries.get(user_id, (0, 0))
+        return count if expires_at > now else 0
+
+    def connect(self, user_id):
+        with self._lock:
+            now = time.monotonic()
+            count = self._count(user_id, now) + 1
+            self._entries[user_id] = (count, now + PRESENCE_TTL)
+        return count == 1
+
+    def disconnect(self, user_id):
+        with self._lock:
+            now = time.monotonic()
+            count = self._count(user_id, now) - 1
+            if count <= 0:
+                self._entries.pop(user_id, None)
+                return True
+            self._entries[user_id] = (count, self._entries[user_id][1])
+        return False
+
+    def touch(self, user_id):
+        with self._lock:
+            if user_id in self._entries:
+                count, _ = self._entries[user_id]
+                self._entries[user_id] = (count, time.monotonic() + PRESENCE_TTL)
+
+    def lookup(self, user_ids):
+        with self._lock:
+            now = time.monotonic()
+            return {user_id: self._count(user_id, now) > 0 for user_id in user_ids}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_backends = {}
+
+
+def get_backend():
+    path = getattr(settings, "PRESENCE_BACKEND", DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def lookup(user_ids):
+    return get_backend().lookup(user_ids)
+
+
+def rooms_by_user(user_ids):
+    """``{room_id: [participant ids]}`` of the active rooms involving ``user_ids``."""
+    rooms = ChatRoom.objects.filter(
+        Q(teacher_id__in=user_ids) | Q(student_id__in=user_ids), is_active=True
+    ).values_list("pk", "teacher_id", "student_id")
+    return {pk: [teacher_id, student_id] for pk, teacher_id, student_id in rooms}
+
+
+class PresenceBroadcaster:
+    """Coalesces presence transitions of one event loop into per-room events."""
+
+    def __init__(self, delay=BROADCAST_DELAY):
+        self.delay = delay
+        self.changed = set()
+        self.task = None
+
+    def push(self, user_id):
+        self.changed.add(user_id)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        changed, self.changed, self.task = self.changed, set(), None
+        try:
+            await self.flush(changed)
+        except Exception:
+            logger.exception("Failed to broadcast presence of users %s", sorted(changed))
+
+    @staticmethod
+    async def flush(user_ids):
+        # read the state again: a user may have flapped back within the window
+        states = await sync_to_async(lookup)(user_ids)
+        rooms = await database_sync_to_async(rooms_by_user)(list(user_ids))
+        channel_layer = get_channel_layer()
+        for room_id, participants in rooms.items():
+            users = [
+                {"user_id": user_id, "online": states[user_id]}
+                for user_id in participants
+                if user_id in states
+            ]
+            await channel_layer.group_send(
+                f"chat_room_{room_id}", {"type": "presence_changed", "users": users}
+            )
+
+
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster():
+    loop = asyncio.get_running_loop()
+    if loop not in _broadcasters:
+        _broadcasters[loop] = PresenceBroadcaster(
+            getattr(settings, "PRESENCE_BROADCAST_DELAY", BROADCAST_DELAY)
+        )
+    return _broadcasters[loop]
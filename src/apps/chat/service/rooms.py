@@ -0,0 +1,106 @@
+"""
+Denormalized chat room state stored on ``ChatRoom``: ``last_message`` and one
+read cursor per participant.
+
+New messages move ``last_message`` with a single UPDATE of the room row
+(``record_message``, called by ``post_message`` or, for messages created
+elsewhere, by the ``post_save`` signal). A read cursor is the id of the
+newest message the participant has read; everything at or below it counts
+as read. Marking as read is therefore one conditional UPDATE
+that only ever moves the cursor forward, and the unread count is a range
+count over the ``(chat_room, sender, id)`` index.
+"""
+
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce
+
+from src.apps.chat.models import ChatRoom, Message
+
+
+def _cursor_field(room, user_id):
+    """The read cursor of the participant ``user_id`` of ``room``, or ``None``."""
+    if user_id == room.teacher_id:
+        return "teacher_last_read_id"
+    if user_id == room.student_id:
+        return "student_last_read_id"
+    return None
+
+
+def record_message(message):
+    """Point the room at ``message``. Returns 0 if the room is no longer active."""
+    return ChatRoom._base_manager.filter(pk=message.chat_room_id, is_active=True).update(
+        last_message=message,
+        updated_at=message.created_at,
+    )
+
+
+def mark_read(room, user, up_to_id=None):
+    """
+    Move ``user``'s read cursor in ``room`` forward to ``up_to_id`` (the
+    room's last message by default). Returns the new cursor, or ``None``
+    when it did not move.
+    """
+    field = _cursor_field(room, user.pk)
+    if up_to_id is None:
+        up_to_id = room.last_message_id
+    if field is None or up_to_id is None:
+        return None
+    moved = ChatRoom._base_manager.filter(pk=room.pk, **{f"{field}__lt": up_to_id}).update(
+        **{field: up_to_id}
+    )
+    if not moved:
+        return None
+    setattr(room, field, up_to_id)
+    return up_to_id
+
+
+def _unread_subquery(cursor_field, sender_field):
+    counted = (
+        Message.objects.filter(
+            chat_room=OuterRef("pk"),
+            sender_id=OuterRef(sender_field),
+            id__gt=OuterRef(cursor_field),
+        )
+        .order_by()
+        .values("chat_room")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted), 0)
+
+
+def with_unread_count(rooms, user):
+    """Annotate ``unread_count`` of ``user`` on a queryset of their rooms."""
+    return rooms.annotate(
+        unread_count=Case(
+            When(
+                teacher_id=user.pk,
+                then=_unread_subquery("teacher_last_read_id", "student_id"),
+            ),
+            default=_unread_subquery("student_last_read_id", "teacher_id"),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def _latest_message():
+    return Subquery(
+        Message.objects.filter(chat_room=OuterRef("pk"))
+        .order_by("-created_at", "-pk")
+        .values("pk")[:1]
+    )
+
+
+def refresh_rooms(room_ids):
+    """Recompute ``last_message`` of the given rooms."""
+    room_ids = {pk for pk in room_ids if pk is not None}
+    if not room_ids:
+        return 0
+    return ChatRoom._base_manager.filter(pk__in=room_ids).update(last_message=_latest_message())
+
+
+def forget_message(message):
+    """Called after ``message`` was deleted: move ``last_message`` back if needed."""
+    ChatRoom._base_manager.filter(pk=message.chat_room_id, last_message=None).update(
+        last_message=_latest_message()
+    )
@@ -0,0 +1,69 @@
+"""
+Full-text search over chat messages.
+
+On PostgreSQL messages are matched against the generated ``search_vector``
+column (GIN indexed) with ``websearch_to_tsquery`` and snippets come from
+``ts_headline``. Other backends (SQLite test runs) fall back to a
+case-insensitive substring match and build the snippet in Python.
+
+Matches in snippets are wrapped in ``HIGHLIGHT_START``/``HIGHLIGHT_STOP``
+control characters; ``render_snippet`` escapes the text and turns them into
+``<mark>`` tags, so message content can never inject markup.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery
+from django.db import connection
+from django.utils.html import escape
+
+from src.apps.chat.models.search import SEARCH_CONFIG
+
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+SNIPPET_RADIUS = 60
+MIN_QUERY_LENGTH = 2
+
+
+def search_messages(messages, query):
+    """
+    Filter ``messages`` (already scoped to the reader's rooms) to hits for
+    ``query``; on PostgreSQL every hit is annotated with ``snippet``.
+    """
+    if connection.vendor != "postgresql":
+        return messages.filter(content__icontains=query)
+
+    search = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    return messages.filter(search_vector=search).annotate(
+        snippet=SearchHeadline(
+            "content",
+            search,
+            config=SEARCH_CONFIG,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_STOP,
+            max_fragments=2,
+        )
+    )
+
+
+def _fallback_snippet(content, query):
+    match = re.search(re.escape(query), content, flags=re.IGNORECASE)
+    if match is None:
+        return content[: SNIPPET_RADIUS * 2]
+    start = max(match.start() - SNIPPET_RADIUS, 0)
+    end = match.end() + SNIPPET_RADIUS
+    return (
+        content[start : match.start()]
+        + HIGHLIGHT_START
+        + match.group()
+        + HIGHLIGHT_STOP
+        + content[match.end() : end]
+    )
+
+
+def render_snippet(message, query):
+    """HTML-safe snippet of ``message`` with the matches wrapped in ``<mark>``."""
+    snippet = getattr(message, "snippet", None)
+    if snippet is None:
+        snippet = _fallback_snippet(message.content, query)
+    return escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
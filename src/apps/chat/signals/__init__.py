@@ -0,0 +1 @@
+from .update_room_state import track_room_state, untrack_room_state
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.apps.chat.models import Message
+from src.apps.chat.service.rooms import forget_message, record_message
+
+
+@receiver(post_save, sender=Message)
+def track_room_state(sender, instance, created, raw=False, **kwargs):
+    # post_message records its messages itself, inside its transaction
+    if created and not raw and not getattr(instance, "_room_state_recorded", False):
+        record_message(instance)
+
+
+@receiver(post_delete, sender=Message)
+def untrack_room_state(sender, instance, **kwargs):
+    forget_message(instance)
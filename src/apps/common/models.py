@@ -8,3 +8,30 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class StoredCountersMixin(models.Model):
+    """
+    Columns listed in ``stored_counter_fields`` are maintained with UPDATE
+    statements elsewhere, so a plain ``save()`` of an already-loaded instance
+    must not write its possibly stale copy of them back.
+    """
+
+    stored_counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            self.stored_counter_fields
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.stored_counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,219 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a stable, unique ordering such as
+    ``("-created_at", "-id")``.
+
+    Pages are addressed by an opaque cursor holding the ordering values of the
+    last/first row of the previous page, so every page is a single indexed
+    range scan: there is no OFFSET and no ``COUNT(*)``. The ordering fields must
+    be non-null and the last one must be unique (normally ``id``).
+
+    Clients opt in with ``?pagination=cursor``; without it ``paginate_queryset``
+    returns ``None`` and the caller keeps serving the full list.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    mode_value = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.request = None
+        self.base_url = None
+        self.has_next = False
+        self.has_previous = False
+        self.first_values = None
+        self.last_values = None
+
+    @classmethod
+    def is_requested(cls, request):
+        return request.query_params.get(cls.mode_query_param) == cls.mode_value
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        values, reverse = self.decode_cursor(encoded) if encoded else (None, False)
+
+        rows, has_more = self._fetch(queryset, values, reverse, page_size)
+        if reverse:
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        if rows:
+            self.first_values = self._row_values(rows[0])
+            self.last_values = self._row_values(rows[-1])
+        return rows
+
+    def paginate_forward(self, queryset, encoded=None, page_size=None):
+        """
+        Request-free, forward-only variant for callers such as WebSocket
+        consumers. Returns ``(rows, next_cursor)``; ``next_cursor`` is ``None``
+        on the last page.
+        """
+        page_size = max(1, min(page_size or self.page_size, self.max_page_size))
+        values = self.decode_cursor(encoded)[0] if encoded else None
+        rows, has_more = self._fetch(queryset, values, False, page_size)
+        next_cursor = self.cursor_for(rows[-1]) if has_more else None
+        return rows, next_cursor
+
+    def cursor_for(self, obj):
+        """Forward cursor that resumes right after ``obj``."""
+        return self.encode_cursor(self._row_values(obj), False)
+
+    def _fetch(self, queryset, values, reverse, page_size):
+        ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if values is None:
+            rows = list(queryset[: page_size + 1])
+        else:
+            # the values come from the client and may not fit the ordering fields
+            try:
+                queryset = queryset.filter(self._seek_filter(ordering, values))
+                rows = list(queryset[: page_size + 1])
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+        return rows, has_more
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.last_values, False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_values is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.first_values, True)
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # cursor encoding
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"v": values, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, encoded):
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, reverse = payload["v"], bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    # helpers
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _seek_filter(ordering, values):
+        """(a, b, c) > (x, y, z) expanded per column so mixed directions work."""
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            branch = Q(**{f"{name}__{lookup}": values[index]})
+            for previous_field, previous_value in zip(ordering[:index], values[:index]):
+                branch &= Q(**{previous_field.lstrip("-"): previous_value})
+            condition |= branch
+        return condition
+
+    def _row_values(self, obj):
+        values = []
+        for field in self.ordering:
+            value = obj
+            for part in field.lstrip("-").split("__"):
+                value = getattr(value, part)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+        return values
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for custom list actions, mirroring
+    ``paginate_queryset``/``get_paginated_response`` on generic views::
+
+        page = self.paginate_keyset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_keyset_paginated_response(serializer.data)
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_keyset(self, queryset, ordering=None):
+        self._keyset_paginator = self.keyset_pagination_class(ordering=ordering)
+        return self._keyset_paginator.paginate_queryset(queryset, self.request, view=self)
+
+    def get_keyset_paginated_response(self, data):
+        return self._keyset_paginator.get_paginated_response(data)
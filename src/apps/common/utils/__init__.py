@@ -6,6 +6,7 @@ from .other import (
     default_expire_date,
     generate_random_code
 )
+from .queries import QueryCounter
 from .validators import validate_image_size
 from .files import (
     unique_file_path,
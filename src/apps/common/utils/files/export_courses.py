@@ -1,41 +1,41 @@
 import logging
-from io import BytesIO
-from urllib.parse import quote
 
-import pandas as pd
-from django.http import FileResponse, HttpResponse
 from django.utils import timezone
 
+from src.apps.common.utils.files.streaming import stream_csv, stream_xlsx
+
 logger = logging.getLogger(__name__)
 
+# Same columns, in the same order, as CourseExportSerializer.
+COURSE_EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("name", "name"),
+    ("description", "description"),
+    ("author_first_name", "author__first_name"),
+    ("author_last_name", "author__last_name"),
+    ("free_order", "free_order"),
+    ("category", "category__name"),
+    ("deadline_to_finish_course", "deadline_to_finish_course"),
+    ("block_course_after_deadline", "block_course_after_deadline"),
+    ("is_certificated", "is_certificated"),
+    ("students_count", "students_count"),
+    ("teachers_count", "teachers_count"),
+    ("groups_count", "groups_count"),
+    ("tasks_count", "tasks_count"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
 
-def export_courses_to_csv(data):
-    df = pd.DataFrame(data)
-    df = df.where(pd.notnull(df), None)
+def export_courses_to_csv(queryset):
     filename = f"courses-{timezone.now()}.csv"
-    quoted_filename = quote(filename)
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = (
-        f'attachment; filename="{filename}"; ' f"filename*=UTF-8''{quoted_filename}"
-    )
-    df.to_csv(path_or_buf=response, index=False, encoding="utf-8-sig")
-    logger.info(f"courses.course.export. Wrote {filename} to {quoted_filename}")
+    response = stream_csv(queryset, COURSE_EXPORT_COLUMNS, filename)
+    logger.info(f"courses.course.export. Streaming {filename}")
     return response
 
 
-def export_courses_to_xlsx(data):
-    output = BytesIO()
-    df = pd.DataFrame(data)
-    df = df.where(pd.notnull(df), None)
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Users")
-    output.seek(0)
+def export_courses_to_xlsx(queryset):
     filename = f"courses-{timezone.now()}.xlsx"
-    quoted_filename = quote(filename)
-    response = FileResponse(output, as_attachment=True, filename=filename)
-    response["Content-Type"] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    response["Content-Disposition"] = (
-        f"attachment; " f"filename=\"{filename}\"; filename*=UTF-8''{quoted_filename}"
-    )
-    logger.info(f"courses.course.export. Wrote {filename} to {quoted_filename}")
+    response = stream_xlsx(queryset, COURSE_EXPORT_COLUMNS, filename, sheet_name="Users")
+    logger.info(f"courses.course.export. Wrote {filename}")
     return response
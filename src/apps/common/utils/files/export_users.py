@@ -1,36 +1,34 @@
-from io import BytesIO
-from urllib.parse import quote
-
-import pandas as pd
-from django.http import FileResponse, HttpResponse
 from django.utils import timezone
 
+from src.apps.common.utils.files.streaming import stream_csv, stream_xlsx
+
+# Same columns, in the same order, as ExportUserSerializer.
+USER_EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("email", "email"),
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("role", "role"),
+    ("is_active", "is_active"),
+    ("is_superuser", "is_superuser"),
+    ("email_verified", "email_verified"),
+    ("must_set_password", "must_set_password"),
+    ("date_joined", "date_joined"),
+    ("last_login", "last_login"),
+    ("middle_name", "profile__middle_name"),
+    ("interface_language", "profile__interface_language"),
+    ("timezone", "profile__timezone"),
+    ("birth_date", "profile__birth_date"),
+    ("phone_number", "profile__phone_number"),
+    ("company", "profile__company"),
+]
+
 
-def export_users_to_csv(data):
-    df = pd.DataFrame(data)
-    df = df.where(pd.notnull(df), None)
+def export_users_to_csv(queryset):
     filename = f"users-list-{timezone.now()}.csv"
-    quoted_filename = quote(filename)
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = (
-        f'attachment; filename="{filename}"; ' f"filename*=UTF-8''{quoted_filename}"
-    )
-    df.to_csv(path_or_buf=response, index=False, encoding="utf-8-sig")
-    return response
+    return stream_csv(queryset, USER_EXPORT_COLUMNS, filename)
 
 
-def export_users_to_xlsx(data):
-    output = BytesIO()
-    df = pd.DataFrame(data)
-    df = df.where(pd.notnull(df), None)
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Users")
-    output.seek(0)
+def export_users_to_xlsx(queryset):
     filename = f"users-list-{timezone.now()}.xlsx"
-    quoted_filename = quote(filename)
-    response = FileResponse(output, as_attachment=True, filename=filename)
-    response["Content-Type"] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    response["Content-Disposition"] = (
-        f"attachment; " f"filename=\"{filename}\"; filename*=UTF-8''{quoted_filename}"
-    )
-    return response
+    return stream_xlsx(queryset, USER_EXPORT_COLUMNS, filename, sheet_name="Users")
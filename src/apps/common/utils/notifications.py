@@ -20,44 +20,20 @@ def send_realtime_status_notification(notification: Notification):
 # Integration function to work with your existing notification system
 def send_status_change_email_helper(notification_instance):
     """
-    Helper function to extract data from notification and send email
+    Helper function to send the status email from the notification's structured data
     """
     user = notification_instance.receiver
-
-    # Extract task info from notification title
-    title_parts = notification_instance.title.split()
-    task_number = None
-    task_name = None
-
-    # Parse task number and name from title
-    for i, part in enumerate(title_parts):
-        if part.startswith("Task") and i + 1 < len(title_parts):
-            task_info = " ".join(title_parts[i + 1 :]).split(" has been")[0]
-            if task_info and "." in task_info:
-                number_part, name_part = task_info.split(".", 1)
-                task_number = number_part.strip()
-                task_name = name_part.strip()
-            break
-
-    # Determine status from notification content
-    status = "have_flaws"  # default
-    if "approved" in notification_instance.content.lower():
-        status = "approved"
-    elif "rejected" in notification_instance.content.lower():
-        status = "rejected"
-    elif (
-        "issues" in notification_instance.content.lower()
-        or "flaws" in notification_instance.content.lower()
-    ):
-        status = "have_flaws"
+    data = notification_instance.data
+    task_number = data.get("task_number")
+    task_name = data.get("task_name")
 
     # Send the email
-    if user.email and user.first_name and task_number and task_name:
+    if user.email and user.first_name and task_number is not None and task_name:
         send_answer_status_notification(
             receiver_email=user.email,
             first_name=user.first_name,
             task_name=task_name,
             task_number=task_number,
-            status=status,
+            status=data.get("status", "have_flaws"),
             feedback_text=notification_instance.feedback,
         )
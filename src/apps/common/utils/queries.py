@@ -0,0 +1,9 @@
+class QueryCounter:
+    """``connection.execute_wrapper`` that counts the queries run through it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
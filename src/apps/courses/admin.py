@@ -40,7 +40,15 @@ class CourseAdmin(ModelAdmin):
         "author__last_name",
         "category__name",
     ]
-    readonly_fields = ("id", "created_at", "updated_at")
+    readonly_fields = (
+        "id",
+        "students_count",
+        "teachers_count",
+        "groups_count",
+        "tasks_count",
+        "created_at",
+        "updated_at",
+    )
     list_per_page = 25
     list_select_related = ["category", "author"]
     raw_id_fields = ["author", "category"]
@@ -61,6 +69,9 @@ class CourseAdmin(ModelAdmin):
         ("Deadline", {
             "fields": ("deadline_to_finish_course",)
         }),
+        ("Counters", {
+            "fields": ("students_count", "teachers_count", "groups_count", "tasks_count")
+        }),
         ("Dates", {
             "fields": ("created_at", "updated_at")
         }),
@@ -97,7 +108,14 @@ class CourseGroupAdmin(ModelAdmin):
         "course__name",
         "registration_token",
     ]
-    readonly_fields = ("id", "created_at", "updated_at", "registration_token")
+    readonly_fields = (
+        "id",
+        "created_at",
+        "updated_at",
+        "registration_token",
+        "members_count",
+        "students_count",
+    )
     list_per_page = 25
     list_select_related = ["course"]
     raw_id_fields = ["course"]
@@ -119,7 +137,7 @@ class CourseGroupAdmin(ModelAdmin):
             "fields": ("days_of_week",)
         }),
         ("Status", {
-            "fields": ("is_active",)
+            "fields": ("is_active", "members_count", "students_count")
         }),
         ("Dates", {
             "fields": ("created_at", "updated_at")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.apps.courses"
+
+    def ready(self):
+        from .signals import invalidate_course_lists, update_counters, update_progress  # noqa E402
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from src.apps.courses.models import Course
+from src.apps.courses.service.counters import rebuild_all_counters
+from src.apps.courses.service.progress import refresh_progress
+
+
+class Command(BaseCommand):
+    help = "Recount the stored course/group counters and per-enrollment progress"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of rows recounted per UPDATE (default: 500)",
+        )
+        parser.add_argument(
+            "--skip-progress",
+            action="store_true",
+            help="Only recount course/group counters",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        courses, groups = rebuild_all_counters(chunk_size=chunk_size)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt counters for {courses} courses and {groups} groups")
+        )
+        if options["skip_progress"]:
+            return
+
+        enrollments = 0
+        course_ids = list(Course._base_manager.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(course_ids), chunk_size):
+            enrollments += refresh_progress(course_ids[start : start + chunk_size])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt progress for {enrollments} enrollments"))
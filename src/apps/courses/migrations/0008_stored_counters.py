@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, parent_field, distinct_field='pk'):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{parent_field: OuterRef('pk')})
+            .order_by()
+            .values(parent_field)
+            .annotate(total=Count(distinct_field, distinct=True))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseGroup = apps.get_model('courses', 'CourseGroup')
+    CourseEnrollment = apps.get_model('courses', 'CourseEnrollment')
+    Task = apps.get_model('assignments', 'Task')
+
+    enrollments = CourseEnrollment._base_manager.all()
+    Course._base_manager.update(
+        students_count=_count(enrollments.filter(role='student'), 'course', 'user'),
+        teachers_count=_count(enrollments.filter(role='teacher'), 'course', 'user'),
+        groups_count=_count(CourseGroup._base_manager.filter(is_deleted=False), 'course'),
+        tasks_count=_count(Task._base_manager.filter(is_deleted=False), 'course'),
+    )
+    CourseGroup._base_manager.update(
+        members_count=_count(enrollments, 'group'),
+        students_count=_count(enrollments.filter(role='student'), 'group'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0007_alter_task_options'),
+        ('courses', '0007_remove_coursegroup_teacher'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='groups_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='students_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='teachers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coursegroup',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coursegroup',
+            name='students_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
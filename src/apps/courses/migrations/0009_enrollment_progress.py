@@ -0,0 +1,125 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:02
+
+from django.db import migrations, models
+from django.db.models import (
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+
+def backfill_progress(apps, schema_editor):
+    CourseEnrollment = apps.get_model('courses', 'CourseEnrollment')
+    Task = apps.get_model('assignments', 'Task')
+    Answer = apps.get_model('submissions', 'Answer')
+    Grade = apps.get_model('grades', 'Grade')
+
+    answers = Answer._base_manager.filter(
+        user=OuterRef('user_id'),
+        task__course=OuterRef('course_id'),
+        task__is_deleted=False,
+        is_deleted=False,
+    ).order_by()
+    grades = Grade._base_manager.filter(
+        answer__user=OuterRef('user_id'),
+        answer__task__course=OuterRef('course_id'),
+        answer__task__is_deleted=False,
+        answer__is_deleted=False,
+    ).order_by()
+    tasks = Coalesce(
+        Subquery(
+            Task._base_manager.filter(course=OuterRef('course_id'), is_deleted=False)
+            .order_by()
+            .values('course')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+    students = CourseEnrollment._base_manager.filter(role='student')
+    students.update(
+        approved_tasks_count=Coalesce(
+            Subquery(
+                answers.filter(status='approved')
+                .values('user')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0,
+        ),
+        total_points=Coalesce(
+            Subquery(grades.values('answer__user').annotate(total=Sum('score')).values('total')),
+            0,
+        ),
+        started_at=Subquery(
+            answers.values('user').annotate(first=Min('created_at')).values('first')
+        ),
+    )
+    approved = F('approved_tasks_count')
+    students.update(
+        progress=Case(
+            When(
+                GreaterThanOrEqual(tasks, 1),
+                then=Least(
+                    ExpressionWrapper(approved * Value(100.0) / tasks, output_field=FloatField()),
+                    Value(100.0),
+                ),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        finished_at=Case(
+            When(GreaterThanOrEqual(approved, Greatest(tasks, 1)), then=Value(timezone.now())),
+            default=Value(None),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_stored_counters'),
+        ('grades', '0004_alter_grade_feedback_text'),
+        ('submissions', '0003_alter_answerfile_options_answerfile_content_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courseenrollment',
+            name='approved_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='courseenrollment',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='courseenrollment',
+            name='progress',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='courseenrollment',
+            name='started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='courseenrollment',
+            name='total_points',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_enrollment_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courseenrollment',
+            index=models.Index(fields=['group', 'role'], name='Course Enro_group_i_e7be4f_idx'),
+        ),
+    ]
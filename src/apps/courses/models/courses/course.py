@@ -1,7 +1,7 @@
 from django.core.validators import FileExtensionValidator
 from django.db import models
 
-from src.apps.common.models import BaseModel
+from src.apps.common.models import BaseModel, StoredCountersMixin
 from src.apps.common.utils import unique_image_path, validate_image_size
 from src.apps.courses.models import Category
 from src.apps.users.models import User
@@ -9,7 +9,7 @@ from src.apps.users.models import User
 from .manager import ActiveCourseManager
 
 
-class Course(BaseModel):
+class Course(StoredCountersMixin, BaseModel):
     name = models.CharField(max_length=100)
     description = models.TextField()
     category = models.ForeignKey(
@@ -38,6 +38,14 @@ class Course(BaseModel):
     allow_teachers_to_manage_tasks = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
 
+    # Maintained by src.apps.courses.service.counters
+    students_count = models.PositiveIntegerField(default=0, editable=False)
+    teachers_count = models.PositiveIntegerField(default=0, editable=False)
+    groups_count = models.PositiveIntegerField(default=0, editable=False)
+    tasks_count = models.PositiveIntegerField(default=0, editable=False)
+
+    stored_counter_fields = ("students_count", "teachers_count", "groups_count", "tasks_count")
+
     objects = ActiveCourseManager()
 
     def __str__(self):
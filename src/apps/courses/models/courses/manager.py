@@ -4,3 +4,51 @@ from django.db import models
 class ActiveCourseManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
+
+
+class CounterAwareQuerySet(models.QuerySet):
+    """
+    ``bulk_create`` and ``update`` bypass model signals, so the stored counters on
+    the parent Course/CourseGroup rows are recounted once after such writes.
+    """
+
+    course_field = "course"
+    group_field = None
+    tracked_fields = frozenset()
+
+    def _parent_fields(self):
+        return [field for field in (self.course_field, self.group_field) if field]
+
+    def _touch(self, course_ids, group_ids=()):
+        from src.apps.courses.service.counters import touch
+
+        touch(course_ids=course_ids, group_ids=group_ids)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        course_ids = {getattr(obj, f"{self.course_field}_id") for obj in objs}
+        group_ids = (
+            {getattr(obj, f"{self.group_field}_id") for obj in objs} if self.group_field else ()
+        )
+        self._touch(course_ids, group_ids)
+        return objs
+
+    def update(self, **kwargs):
+        if not self.tracked_fields.intersection(kwargs):
+            return super().update(**kwargs)
+
+        parent_fields = self._parent_fields()
+        before = list(self.order_by().values_list(*parent_fields).distinct())
+        rows = super().update(**kwargs)
+
+        touched = [set(), set()]
+        for values in before:
+            for index, value in enumerate(values):
+                touched[index].add(value)
+        for index, field in enumerate(parent_fields):
+            for key in (field, f"{field}_id"):
+                if key in kwargs:
+                    value = kwargs[key]
+                    touched[index].add(getattr(value, "pk", value))
+        self._touch(touched[0], touched[1])
+        return rows
@@ -1,12 +1,14 @@
 from django.db import models
 from django.db.models import Q
 
+from src.apps.common.models import StoredCountersMixin
 from src.apps.courses.models import Course
 from src.apps.courses.models.groups.course_groups import CourseGroup
+from src.apps.courses.models.groups.manager import CourseEnrollmentQuerySet
 from src.apps.users.models import User
 
 
-class CourseEnrollment(models.Model):
+class CourseEnrollment(StoredCountersMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="enrollments")
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="enrollments")
     group = models.ForeignKey(CourseGroup, on_delete=models.CASCADE, related_name="members")
@@ -17,6 +19,23 @@ class CourseEnrollment(models.Model):
     )
     enrolled_date = models.DateTimeField(auto_now_add=True)
 
+    # Student progress, maintained by src.apps.courses.service.progress
+    approved_tasks_count = models.PositiveIntegerField(default=0, editable=False)
+    total_points = models.PositiveIntegerField(default=0, editable=False)
+    progress = models.FloatField(default=0.0, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    stored_counter_fields = (
+        "approved_tasks_count",
+        "total_points",
+        "progress",
+        "started_at",
+        "finished_at",
+    )
+
+    objects = CourseEnrollmentQuerySet.as_manager()
+
     def __str__(self):
         return (
             f"Enrollment for '{self.course.name}, {self.course.description[:20]}...'"
@@ -28,6 +47,10 @@ class CourseEnrollment(models.Model):
         db_table = "Course Enrollments"
         verbose_name = "Course Enrollment"
         verbose_name_plural = "Course Enrollments"
+        indexes = [
+            # students of a group, see src.apps.courses.service.scope
+            models.Index(fields=["group", "role"]),
+        ]
         # Replace old unique_together with conditional constraints:
         constraints = [
             # Students can be in only one group per course
@@ -5,7 +5,7 @@ from decouple import config
 from django.db import models
 from django.utils import timezone
 
-from src.apps.common.models import BaseModel
+from src.apps.common.models import BaseModel, StoredCountersMixin
 from src.apps.common.validators import validate_days_of_week
 from src.apps.courses.models.courses import Course
 from src.apps.users.models import User
@@ -13,7 +13,7 @@ from src.apps.users.models import User
 from .manager import CourseGroupManager
 
 
-class CourseGroup(BaseModel):
+class CourseGroup(StoredCountersMixin, BaseModel):
     name = models.CharField(max_length=100)
     course = models.ForeignKey(
         Course, on_delete=models.CASCADE, related_name="groups"
@@ -43,6 +43,12 @@ class CourseGroup(BaseModel):
     )
     is_active = models.BooleanField(default=True)
 
+    # Maintained by src.apps.courses.service.counters
+    members_count = models.PositiveIntegerField(default=0, editable=False)
+    students_count = models.PositiveIntegerField(default=0, editable=False)
+
+    stored_counter_fields = ("members_count", "students_count")
+
     objects = CourseGroupManager()
 
     def generate_unique_token(self, hours_valid=None, days_valid=None):
@@ -82,6 +88,7 @@ class CourseGroup(BaseModel):
 
     @property
     def teachers(self):
+        """Per-group query; list endpoints use ``CourseGroup.objects.with_teachers()`` instead."""
         return (
             User.objects.select_related("profile")
             .filter(enrollments__group=self, enrollments__role="teacher")
@@ -1,6 +1,61 @@
 from django.db import models
+from django.db.models import Prefetch
 
+from src.apps.courses.models.courses.manager import CounterAwareQuerySet
 
-class CourseGroupManager(models.Manager):
+
+def teachers_prefetch(lookup="members"):
+    """
+    Load the teacher enrollments (with user and profile) of every group reached
+    through ``lookup`` in one query, stored as ``group.teacher_enrollments``.
+    """
+    from src.apps.courses.models import CourseEnrollment
+
+    return Prefetch(
+        lookup,
+        queryset=CourseEnrollment.objects.filter(role="teacher")
+        .select_related("user__profile")
+        .order_by("enrolled_date", "id"),
+        to_attr="teacher_enrollments",
+    )
+
+
+class CourseGroupQuerySet(CounterAwareQuerySet):
+    tracked_fields = frozenset({"course", "course_id", "is_deleted"})
+
+    def with_teachers(self):
+        return self.prefetch_related(teachers_prefetch())
+
+
+class CourseGroupManager(models.Manager.from_queryset(CourseGroupQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
+
+
+class CourseEnrollmentQuerySet(CounterAwareQuerySet):
+    group_field = "group"
+    tracked_fields = frozenset({"course", "course_id", "group", "group_id", "role"})
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from src.apps.courses.service.list_cache import bump_users
+        from src.apps.courses.service.progress import refresh_progress
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_users({obj.user_id for obj in objs})
+        students = [obj for obj in objs if obj.role == "student"]
+        if students:
+            refresh_progress(
+                {obj.course_id for obj in students},
+                user_ids={obj.user_id for obj in students},
+            )
+        return objs
+
+    def update(self, **kwargs):
+        from src.apps.courses.service.list_cache import bump_users
+
+        if self.tracked_fields.intersection(kwargs) or {"user", "user_id"}.intersection(kwargs):
+            bump_users(set(self.order_by().values_list("user_id", flat=True)))
+            user = kwargs.get("user", kwargs.get("user_id"))
+            if user is not None:
+                bump_users([getattr(user, "pk", user)])
+        return super().update(**kwargs)
@@ -0,0 +1,194 @@
+"""
+Stored counters on ``Course`` and ``CourseGroup``.
+
+Single-row writes are applied as +/-1 deltas from the signals in
+``src.apps.courses.signals``. Bulk writes (``bulk_create``/``update``) and code
+running inside ``deferred_counters()`` recount the touched rows once with a
+set-based UPDATE instead.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from src.apps.assignments.models import Task
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+COURSE_COUNTER_FIELDS = ("students_count", "teachers_count", "groups_count", "tasks_count")
+GROUP_COUNTER_FIELDS = ("members_count", "students_count")
+
+
+def _count_subquery(queryset, parent_field, distinct_field="pk"):
+    counted = (
+        queryset.filter(**{parent_field: OuterRef("pk")})
+        .order_by()
+        .values(parent_field)
+        .annotate(total=Count(distinct_field, distinct=True))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted), 0)
+
+
+def _course_counter_expressions():
+    return {
+        "students_count": _count_subquery(
+            CourseEnrollment.objects.filter(role="student"), "course", "user"
+        ),
+        "teachers_count": _count_subquery(
+            CourseEnrollment.objects.filter(role="teacher"), "course", "user"
+        ),
+        "groups_count": _count_subquery(CourseGroup.objects.all(), "course"),
+        "tasks_count": _count_subquery(Task.objects.all(), "course"),
+    }
+
+
+def _group_counter_expressions():
+    return {
+        "members_count": _count_subquery(CourseEnrollment.objects.all(), "group"),
+        "students_count": _count_subquery(CourseEnrollment.objects.filter(role="student"), "group"),
+    }
+
+
+def _clean_ids(ids):
+    return {pk for pk in ids if pk is not None}
+
+
+def refresh_course_counters(course_ids, fields=COURSE_COUNTER_FIELDS):
+    """Recount the given courses in a single UPDATE."""
+    course_ids = _clean_ids(course_ids)
+    if not course_ids:
+        return 0
+    expressions = _course_counter_expressions()
+    return Course._base_manager.filter(pk__in=course_ids).update(
+        **{field: expressions[field] for field in fields}
+    )
+
+
+def refresh_group_counters(group_ids, fields=GROUP_COUNTER_FIELDS):
+    """Recount the given groups in a single UPDATE."""
+    group_ids = _clean_ids(group_ids)
+    if not group_ids:
+        return 0
+    expressions = _group_counter_expressions()
+    return CourseGroup._base_manager.filter(pk__in=group_ids).update(
+        **{field: expressions[field] for field in fields}
+    )
+
+
+def rebuild_all_counters(chunk_size=500):
+    """Recount every course and group (deleted ones included). Returns (courses, groups)."""
+    courses = groups = 0
+    course_ids = list(Course._base_manager.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(course_ids), chunk_size):
+        courses += refresh_course_counters(course_ids[start : start + chunk_size])
+
+    group_ids = list(CourseGroup._base_manager.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(group_ids), chunk_size):
+        groups += refresh_group_counters(group_ids[start : start + chunk_size])
+    return courses, groups
+
+
+@contextmanager
+def deferred_counters():
+    """
+    Collect the courses/groups touched inside the block and recount them once
+    on exit, instead of applying a delta per row. Nested blocks share the
+    outermost one. Nothing is recounted if the block raises.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        yield pending
+        return
+
+    pending = {"courses": set(), "groups": set()}
+    _state.pending = pending
+    try:
+        yield pending
+    finally:
+        _state.pending = None
+    refresh_course_counters(pending["courses"])
+    refresh_group_counters(pending["groups"])
+
+
+def touch(course_ids=(), group_ids=()):
+    """Recount the given rows now, or at the end of the enclosing ``deferred_counters()``."""
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending["courses"].update(_clean_ids(course_ids))
+        pending["groups"].update(_clean_ids(group_ids))
+        return
+    refresh_course_counters(course_ids)
+    refresh_group_counters(group_ids)
+
+
+def _bump(model, pk, **deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if pk is None or not deltas:
+        return
+    model._base_manager.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    )
+
+
+def apply_enrollment_delta(course_id, group_id, role, delta, group_applied=False):
+    """
+    Account for one enrollment row being added (+1) or removed (-1).
+    ``group_applied`` means the group side was already counted, e.g. by
+    ``reserve_student_seat``.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending["courses"].add(course_id)
+        pending["groups"].add(group_id)
+        return
+
+    is_student = role == "student"
+    if not group_applied:
+        _bump(
+            CourseGroup,
+            group_id,
+            members_count=delta,
+            students_count=delta if is_student else 0,
+        )
+    if is_student:
+        _bump(Course, course_id, students_count=delta)
+    elif role == "teacher":
+        # A teacher may sit in several groups of the same course, so the
+        # distinct count cannot be maintained with a plain delta.
+        refresh_course_counters([course_id], fields=("teachers_count",))
+
+
+def reserve_student_seat(group_id):
+    """
+    Take one student seat of a group with a single conditional UPDATE. Returns
+    False when ``students_limit`` is already reached; an empty or zero limit
+    means "no limit". Concurrent callers
+    serialize on the group row, so the limit can never be exceeded.
+    The caller must create the enrollment in the same transaction with
+    ``enrollment._seat_reserved = True``.
+    """
+    return bool(
+        CourseGroup._base_manager.filter(pk=group_id)
+        .filter(
+            Q(students_limit__isnull=True)
+            | Q(students_limit=0)
+            | Q(students_count__lt=F("students_limit"))
+        )
+        .update(students_count=F("students_count") + 1, members_count=F("members_count") + 1)
+    )
+
+
+def apply_course_child_delta(course_id, field, delta):
+    """Account for one task/group being added (+1) or removed (-1) from a course."""
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending["courses"].add(course_id)
+        return
+    _bump(Course, course_id, **{field: delta})
@@ -0,0 +1,216 @@
+"""
+Set-based enrollment of many users into a group.
+
+Each call validates all ids with one query, touches the enrollment table with
+one UPDATE/INSERT/DELETE per kind of change and recounts the affected
+counters once, instead of one round trip per user.
+"""
+
+from django.db import IntegrityError, transaction
+
+from src.apps.courses.models import CourseEnrollment, CourseGroup
+from src.apps.courses.service.counters import deferred_counters, reserve_student_seat
+from src.apps.users.models import User
+
+CREATED = "created"
+MOVED = "moved"
+ALREADY_ENROLLED = "already_enrolled"
+REMOVED = "removed"
+NOT_ENROLLED = "not_enrolled"
+NOT_FOUND = "not_found"
+
+ERROR_MESSAGES = {NOT_FOUND: "not found", NOT_ENROLLED: "enrollment not found"}
+
+
+class StudentsLimitExceeded(Exception):
+    def __init__(self, limit, requested, available):
+        self.limit = limit
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Too many students, maximum limit is {limit}")
+
+
+class AlreadyEnrolled(Exception):
+    pass
+
+
+def _dedupe(user_ids):
+    return list(dict.fromkeys(user_ids))
+
+
+def _existing_user_ids(user_ids):
+    return set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+
+
+def _result(user_ids, outcomes, enrollment_ids=None):
+    report = [{"user_id": uid, "status": outcomes[uid]} for uid in user_ids]
+    errors = [
+        {"user_id": uid, "error": ERROR_MESSAGES[outcomes[uid]]}
+        for uid in user_ids
+        if outcomes[uid] in ERROR_MESSAGES
+    ]
+    result = {"report": report, "errors": errors}
+    if enrollment_ids is not None:
+        result["enrollments"] = (
+            CourseEnrollment.objects.filter(pk__in=enrollment_ids)
+            .select_related("user", "course", "group__course")
+            .order_by("pk")
+        )
+    return result
+
+
+def enroll_students(group: CourseGroup, user_ids):
+    """
+    Enroll ``user_ids`` as students of ``group``. Students already in another
+    group of the same course are moved. ``students_limit`` is checked once
+    against the stored counter while the group row is locked.
+
+    Raises ``StudentsLimitExceeded`` (nothing is written) if the group would
+    overflow.
+    """
+    user_ids = _dedupe(user_ids)
+    with transaction.atomic(), deferred_counters():
+        group = CourseGroup.objects.select_for_update().get(pk=group.pk)
+        found = _existing_user_ids(user_ids)
+        current_groups = dict(
+            CourseEnrollment.objects.filter(
+                course_id=group.course_id, role="student", user_id__in=found
+            ).values_list("user_id", "group_id")
+        )
+
+        outcomes = {}
+        to_move, to_create = [], []
+        for uid in user_ids:
+            if uid not in found:
+                outcomes[uid] = NOT_FOUND
+            elif uid not in current_groups:
+                to_create.append(uid)
+                outcomes[uid] = CREATED
+            elif current_groups[uid] != group.pk:
+                to_move.append(uid)
+                outcomes[uid] = MOVED
+            else:
+                outcomes[uid] = ALREADY_ENROLLED
+
+        requested = len(to_move) + len(to_create)
+        # an empty or zero limit means "no limit"
+        if group.students_limit:
+            available = max(group.students_limit - group.students_count, 0)
+            if requested > available:
+                raise StudentsLimitExceeded(group.students_limit, requested, available)
+
+        if to_move:
+            CourseEnrollment.objects.filter(
+                course_id=group.course_id, role="student", user_id__in=to_move
+            ).update(group_id=group.pk)
+        if to_create:
+            # Postgres cannot target the partial uniq_student_per_course index
+            # with ON CONFLICT (user, course), so a row inserted concurrently
+            # after the read above is skipped rather than updated.
+            CourseEnrollment.objects.bulk_create(
+                [
+                    CourseEnrollment(
+                        user_id=uid, course_id=group.course_id, group_id=group.pk, role="student"
+                    )
+                    for uid in to_create
+                ],
+                ignore_conflicts=True,
+            )
+
+        enrolled = dict(
+            CourseEnrollment.objects.filter(
+                group_id=group.pk, role="student", user_id__in=found
+            ).values_list("user_id", "pk")
+        )
+        for uid in to_create:
+            if uid not in enrolled:
+                outcomes[uid] = ALREADY_ENROLLED
+        return _result(user_ids, outcomes, enrollment_ids=list(enrolled.values()))
+
+
+def unenroll_students(group: CourseGroup, user_ids):
+    """Remove ``user_ids`` from the course of ``group`` in one DELETE."""
+    user_ids = _dedupe(user_ids)
+    with transaction.atomic(), deferred_counters():
+        enrollments = CourseEnrollment.objects.filter(
+            course_id=group.course_id, role="student", user_id__in=user_ids
+        )
+        enrolled = set(enrollments.values_list("user_id", flat=True))
+        if enrolled:
+            enrollments.delete()
+    outcomes = {uid: REMOVED if uid in enrolled else NOT_ENROLLED for uid in user_ids}
+    return _result(user_ids, outcomes)
+
+
+def enroll_teachers(group: CourseGroup, user_ids):
+    """Enroll ``user_ids`` as teachers of ``group`` with a single INSERT."""
+    user_ids = _dedupe(user_ids)
+    with transaction.atomic(), deferred_counters():
+        found = _existing_user_ids(user_ids)
+        existing = set(
+            CourseEnrollment.objects.filter(
+                group_id=group.pk, role="teacher", user_id__in=found
+            ).values_list("user_id", flat=True)
+        )
+        to_create = [uid for uid in user_ids if uid in found and uid not in existing]
+        if to_create:
+            CourseEnrollment.objects.bulk_create(
+                [
+                    CourseEnrollment(
+                        user_id=uid, course_id=group.course_id, group_id=group.pk, role="teacher"
+                    )
+                    for uid in to_create
+                ],
+                ignore_conflicts=True,
+            )
+        enrollment_ids = CourseEnrollment.objects.filter(
+            group_id=group.pk, role="teacher", user_id__in=found
+        ).values_list("pk", flat=True)
+
+        outcomes = {}
+        for uid in user_ids:
+            if uid not in found:
+                outcomes[uid] = NOT_FOUND
+            elif uid in existing:
+                outcomes[uid] = ALREADY_ENROLLED
+            else:
+                outcomes[uid] = CREATED
+        return _result(user_ids, outcomes, enrollment_ids=list(enrollment_ids))
+
+
+def unenroll_teachers(group: CourseGroup, user_ids):
+    """Remove ``user_ids`` as teachers of ``group`` in one DELETE."""
+    user_ids = _dedupe(user_ids)
+    with transaction.atomic(), deferred_counters():
+        enrollments = CourseEnrollment.objects.filter(
+            group_id=group.pk, role="teacher", user_id__in=user_ids
+        )
+        enrolled = set(enrollments.values_list("user_id", flat=True))
+        if enrolled:
+            enrollments.delete()
+    outcomes = {uid: REMOVED if uid in enrolled else NOT_ENROLLED for uid in user_ids}
+    return _result(user_ids, outcomes)
+
+
+def self_enroll_student(group: CourseGroup, user) -> CourseEnrollment:
+    """
+    Self-registration path: reserve one seat with a conditional UPDATE on the
+    group's stored ``students_count`` (no member counting), then insert the
+    enrollment in the same transaction. A failed insert releases the seat.
+
+    Raises ``StudentsLimitExceeded`` when the group is full and
+    ``AlreadyEnrolled`` when the user already has a student enrollment in
+    the course.
+    """
+    try:
+        with transaction.atomic():
+            if not reserve_student_seat(group.pk):
+                raise StudentsLimitExceeded(group.students_limit, 1, 0)
+            enrollment = CourseEnrollment(
+                user=user, group=group, course_id=group.course_id, role="student"
+            )
+            enrollment._seat_reserved = True
+            enrollment.save()
+    except IntegrityError:
+        raise AlreadyEnrolled()
+    return enrollment
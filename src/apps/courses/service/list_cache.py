@@ -0,0 +1,105 @@
+"""
+Per-user cache of the course list responses (``CourseViewSet.list`` and
+``my_courses``).
+
+Entries are keyed by the user, the request path and two version tokens:
+
+* the user's version, bumped when the user's enrollments or auth groups
+  change (both decide which courses are visible and the ``role`` shown);
+* the catalog version, bumped when any course or category changes, or the
+  user, profile or auth groups of a course author (embedded as ``author``).
+
+Bumping a version simply makes the old entries unreachable; they expire on
+their own after ``CACHE_TTL``. Versions are bumped on commit so a request
+running concurrently with the write cannot re-cache the old list under the
+new version.
+"""
+
+import hashlib
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 60 * 10
+KEY_PREFIX = "courses:list"
+CATALOG_VERSION_KEY = f"{KEY_PREFIX}:catalog:v"
+HITS_KEY = f"{KEY_PREFIX}:stats:hits"
+MISSES_KEY = f"{KEY_PREFIX}:stats:misses"
+
+
+def _user_version_key(user_id):
+    return f"{KEY_PREFIX}:user:{user_id}:v"
+
+
+def _new_token():
+    return uuid.uuid4().hex
+
+
+def _versions(user_id):
+    keys = [_user_version_key(user_id), CATALOG_VERSION_KEY]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # never fall back to a constant: entries written under an evicted
+            # version would become reachable again
+            cache.add(key, _new_token(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _entry_key(request, scope):
+    user_id = request.user.pk
+    user_version, catalog_version = _versions(user_id)
+    raw = f"{user_version}:{catalog_version}:{request.get_host()}{request.get_full_path()}"
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f"{KEY_PREFIX}:{scope}:{user_id}:{digest}"
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_cached_response(request, scope):
+    """Return ``(key, data)``; ``data`` is ``None`` on a miss."""
+    key = _entry_key(request, scope)
+    data = cache.get(key)
+    _count(HITS_KEY if data is not None else MISSES_KEY)
+    return key, data
+
+
+def cache_response(key, data):
+    cache.set(key, data, CACHE_TTL)
+
+
+def bump_users(user_ids):
+    """Invalidate the cached course lists of the given users once the transaction commits."""
+    keys = {_user_version_key(user_id) for user_id in user_ids if user_id is not None}
+    if keys:
+        transaction.on_commit(lambda: cache.set_many({key: _new_token() for key in keys}, None))
+
+
+def bump_catalog():
+    """Invalidate every cached course list once the transaction commits."""
+    transaction.on_commit(lambda: cache.set(CATALOG_VERSION_KEY, _new_token(), None))
+
+
+def cache_stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
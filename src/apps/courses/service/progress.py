@@ -0,0 +1,150 @@
+"""
+Per-enrollment progress: approved tasks, points, percent complete and
+started/finished timestamps stored on student ``CourseEnrollment`` rows.
+
+Reviews apply deltas to the single affected row (``apply_review``); task
+changes and other write paths recount the affected rows with set-based
+UPDATEs (``refresh_progress``).
+"""
+
+from django.db.models import (
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from src.apps.assignments.models import Task
+from src.apps.courses.models import CourseEnrollment
+from src.apps.grades.models import Grade
+from src.apps.submissions.models import Answer
+
+
+def _tasks_count():
+    return Coalesce(
+        Subquery(
+            Task.objects.filter(course=OuterRef("course_id"))
+            .order_by()
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def _progress(approved):
+    tasks = _tasks_count()
+    return Case(
+        When(
+            GreaterThanOrEqual(tasks, 1),
+            then=Least(
+                ExpressionWrapper(approved * Value(100.0) / tasks, output_field=FloatField()),
+                Value(100.0),
+            ),
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _finished_at(approved, now):
+    # Finished once every active task is approved; tasks added later reopen it.
+    return Case(
+        When(
+            GreaterThanOrEqual(approved, Greatest(_tasks_count(), 1)),
+            then=Coalesce(F("finished_at"), Value(now)),
+        ),
+        default=Value(None),
+    )
+
+
+def _student_rows(user_id, course_id):
+    return CourseEnrollment.objects.filter(user_id=user_id, course_id=course_id, role="student")
+
+
+def apply_review(answer, approved_delta=0, points_delta=0):
+    """
+    Shift the stored progress of ``answer``'s author after a review changed its
+    status or grade. Answers that ``refresh_progress`` does not count (deleted,
+    or on a soft-deleted task) are skipped.
+    """
+    if answer.is_deleted or (not approved_delta and not points_delta):
+        return 0
+    course_id = Task.objects.filter(pk=answer.task_id).values_list("course_id", flat=True).first()
+    if course_id is None:
+        return 0
+    approved = Greatest(F("approved_tasks_count") + approved_delta, 0)
+    return _student_rows(answer.user_id, course_id).update(
+        approved_tasks_count=approved,
+        total_points=Greatest(F("total_points") + points_delta, 0),
+        progress=_progress(approved),
+        finished_at=_finished_at(approved, timezone.now()),
+    )
+
+
+def mark_started(user_id, course_id):
+    """Record the first submission of a student in a course."""
+    return (
+        _student_rows(user_id, course_id)
+        .filter(started_at__isnull=True)
+        .update(started_at=timezone.now())
+    )
+
+
+def refresh_progress(course_ids, user_ids=None):
+    """Recount stored progress for the student enrollments of the given courses."""
+    course_ids = {pk for pk in course_ids if pk is not None}
+    if not course_ids:
+        return 0
+    rows = CourseEnrollment.objects.filter(course_id__in=course_ids, role="student")
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+
+    answers = Answer.objects.filter(
+        user=OuterRef("user_id"),
+        task__course=OuterRef("course_id"),
+        task__is_deleted=False,
+        is_deleted=False,
+    ).order_by()
+    grades = Grade.objects.filter(
+        answer__user=OuterRef("user_id"),
+        answer__task__course=OuterRef("course_id"),
+        answer__task__is_deleted=False,
+        answer__is_deleted=False,
+    ).order_by()
+
+    rows.update(
+        approved_tasks_count=Coalesce(
+            Subquery(
+                answers.filter(status=Answer.Status.approved)
+                .values("user")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        ),
+        total_points=Coalesce(
+            Subquery(grades.values("answer__user").annotate(total=Sum("score")).values("total")),
+            0,
+        ),
+        started_at=Coalesce(
+            F("started_at"),
+            Subquery(answers.values("user").annotate(first=Min("created_at")).values("first")),
+        ),
+    )
+    approved = F("approved_tasks_count")
+    return rows.update(
+        progress=_progress(approved),
+        finished_at=_finished_at(approved, timezone.now()),
+    )
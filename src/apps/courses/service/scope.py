@@ -0,0 +1,62 @@
+"""
+Which students a teacher sees: the students of every group in which the
+teacher has a ``teacher`` enrollment, limited to that group's course.
+
+Every helper adds correlated ``EXISTS`` filters instead of materializing id
+sets in Python, so a teacher view is a single query. The lookups are served
+by the enrollment indexes: ``uniq_user_group_role`` (teacher, group, role),
+``uniq_student_per_course`` (student, course) and (group, role) for listing
+the students of the teacher's groups.
+"""
+
+from django.db.models import Exists, OuterRef
+
+from src.apps.courses.models import CourseEnrollment
+
+
+def teaches_group(teacher, group_ref="group_id"):
+    """``EXISTS`` filter: ``teacher`` teaches the group referenced by ``group_ref``."""
+    return Exists(
+        CourseEnrollment.objects.filter(user=teacher, role="teacher", group_id=OuterRef(group_ref))
+    )
+
+
+def teacher_group_ids(teacher):
+    """Ids of the groups taught by ``teacher``, usable as a subquery."""
+    return CourseEnrollment.objects.filter(user=teacher, role="teacher").values("group_id")
+
+
+def teacher_student_enrollments(teacher, group_id=None):
+    """Student enrollments of the groups taught by ``teacher``."""
+    enrollments = CourseEnrollment.objects.filter(teaches_group(teacher), role="student")
+    if group_id is not None:
+        enrollments = enrollments.filter(group_id=group_id)
+    return enrollments
+
+
+def teaches_student(teacher, user_ref, course_ref, group_id=None):
+    """
+    ``EXISTS`` filter: the user referenced by ``user_ref`` is a student of
+    ``teacher`` in the course referenced by ``course_ref``.
+    """
+    return Exists(
+        teacher_student_enrollments(teacher, group_id).filter(
+            user_id=OuterRef(user_ref), course_id=OuterRef(course_ref)
+        )
+    )
+
+
+def answers_for_teacher(answers, teacher, group_id=None):
+    return answers.filter(teaches_student(teacher, "user_id", "task__course_id", group_id))
+
+
+def grades_for_teacher(grades, teacher):
+    return grades.filter(teaches_student(teacher, "answer__user_id", "answer__task__course_id"))
+
+
+def teacher_can_access_answer(teacher, answer):
+    return (
+        teacher_student_enrollments(teacher)
+        .filter(user_id=answer.user_id, course_id=answer.task.course_id)
+        .exists()
+    )
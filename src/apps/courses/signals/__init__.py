@@ -0,0 +1,6 @@
+from .update_counters import (
+    track_course_group_counters,
+    track_enrollment_counters,
+    track_task_counters,
+)
+from .update_progress import track_enrollment_progress, track_task_progress
@@ -0,0 +1,54 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from src.apps.courses.models import Category, Course, CourseEnrollment
+from src.apps.courses.service.list_cache import bump_catalog, bump_users
+from src.apps.users.models import User, UserProfile
+
+
+def _bump_catalog_for_authors(user_ids):
+    # the lists embed each course's author, so editing an author is a catalog change
+    if Course._base_manager.filter(author_id__in=list(user_ids)).exists():
+        bump_catalog()
+
+
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_enrolled_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_users([instance.user_id])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_catalog()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _bump_catalog_for_authors([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_author_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _bump_catalog_for_authors([instance.user_id])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # group.user_set.clear() does not report the removed users afterwards
+        user_ids = list(instance.user_set.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        user_ids = list((pk_set or ()) if reverse else [instance.pk])
+    else:
+        return
+    bump_users(user_ids)
+    _bump_catalog_for_authors(user_ids)
@@ -0,0 +1,93 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from src.apps.assignments.models import Task
+from src.apps.courses.models import CourseEnrollment, CourseGroup
+from src.apps.courses.service.counters import apply_course_child_delta, apply_enrollment_delta
+
+
+def _previous_state(manager, instance, *fields):
+    if instance.pk is None or instance._state.adding:
+        return None
+    return manager.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(pre_save, sender=CourseEnrollment)
+def remember_enrollment_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._counter_state = _previous_state(
+            sender._base_manager, instance, "course_id", "group_id", "role"
+        )
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def track_enrollment_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.course_id, instance.group_id, instance.role)
+    previous = getattr(instance, "_counter_state", None)
+    if created or previous is None:
+        seat_reserved = getattr(instance, "_seat_reserved", False)
+        apply_enrollment_delta(*current, delta=1, group_applied=seat_reserved)
+    elif previous != current:
+        apply_enrollment_delta(*previous, delta=-1)
+        apply_enrollment_delta(*current, delta=1)
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def untrack_enrollment_counters(sender, instance, **kwargs):
+    apply_enrollment_delta(instance.course_id, instance.group_id, instance.role, delta=-1)
+
+
+def _track_course_child(instance, created, field):
+    """Tasks and groups count towards their course while not soft-deleted."""
+    current = (instance.course_id, instance.is_deleted)
+    previous = getattr(instance, "_counter_state", None)
+    if created or previous is None:
+        previous = (instance.course_id, True)
+    if previous == current:
+        return
+    if not previous[1]:
+        apply_course_child_delta(previous[0], field, -1)
+    if not current[1]:
+        apply_course_child_delta(current[0], field, 1)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._counter_state = _previous_state(
+            Task.all_objects, instance, "course_id", "is_deleted"
+        )
+
+
+@receiver(post_save, sender=Task)
+def track_task_counters(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _track_course_child(instance, created, "tasks_count")
+
+
+@receiver(post_delete, sender=Task)
+def untrack_task_counters(sender, instance, **kwargs):
+    if not instance.is_deleted:
+        apply_course_child_delta(instance.course_id, "tasks_count", -1)
+
+
+@receiver(pre_save, sender=CourseGroup)
+def remember_course_group_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._counter_state = _previous_state(
+            sender._base_manager, instance, "course_id", "is_deleted"
+        )
+
+
+@receiver(post_save, sender=CourseGroup)
+def track_course_group_counters(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _track_course_child(instance, created, "groups_count")
+
+
+@receiver(post_delete, sender=CourseGroup)
+def untrack_course_group_counters(sender, instance, **kwargs):
+    if not instance.is_deleted:
+        apply_course_child_delta(instance.course_id, "groups_count", -1)
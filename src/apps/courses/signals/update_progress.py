@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.apps.assignments.models import Task
+from src.apps.courses.models import CourseEnrollment
+from src.apps.courses.service.progress import refresh_progress
+
+# ``_counter_state`` is captured by the pre_save receivers in update_counters.
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def track_enrollment_progress(sender, instance, created, raw=False, **kwargs):
+    if raw or instance.role != "student":
+        return
+    previous = getattr(instance, "_counter_state", None)
+    if created or previous is None or previous[0] != instance.course_id or previous[2] != "student":
+        refresh_progress([instance.course_id], user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=Task)
+def track_task_progress(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_counter_state", None)
+    current = (instance.course_id, instance.is_deleted)
+    if created or previous is None:
+        refresh_progress([instance.course_id])
+    elif previous != current:
+        refresh_progress({previous[0], instance.course_id})
+
+
+@receiver(post_delete, sender=Task)
+def untrack_task_progress(sender, instance, **kwargs):
+    refresh_progress([instance.course_id])
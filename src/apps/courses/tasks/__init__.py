@@ -0,0 +1 @@
+from .reassign_answers_task import reassign_answers
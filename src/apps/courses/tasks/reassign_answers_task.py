@@ -0,0 +1,18 @@
+import logging
+
+from celery import shared_task
+
+from src.apps.courses.service.reassign import delete_answers
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, name="courses.reassign_answers")
+def reassign_answers(self, course_id=None, task_id=None, user_ids=None):
+    try:
+        return delete_answers(course_id=course_id, task_id=task_id, user_ids=user_ids)
+    except Exception as exc:
+        logger.error(
+            f"courses.reassign_answers failed for course={course_id} task={task_id}: {exc}"
+        )
+        raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
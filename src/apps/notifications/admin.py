@@ -3,7 +3,7 @@ from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
 
-from .models import Notification
+from .models import Notification, OutboundEmail
 
 
 @admin.register(Notification)
@@ -65,4 +65,24 @@ class NotificationAdmin(ModelAdmin):
         return "-"
     
     class Meta:
-        icon = "notifications"
\ No newline at end of file
+        icon = "notifications"
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(ModelAdmin):
+    list_display = ["id", "subject", "to", "status", "priority", "attempts", "created_at", "sent_at"]
+    list_filter = ["status", "priority"]
+    search_fields = ["subject", "to"]
+    # the bodies may hold verification codes and reset links
+    exclude = ["body", "html_body"]
+    readonly_fields = [
+        field.name
+        for field in OutboundEmail._meta.fields
+        if field.name not in ("body", "html_body")
+    ]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    class Meta:
+        icon = "mail"
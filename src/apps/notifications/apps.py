@@ -5,5 +5,5 @@ class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.apps.notifications"
 
-    # def ready(self):
-    #     import src.apps.notifications.signals
+    def ready(self):
+        from .signals import unread_counter  # noqa E402
@@ -0,0 +1,112 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.notifications.service import broadcast
+from src.apps.users.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure a notification broadcast to one course of N students: recipient "
+        "lookup, bulk_create of the rows and the channel layer push in batches, "
+        "as the Celery task runs it. On the configured channel layer every "
+        "recipient group gets one subscribed channel so each send is delivered; "
+        "--in-memory skips that (the in-memory layer scans all groups on every "
+        "send) and measures the sending side only. Test data is created in a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipients", type=int, default=10000, help="Students in the course (default: 10000)"
+        )
+        parser.add_argument(
+            "--in-memory",
+            action="store_true",
+            help="Use the in-memory channel layer instead of the configured one",
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also push the same notifications one blocking group_send at a time",
+        )
+
+    def handle(self, *args, **options):
+        if options["in_memory"]:
+            layers = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+        else:
+            layers = None
+        try:
+            with override_settings(**({"CHANNEL_LAYERS": layers} if layers else {})):
+                with transaction.atomic():
+                    self._run(options["recipients"], options["compare"], not layers)
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, recipients, compare, subscribe):
+        course, teacher = self._fixtures(recipients)
+        channel_layer = get_channel_layer()
+        if subscribe:
+            self._subscribe(channel_layer, course)
+
+        started = time.perf_counter()
+        receiver_ids = broadcast.recipient_ids(course=course, exclude=teacher.pk)
+        resolved = time.perf_counter()
+        ids = broadcast.create_notifications(receiver_ids, "Announcement", "x" * 200, teacher)
+        created = time.perf_counter()
+        for start in range(0, len(ids), broadcast.BATCH_SIZE):
+            broadcast.push(ids[start : start + broadcast.BATCH_SIZE])
+        pushed = time.perf_counter()
+
+        self._row("recipients", resolved - started, len(receiver_ids))
+        self._row("bulk_create", created - resolved, len(ids))
+        self._row("push", pushed - created, len(ids))
+        self._row("total", pushed - started, len(ids))
+
+        if compare:
+            messages = broadcast.event_messages(ids)
+            started = time.perf_counter()
+            for group, message in messages:
+                async_to_sync(channel_layer.group_send)(group, message)
+            self._row("push, one by one", time.perf_counter() - started, len(messages))
+
+    def _row(self, phase, elapsed, count):
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f"{phase:>18} {elapsed * 1000:>10.1f} ms {rate:>12.0f} rows/s")
+
+    def _fixtures(self, recipients):
+        course = Course.objects.create(name="Broadcast benchmark", description="benchmark")
+        group = CourseGroup.objects.create(name="Broadcast benchmark", course=course)
+        teacher = User.objects.create(email="broadcast-teacher@example.com")
+        students = User.objects.bulk_create(
+            [User(email=f"broadcast-{index}@example.com") for index in range(recipients)],
+            batch_size=1000,
+        )
+        CourseEnrollment.objects.bulk_create(
+            [CourseEnrollment(user=teacher, course=course, group=group, role="teacher")]
+            + [CourseEnrollment(user=student, course=course, group=group) for student in students],
+            batch_size=1000,
+        )
+        return course, teacher
+
+    @staticmethod
+    def _subscribe(channel_layer, course):
+        async def subscribe(user_ids):
+            for user_id in user_ids:
+                channel = await channel_layer.new_channel()
+                await channel_layer.group_add(f"user_notifications_{user_id}", channel)
+
+        async_to_sync(subscribe)(
+            list(CourseEnrollment.objects.filter(course=course).values_list("user_id", flat=True))
+        )
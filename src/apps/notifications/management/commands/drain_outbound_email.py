@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from src.apps.notifications.service import mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued outbound emails in batches over reused connections, the "
+        "same way the notifications.drain_outbound_email task does, and report "
+        "the achieved emails/second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=mail.TIME_BUDGET,
+            help=f"Stop after this many seconds (default: {mail.TIME_BUDGET})",
+        )
+
+    def handle(self, *args, **options):
+        stats = mail.drain(time_budget=options["time_budget"])
+        self.stdout.write(
+            f"sent {stats['sent']} emails in {stats['batches']} batches "
+            f"({stats['retried']} retried) in {stats['elapsed_s']:.2f}s, "
+            f"{stats['emails_per_s']:.1f} emails/s"
+        )
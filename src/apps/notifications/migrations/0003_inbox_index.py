@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', 'is_read', '-created_at', '-id'], name='Notificatio_receive_85cfd7_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 08:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', 'updated_at', 'id'], name='Notificatio_receive_79341e_idx'),
+        ),
+    ]
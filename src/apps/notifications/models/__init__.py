@@ -1 +1,2 @@
-from .notifications import Notification
\ No newline at end of file
+from .notifications import Notification
+from .outbound_email import OutboundEmail
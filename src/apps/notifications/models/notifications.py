@@ -19,6 +19,10 @@ class Notification(BaseModel):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="received_notifications"
     )
     is_read = models.BooleanField(default=False)
+    # structured payload, e.g. task/status/grade of an answer review
+    data = models.JSONField(default=dict, blank=True)
+    # waiting in the digest window, see src.apps.notifications.service.digest
+    pending_delivery = models.BooleanField(default=False)
 
     def __str__(self):
         return f"'{self.title}' to {self.receiver.email}"
@@ -28,3 +32,14 @@ class Notification(BaseModel):
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
         ordering = ("-created_at",)
+        indexes = [
+            # the inbox: a receiver's unread notifications first, newest first
+            models.Index(fields=["receiver", "is_read", "-created_at", "-id"]),
+            # replay on WebSocket reconnect: a receiver's changes since a cursor
+            models.Index(fields=["receiver", "updated_at", "id"]),
+            models.Index(
+                fields=["receiver"],
+                condition=models.Q(pending_delivery=True),
+                name="notifications_pending_idx",
+            ),
+        ]
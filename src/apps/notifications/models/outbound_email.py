@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+from src.apps.common.models import BaseModel
+
+
+class OutboundEmail(BaseModel):
+    """
+    An email waiting for (or done with) delivery. Rows are written by
+    ``src.apps.notifications.service.mail.enqueue`` and sent in batches by the
+    ``notifications.drain_outbound_email`` task.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    class Priority(models.IntegerChoices):
+        HIGH = 0, "High"  # codes the user is waiting for
+        NORMAL = 1, "Normal"
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.NORMAL)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"'{self.subject}' to {', '.join(self.to)}"
+
+    class Meta:
+        db_table = "Outbound_Emails"
+        verbose_name = "Outbound email"
+        verbose_name_plural = "Outbound emails"
+        ordering = ("-created_at",)
+        indexes = [
+            # what the drain claims next
+            models.Index(fields=["status", "priority", "id"]),
+        ]
@@ -0,0 +1,125 @@
+"""
+Notifications to many users at once: everyone enrolled in a course or a group,
+or an explicit set of users.
+
+``broadcast`` writes all rows with ``bulk_create`` in one transaction and, once
+it commits, hands the ids to ``notifications.push_notifications`` in batches of
+``BATCH_SIZE``. The task builds the payloads from one query per batch and sends
+them to the ``user_notifications_<id>`` groups concurrently, ``PUSH_CONCURRENCY``
+sends in flight at a time, instead of one blocking round trip per receiver.
+
+Consumers get them as typed events, ``{"type": <event>, "data": {...}}`` (see
+``NotificationConsumer.notification_event``). The event becomes the frame type,
+so only the ``BROADCAST_EVENTS`` are accepted; anything else could pose as a
+protocol frame such as ``replay`` or ``error``.
+"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from src.apps.courses.models import CourseEnrollment
+from src.apps.notifications.models import Notification
+from src.apps.notifications.service.unread import adjust_many
+from src.apps.users.models import User
+
+BATCH_SIZE = 500
+PUSH_CONCURRENCY = 100
+DEFAULT_EVENT = "notification"
+BROADCAST_EVENTS = (DEFAULT_EVENT, "announcement")
+
+
+def recipient_ids(course=None, group=None, user_ids=None, exclude=None):
+    """Distinct ids of the active users to notify, in id order."""
+    if group is not None:
+        enrollments = CourseEnrollment.objects.filter(group=group, user__is_active=True)
+        ids = enrollments.values_list("user_id", flat=True)
+    elif course is not None:
+        enrollments = CourseEnrollment.objects.filter(course=course, user__is_active=True)
+        ids = enrollments.values_list("user_id", flat=True)
+    else:
+        ids = User.objects.filter(pk__in=user_ids or [], is_active=True).values_list(
+            "pk", flat=True
+        )
+    return sorted(set(ids) - {exclude})
+
+
+def create_notifications(receiver_ids, title, content, sender=None):
+    """Bulk-create one unread notification per receiver; returns their ids."""
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(title=title, content=content, sender=sender, receiver_id=receiver_id)
+            for receiver_id in receiver_ids
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    adjust_many(receiver_ids, 1)
+    return [notification.pk for notification in notifications]
+
+
+def broadcast(title, content, sender=None, event=DEFAULT_EVENT, **recipients):
+    """
+    Notify everyone selected by ``course``, ``group`` or ``user_ids`` (see
+    ``recipient_ids``) and schedule the real-time push. Returns the number of
+    notifications created.
+    """
+    from src.apps.notifications.tasks import push_notifications
+
+    if event not in BROADCAST_EVENTS:
+        raise ValueError(f"Unknown broadcast event {event!r}")
+    receiver_ids = recipient_ids(exclude=sender.pk if sender else None, **recipients)
+    with transaction.atomic():
+        ids = create_notifications(receiver_ids, title, content, sender=sender)
+
+        def schedule():
+            for start in range(0, len(ids), BATCH_SIZE):
+                push_notifications.delay(ids[start : start + BATCH_SIZE], event)
+
+        transaction.on_commit(schedule)
+    return len(ids)
+
+
+def event_messages(notification_ids, event=DEFAULT_EVENT):
+    """``(group, message)`` for each notification, from a single query."""
+    rows = Notification.objects.filter(pk__in=notification_ids).values(
+        "id", "title", "content", "feedback", "sender_id", "receiver_id", "is_read", "created_at"
+    )
+    return [
+        (
+            f"user_notifications_{row['receiver_id']}",
+            {
+                "type": "notification.event",
+                "event": event,
+                "data": {
+                    "id": row["id"],
+                    "title": row["title"],
+                    "content": row["content"],
+                    "feedback": row["feedback"],
+                    "sender": row["sender_id"],
+                    "is_read": row["is_read"],
+                    "created_at": row["created_at"].isoformat(),
+                },
+            },
+        )
+        for row in rows
+    ]
+
+
+async def send_messages(messages, concurrency=PUSH_CONCURRENCY):
+    channel_layer = get_channel_layer()
+    for start in range(0, len(messages), concurrency):
+        await asyncio.gather(
+            *(
+                channel_layer.group_send(group, message)
+                for group, message in messages[start : start + concurrency]
+            )
+        )
+
+
+def push(notification_ids, event=DEFAULT_EVENT):
+    """Send the given notifications to their receivers' sockets; returns how many."""
+    messages = event_messages(notification_ids, event)
+    async_to_sync(send_messages)(messages)
+    return len(messages)
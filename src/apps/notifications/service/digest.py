@@ -0,0 +1,135 @@
+"""
+Digest window for answer review notifications.
+
+Grading a batch of answers used to send the student one WebSocket message and
+one email per answer. ``add`` still writes (or updates) the notification row
+right away, so the inbox and the unread counter stay current, but marks it
+``pending_delivery`` and leaves the delivery to
+``notifications.flush_notification_digest``, scheduled once per receiver
+``NOTIFICATION_DIGEST_WINDOW`` seconds after the first pending row.
+
+``flush`` takes everything pending for the receiver and keeps only the latest
+notification per answer, so approving an answer and then grading it arrives as
+one entry. A single entry is delivered as before; several become one
+``answer_review_digest`` event and one summary email. The entries carry the
+structured ``Notification.data`` (task, status, grade), not the rendered text.
+
+A window of 0 delivers on commit, without the task.
+"""
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from src.apps.notifications.models import Notification
+from src.apps.users.models import User
+
+WINDOW = 60
+KEY_PREFIX = "notifications:digest"
+DIGEST_EVENT = "answer_review_digest"
+
+
+def _key(receiver_id):
+    return f"{KEY_PREFIX}:{receiver_id}"
+
+
+def window():
+    return getattr(settings, "NOTIFICATION_DIGEST_WINDOW", WINDOW)
+
+
+def add(receiver, title, content, feedback="", data=None):
+    """Create or update ``receiver``'s notification and queue it for delivery."""
+    notification, _ = Notification.objects.update_or_create(
+        receiver=receiver,
+        title=title,
+        defaults={
+            "content": content,
+            "feedback": feedback,
+            "data": data or {},
+            "pending_delivery": True,
+        },
+    )
+    transaction.on_commit(lambda: schedule(receiver.pk))
+    return notification
+
+
+def schedule(receiver_id):
+    """Flush ``receiver_id``'s pending notifications after the window, once."""
+    from src.apps.notifications.tasks import flush_notification_digest
+
+    delay = window()
+    if not delay:
+        flush(receiver_id)
+    elif cache.add(_key(receiver_id), 1, timeout=delay * 2):
+        flush_notification_digest.apply_async(args=[receiver_id], countdown=delay)
+
+
+def take_pending(receiver_id):
+    """Claim the receiver's pending notifications, oldest first."""
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.filter(receiver_id=receiver_id, pending_delivery=True)
+            .select_for_update(skip_locked=True)
+            .order_by("updated_at", "id")
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+            pending_delivery=False
+        )
+    return notifications
+
+
+def coalesce(notifications):
+    """Keep the latest notification per answer, ordered by when it last changed."""
+    latest = {}
+    for notification in notifications:
+        key = notification.data.get("answer_id", f"notification:{notification.pk}")
+        latest.pop(key, None)
+        latest[key] = notification
+    return list(latest.values())
+
+
+def entry(notification):
+    return {
+        **notification.data,
+        "id": notification.pk,
+        "title": notification.title,
+        "content": notification.content,
+        "feedback": notification.feedback,
+        "updated_at": notification.updated_at.isoformat(),
+    }
+
+
+def flush(receiver_id):
+    """Deliver the receiver's pending notifications; returns how many went out."""
+    from src.apps.common.utils import (
+        send_realtime_status_notification,
+        send_status_change_email_helper,
+    )
+    from src.apps.notifications.service.broadcast import send_messages
+    from src.apps.submissions.service import send_answer_review_digest
+
+    # a notification added from here on schedules a new flush
+    cache.delete(_key(receiver_id))
+    notifications = coalesce(take_pending(receiver_id))
+    if not notifications:
+        return 0
+
+    receiver = User.objects.get(pk=receiver_id)
+    if len(notifications) == 1:
+        notification = notifications[0]
+        notification.receiver = receiver
+        send_realtime_status_notification(notification=notification)
+        send_status_change_email_helper(notification_instance=notification)
+        return 1
+
+    entries = [entry(notification) for notification in notifications]
+    message = {
+        "type": "notification.event",
+        "event": DIGEST_EVENT,
+        "data": {"count": len(entries), "notifications": entries},
+    }
+    async_to_sync(send_messages)([(f"user_notifications_{receiver_id}", message)])
+    if receiver.email and receiver.first_name:
+        send_answer_review_digest(receiver.email, receiver.first_name, entries)
+    return len(entries)
@@ -0,0 +1,237 @@
+"""
+Outbound email queue.
+
+``enqueue`` stores a rendered message as an ``OutboundEmail`` row instead of
+sending it, and asks for a drain once the transaction commits. ``drain`` (run
+by the ``notifications.drain_outbound_email`` task) claims up to
+``OUTBOUND_EMAIL_BATCH_SIZE`` rows at a time and sends them over one
+connection from ``get_connection()``, so a wave of invites costs one SMTP
+login/TLS handshake per batch instead of one per email.
+
+Once a row is sent (or given up on) its bodies are blanked: they may carry
+verification codes and reset links, which must not outlive the delivery.
+
+Failures are retried per batch: when the connection cannot be opened or
+drops, the unsent rest of the batch goes back to the queue with an
+exponential backoff; a message the server rejects on its own is retried the
+same way. After ``OUTBOUND_EMAIL_MAX_ATTEMPTS`` a row is marked failed.
+
+``OUTBOUND_EMAIL_RATE_LIMIT`` caps the emails per second of one drain (0 for
+no limit). ``OUTBOUND_EMAIL_BACKEND`` overrides ``EMAIL_BACKEND`` for the
+queue only; tests run on Django's locmem backend, local development can use
+the file-based one.
+"""
+
+import logging
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from src.apps.notifications.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+RATE_LIMIT = 10
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 60
+CLAIM_TIMEOUT = timedelta(minutes=10)
+DRAIN_DELAY = 1
+TIME_BUDGET = 60
+KEEP_SENT = timedelta(days=7)
+DRAIN_SCHEDULED_KEY = "outbound_email:drain_scheduled"
+
+# errors after which the connection is not worth using for the rest of a batch
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+# cleared when a row is done with, see the module docstring
+BODY_CLEARED = {"body": "", "html_body": ""}
+
+
+def _setting(name, default):
+    return getattr(settings, f"OUTBOUND_EMAIL_{name}", default)
+
+
+def enqueue(message, priority=OutboundEmail.Priority.NORMAL):
+    """Queue an ``EmailMessage``/``EmailMultiAlternatives`` for delivery."""
+    html_body = next(
+        (
+            content
+            for content, mimetype in getattr(message, "alternatives", [])
+            if mimetype == "text/html"
+        ),
+        "",
+    )
+    email = OutboundEmail.objects.create(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        headers=dict(message.extra_headers),
+        priority=priority,
+    )
+    transaction.on_commit(schedule_drain)
+    return email
+
+
+def schedule_drain():
+    """Start a drain shortly, unless one is already scheduled."""
+    from src.apps.notifications.tasks import drain_outbound_email
+
+    if cache.add(DRAIN_SCHEDULED_KEY, 1, timeout=TIME_BUDGET):
+        drain_outbound_email.apply_async(countdown=DRAIN_DELAY)
+
+
+def _as_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def claim(size):
+    """Mark up to ``size`` due rows as sending and return them, most urgent first."""
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(
+        Q(status=OutboundEmail.Status.QUEUED, next_attempt_at__lte=now)
+        # picked up by a drain that died
+        | Q(status=OutboundEmail.Status.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        ids = list(
+            due.select_for_update(skip_locked=True)
+            .order_by("priority", "id")
+            .values_list("pk", flat=True)[:size]
+        )
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            status=OutboundEmail.Status.SENDING, claimed_at=now, attempts=F("attempts") + 1
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by("priority", "id"))
+
+
+def _reschedule(emails, error):
+    """Put ``emails`` back in the queue with a backoff, or fail them for good."""
+    now = timezone.now()
+    max_attempts = _setting("MAX_ATTEMPTS", MAX_ATTEMPTS)
+    by_attempts = {}
+    for email in emails:
+        by_attempts.setdefault(email.attempts, []).append(email.pk)
+    for attempts, ids in by_attempts.items():
+        if attempts >= max_attempts:
+            changes = {"status": OutboundEmail.Status.FAILED, **BODY_CLEARED}
+        else:
+            delay = RETRY_DELAY * 2 ** (attempts - 1)
+            changes = {
+                "status": OutboundEmail.Status.QUEUED,
+                "next_attempt_at": now + timedelta(seconds=delay),
+            }
+        OutboundEmail.objects.filter(pk__in=ids).update(last_error=str(error)[:1000], **changes)
+
+
+def send_batch(emails):
+    """
+    Send ``emails`` over one connection. Returns ``(sent, retried)``: the
+    number delivered and the number put back (or failed).
+    """
+    connection = get_connection(backend=_setting("BACKEND", None))
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning(
+            "Could not open an email connection, retrying %s emails: %s", len(emails), exc
+        )
+        _reschedule(emails, exc)
+        return 0, len(emails)
+
+    sent = []
+    try:
+        for index, email in enumerate(emails):
+            try:
+                connection.send_messages([_as_message(email, connection)])
+            except CONNECTION_ERRORS as exc:
+                logger.warning(
+                    "Email connection lost, retrying %s emails: %s", len(emails) - index, exc
+                )
+                _reschedule(emails[index:], exc)
+                break
+            except Exception as exc:
+                logger.warning("Email %s to %s rejected: %s", email.pk, email.to, exc)
+                _reschedule([email], exc)
+            else:
+                sent.append(email.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    OutboundEmail.objects.filter(pk__in=sent).update(
+        status=OutboundEmail.Status.SENT, sent_at=timezone.now(), last_error="", **BODY_CLEARED
+    )
+    return len(sent), len(emails) - len(sent)
+
+
+def drain(time_budget=TIME_BUDGET):
+    """
+    Send due emails batch by batch until the queue is empty or ``time_budget``
+    seconds have passed. Returns the counts and the achieved emails/second.
+    """
+    batch_size = _setting("BATCH_SIZE", BATCH_SIZE)
+    rate_limit = _setting("RATE_LIMIT", RATE_LIMIT)
+    stats = {"sent": 0, "retried": 0, "batches": 0}
+    started = time.monotonic()
+    while time.monotonic() - started < time_budget:
+        batch_started = time.monotonic()
+        emails = claim(batch_size)
+        if not emails:
+            break
+        sent, retried = send_batch(emails)
+        stats["sent"] += sent
+        stats["retried"] += retried
+        stats["batches"] += 1
+        if rate_limit:
+            pause = len(emails) / rate_limit - (time.monotonic() - batch_started)
+            if pause > 0:
+                time.sleep(pause)
+
+    elapsed = time.monotonic() - started
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["emails_per_s"] = round(stats["sent"] / elapsed, 1) if elapsed else 0.0
+    if stats["batches"]:
+        logger.info(
+            "Sent %s emails in %s batches, %s retried, %.1f emails/s",
+            stats["sent"],
+            stats["batches"],
+            stats["retried"],
+            stats["emails_per_s"],
+        )
+    return stats
+
+
+def has_due():
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.Status.QUEUED, next_attempt_at__lte=timezone.now()
+    ).exists()
+
+
+def purge_sent(keep=KEEP_SENT):
+    """Delete sent rows older than ``keep``; returns how many."""
+    deleted, _ = OutboundEmail.objects.filter(
+        status=OutboundEmail.Status.SENT, sent_at__lt=timezone.now() - keep
+    ).delete()
+    return deleted
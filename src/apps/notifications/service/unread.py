@@ -0,0 +1,195 @@
+"""
+Per-user unread notification counters, kept next to the table so the badge
+request is a single key lookup.
+
+A counter is created lazily: the first lookup for a user counts their unread
+rows over the ``(receiver, is_read, created_at)`` index and stores the result.
+From then on it only moves by deltas: ``+1`` when an unread notification is
+created (``adjust_many`` for bulk creates), ``-n`` when ``mark_read`` flips
+``n`` rows or unread rows are deleted. Deltas to a counter that does not exist
+yet are dropped, the lazy count will include them.
+
+Writes that bypass the model signals (``QuerySet.update``, admin edits of
+``is_read``) and the small window between a lazy count and storing it can
+make a counter drift, so ``reconcile`` recounts every user periodically (see
+``notifications.reconcile_unread_counters``).
+
+The backend is chosen by ``settings.NOTIFICATION_COUNTER_BACKEND``; tests use
+``InMemoryUnreadCounterBackend``.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+from src.apps.notifications.models import Notification
+
+KEY_PREFIX = "notifications:unread"
+DEFAULT_BACKEND = "src.apps.notifications.service.unread.RedisUnreadCounterBackend"
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+class RedisUnreadCounterBackend:
+    # only move counters that exist, and never below zero
+    _add_script = """
+        if redis.call('EXISTS', KEYS[1]) == 0 then
+            return nil
+        end
+        local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+        if count < 0 then
+            redis.call('SET', KEYS[1], 0)
+            count = 0
+        end
+        return count
+    """
+
+    def __init__(self):
+        self.redis = get_redis_connection("default")
+        self._add = self.redis.register_script(self._add_script)
+
+    def get(self, user_id):
+        count = self.redis.get(_key(user_id))
+        return None if count is None else int(count)
+
+    def seed(self, user_id, count):
+        """Store ``count`` unless a counter exists already; returns the stored value."""
+        pipe = self.redis.pipeline()
+        pipe.set(_key(user_id), count, nx=True)
+        pipe.get(_key(user_id))
+        _, stored = pipe.execute()
+        return int(stored)
+
+    def add(self, user_id, delta):
+        count = self._add(keys=[_key(user_id)], args=[delta])
+        return None if count is None else int(count)
+
+    def add_many(self, user_ids, delta):
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            self._add(keys=[_key(user_id)], args=[delta], client=pipe)
+        pipe.execute()
+
+    def replace(self, counts):
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id, count in counts.items():
+            pipe.set(_key(user_id), count)
+        pipe.execute()
+
+    def user_ids(self):
+        """Users that currently have a counter."""
+        prefix = f"{KEY_PREFIX}:"
+        return {
+            int(key.decode()[len(prefix) :])
+            for key in self.redis.scan_iter(match=f"{prefix}*", count=1000)
+        }
+
+
+class InMemoryUnreadCounterBackend:
+    """Process-local stand-in for tests and single-process development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def get(self, user_id):
+        with self._lock:
+            return self._counts.get(user_id)
+
+    def seed(self, user_id, count):
+        with self._lock:
+            return self._counts.setdefault(user_id, count)
+
+    def add(self, user_id, delta):
+        with self._lock:
+            if user_id not in self._counts:
+                return None
+            self._counts[user_id] = max(0, self._counts[user_id] + delta)
+            return self._counts[user_id]
+
+    def add_many(self, user_ids, delta):
+        for user_id in user_ids:
+            self.add(user_id, delta)
+
+    def replace(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+    def user_ids(self):
+        with self._lock:
+            return set(self._counts)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_backends = {}
+
+
+def get_backend():
+    path = getattr(settings, "NOTIFICATION_COUNTER_BACKEND", DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def unread_count(user_id):
+    backend = get_backend()
+    count = backend.get(user_id)
+    if count is None:
+        count = backend.seed(
+            user_id, Notification.objects.filter(receiver_id=user_id, is_read=False).count()
+        )
+    return count
+
+
+def adjust(user_id, delta):
+    """Move ``user_id``'s counter by ``delta`` once the current transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: get_backend().add(user_id, delta))
+
+
+def adjust_many(user_ids, delta):
+    """``adjust`` for many users in one round trip, e.g. after ``bulk_create``."""
+    user_ids = list(user_ids)
+    if delta and user_ids:
+        transaction.on_commit(lambda: get_backend().add_many(user_ids, delta))
+
+
+def mark_read(user, ids=None):
+    """
+    Mark ``user``'s unread notifications read in one UPDATE: all of them, or
+    only those in ``ids``. Returns the number of notifications that changed.
+    """
+    notifications = Notification.objects.filter(receiver=user, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(pk__in=ids)
+    updated = notifications.update(is_read=True)
+    adjust(user.pk, -updated)
+    return updated
+
+
+def reconcile():
+    """
+    Recount every user with unread notifications or an existing counter and
+    overwrite the counters. Returns the number of counters written.
+    """
+    backend = get_backend()
+    counts = dict(
+        Notification.objects.filter(is_read=False)
+        .order_by()
+        .values("receiver")
+        .annotate(total=Count("pk"))
+        .values_list("receiver", "total")
+    )
+    for user_id in backend.user_ids() - counts.keys():
+        counts[user_id] = 0
+    backend.replace(counts)
+    return len(counts)
@@ -0,0 +1 @@
+from .unread_counter import count_created, count_deleted
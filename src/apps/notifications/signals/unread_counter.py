@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.apps.notifications.models import Notification
+from src.apps.notifications.service.unread import adjust
+
+
+@receiver(post_save, sender=Notification)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.is_read:
+        adjust(instance.receiver_id, 1)
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust(instance.receiver_id, -1)
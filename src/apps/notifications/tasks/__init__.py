@@ -0,0 +1,4 @@
+from .notification_digest import flush_notification_digest
+from .outbound_email import drain_outbound_email, purge_outbound_email
+from .push_notifications import push_notifications
+from .reconcile_unread_counters import reconcile_unread_counters
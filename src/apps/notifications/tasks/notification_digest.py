@@ -0,0 +1,14 @@
+import logging
+
+from celery import shared_task
+
+from src.apps.notifications.service.digest import flush
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="notifications.flush_notification_digest")
+def flush_notification_digest(receiver_id):
+    delivered = flush(receiver_id)
+    logger.info(f"delivered {delivered} pending notifications to user {receiver_id}")
+    return delivered
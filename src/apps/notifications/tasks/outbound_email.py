@@ -0,0 +1,25 @@
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+
+from src.apps.notifications.service import mail
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="notifications.drain_outbound_email")
+def drain_outbound_email():
+    # emails queued from now on schedule the next drain
+    cache.delete(mail.DRAIN_SCHEDULED_KEY)
+    stats = mail.drain()
+    if mail.has_due():
+        mail.schedule_drain()
+    return stats
+
+
+@shared_task(name="notifications.purge_outbound_email")
+def purge_outbound_email():
+    deleted = mail.purge_sent()
+    logger.info(f"deleted {deleted} sent outbound emails")
+    return deleted
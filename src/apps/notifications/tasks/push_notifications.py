@@ -0,0 +1,14 @@
+import logging
+
+from celery import shared_task
+
+from src.apps.notifications.service.broadcast import DEFAULT_EVENT, push
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="notifications.push_notifications")
+def push_notifications(notification_ids, event=DEFAULT_EVENT):
+    pushed = push(notification_ids, event)
+    logger.info(f"pushed {pushed} '{event}' notifications")
+    return pushed
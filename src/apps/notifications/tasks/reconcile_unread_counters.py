@@ -0,0 +1,14 @@
+import logging
+
+from celery import shared_task
+
+from src.apps.notifications.service.unread import reconcile
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="notifications.reconcile_unread_counters")
+def reconcile_unread_counters():
+    written = reconcile()
+    logger.info(f"reconciled {written} unread notification counters")
+    return written
@@ -3,6 +3,9 @@ import logging
 from celery import shared_task
 from decouple import config
 from django.core.mail import EmailMultiAlternatives
+from django.utils.html import escape
+
+from src.apps.notifications.service.mail import enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -162,19 +165,18 @@ The Review Team
 
         email = EmailMultiAlternatives(subject, text_content, from_email, to)
         email.attach_alternative(html_content, "text/html")
-        email.send()
+        enqueue(email)
 
         logger.info(
-            f"Answer status notification sent successfully to {receiver_email} "
-            f"for task #{task_number}"
+            f"Answer status notification queued for {receiver_email} for task #{task_number}"
         )
         return (
-            f"Status notification sent to {receiver_email} for task #{task_number} "
+            f"Status notification queued for {receiver_email} for task #{task_number} "
             f"with status: {status}"
         )
 
     except Exception as exc:
-        logger.error(f"Failed to send answer status notification to {receiver_email}: {str(exc)}")
+        logger.error(f"Failed to queue answer status notification to {receiver_email}: {str(exc)}")
         # Retry with exponential backoff
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
 
@@ -188,3 +190,128 @@ def send_answer_status_notification(
     return send_answer_status_notification_task.delay(
         receiver_email, first_name, task_name, task_number, status, feedback_text
     )
+
+
+DIGEST_STATUS = {
+    "approved": ("Approved", "#16a34a"),
+    "rejected": ("Needs Revision", "#dc2626"),
+    "have_flaws": ("Has Flaws", "#d97706"),
+    "in_review": ("In Review", "#6c757d"),
+}
+
+
+def _digest_grade(review):
+    grade = review.get("grade")
+    if not grade or grade.get("score") is None:
+        return ""
+    return f"{grade['score']}/{grade['max_score']} ({grade['letter']})"
+
+
+@shared_task(bind=True, max_retries=3)
+def send_answer_review_digest_task(self, receiver_email, first_name, reviews):
+    """
+    Celery task to send one email summing up several answer reviews. Each
+    review is the structured ``data`` of its notification plus ``feedback``.
+    """
+    try:
+        subject = f"{len(reviews)} of your answers have been reviewed"
+
+        text_lines = []
+        rows = []
+        for review in reviews:
+            label, color = DIGEST_STATUS.get(review.get("status"), ("Updated", "#6c757d"))
+            grade = _digest_grade(review)
+            feedback = (review.get("feedback") or "").strip()
+            text_lines.append(
+                f"- Task #{review['task_number']} {review['task_name']}: {label}"
+                + (f", grade {grade}" if grade else "")
+                + (f"\n  Feedback: {feedback}" if feedback else "")
+            )
+            rows.append(
+                f"""
+            <tr>
+                <td style="padding: 12px 8px; border-bottom: 1px solid #e9ecef; font-size: 14px;">
+                    <strong>Task #{escape(review['task_number'])}</strong><br>
+                    <span style="color: #6c757d;">{escape(review['task_name'])}</span>
+                    {f'<p style="margin: 8px 0 0; color: #495057; white-space: pre-wrap;">'
+                     f'{escape(feedback)}</p>' if feedback else ''}
+                </td>
+                <td style="padding: 12px 8px; border-bottom: 1px solid #e9ecef; font-size: 14px;
+                 white-space: nowrap;">
+                    <span style="color: {color}; font-weight: 600;">{label}</span><br>
+                    {escape(grade)}
+                </td>
+            </tr>"""
+            )
+
+        text_content = f"""
+Hello {first_name},
+
+The following answers have been reviewed:
+
+{chr(10).join(text_lines)}
+
+Please log into your account to view details and take any necessary actions.
+
+Best regards,
+The Review Team
+        """
+
+        from_email = config("EMAIL_HOST_USER")
+        to = [receiver_email]
+
+        html_content = f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Review Summary</title>
+</head>
+<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont,
+ 'Segoe UI', Roboto, sans-serif; background-color: #f8f9fa; color: #212529;">
+    <div style="max-width: 600px; margin: 40px auto; background: #ffffff; border-radius: 8px;
+    overflow: hidden; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);">
+        <div style="padding: 32px 32px 24px; border-bottom: 1px solid #e9ecef;">
+            <h1 style="margin: 0; font-size: 24px; font-weight: 600;
+             color: #212529;">Review Summary</h1>
+        </div>
+        <div style="padding: 32px;">
+            <p style="margin: 0 0 24px; font-size: 16px; color: #495057;">
+                Hello {escape(first_name)}, {len(reviews)} of your answers have been reviewed.
+            </p>
+            <table style="width: 100%; border-collapse: collapse;">{''.join(rows)}
+            </table>
+        </div>
+        <div style="padding: 24px 32px; background-color: #f8f9fa;
+         border-top: 1px solid #e9ecef;">
+            <p style="margin: 0 0 8px; font-size: 14px; color: #6c757d;">
+                Best regards,<br>
+                The Review Team
+            </p>
+            <p style="margin: 0; font-size: 12px; color: #adb5bd;">
+                This is an automated notification. Please do not reply to this email.
+            </p>
+        </div>
+    </div>
+</body>
+</html>
+        """
+
+        email = EmailMultiAlternatives(subject, text_content, from_email, to)
+        email.attach_alternative(html_content, "text/html")
+        enqueue(email)
+
+        logger.info(f"Review digest with {len(reviews)} reviews queued for {receiver_email}")
+        return f"Review digest queued for {receiver_email}"
+
+    except Exception as exc:
+        logger.error(f"Failed to queue review digest to {receiver_email}: {str(exc)}")
+        raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
+
+
+def send_answer_review_digest(receiver_email, first_name, reviews):
+    """
+    Queue answer review digest task
+    """
+    return send_answer_review_digest_task.delay(receiver_email, first_name, reviews)
@@ -4,6 +4,9 @@ from celery import shared_task
 from decouple import config
 from django.core.mail import EmailMultiAlternatives
 
+from src.apps.notifications.models import OutboundEmail
+from src.apps.notifications.service.mail import enqueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,13 +81,13 @@ def send_email_verification_task(self, receiver_email, first_name, code):
 
         email = EmailMultiAlternatives(subject, text_content, from_email, to)
         email.attach_alternative(html_content, "text/html")
-        email.send()
+        enqueue(email, priority=OutboundEmail.Priority.HIGH)
 
-        logger.info(f"Email verification sent successfully to {receiver_email}")
-        return f"Email sent to {receiver_email}"
+        logger.info(f"Email verification queued for {receiver_email}")
+        return f"Email queued for {receiver_email}"
 
     except Exception as exc:
-        logger.error(f"Failed to send email verification to {receiver_email}: {str(exc)}")
+        logger.error(f"Failed to queue email verification to {receiver_email}: {str(exc)}")
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
 
 
@@ -151,13 +154,13 @@ def send_password_verification_task(self, email, first_name, code):
 
         email_msg = EmailMultiAlternatives(subject, text_content, from_email, to)
         email_msg.attach_alternative(html_content, "text/html")
-        email_msg.send()
+        enqueue(email_msg, priority=OutboundEmail.Priority.HIGH)
 
-        logger.info(f"Password reset email sent successfully to {email}")
-        return f"Password reset email sent to {email}"
+        logger.info(f"Password reset email queued for {email}")
+        return f"Password reset email queued for {email}"
 
     except Exception as exc:
-        logger.error(f"Failed to send password reset email to {email}: {str(exc)}")
+        logger.error(f"Failed to queue password reset email to {email}: {str(exc)}")
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
 
 
@@ -233,14 +236,14 @@ def send_email_change_verification_task(self, receiver_new_email, first_name, co
 
         email = EmailMultiAlternatives(subject, text_content, from_email, to)
         email.attach_alternative(html_content, "text/html")
-        email.send()
+        enqueue(email, priority=OutboundEmail.Priority.HIGH)
 
-        logger.info(f"Email change verification sent successfully to {receiver_new_email}")
-        return f"Email change verification sent to {receiver_new_email}"
+        logger.info(f"Email change verification queued for {receiver_new_email}")
+        return f"Email change verification queued for {receiver_new_email}"
 
     except Exception as exc:
         logger.error(
-            f"Failed to send email change" f" verification to {receiver_new_email}: {str(exc)}"
+            f"Failed to queue email change" f" verification to {receiver_new_email}: {str(exc)}"
         )
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
 
@@ -348,13 +351,13 @@ If you weren’t expecting this invitation, you can safely ignore this email.
         email_msg.attach_alternative(html_content, "text/html")
         # Optional helpful header
         # email_msg.extra_headers = {"List-Unsubscribe": "<mailto:support@yourcompany.com>"}
-        email_msg.send()
+        enqueue(email_msg)
 
-        logger.info(f"Activation invite sent successfully to {email}")
-        return f"Activation invite sent to {email}"
+        logger.info(f"Activation invite queued for {email}")
+        return f"Activation invite queued for {email}"
 
     except Exception as exc:
-        logger.error(f"Failed to send activation invite to {email}: {str(exc)}")
+        logger.error(f"Failed to queue activation invite to {email}: {str(exc)}")
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
 
 
@@ -464,11 +467,11 @@ If you didn't request this code, please ignore this email and consider changing
             "X-Priority": "1",  # High priority for security codes
             "X-MSMail-Priority": "High",
         }
-        email_msg.send()
+        enqueue(email_msg, priority=OutboundEmail.Priority.HIGH)
 
-        logger.info(f"OTP verification code sent successfully to {email}")
-        return f"OTP verification code sent to {email}"
+        logger.info(f"OTP verification code queued for {email}")
+        return f"OTP verification code queued for {email}"
 
     except Exception as exc:
-        logger.error(f"Failed to send OTP verification code to {email}: {str(exc)}")
+        logger.error(f"Failed to queue OTP verification code to {email}: {str(exc)}")
         raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
@@ -15,8 +15,10 @@ app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 # (Optional but helpful) explicitly import modules with tasks
 app.conf.imports = (
     "src.apps.users.tasks",
+    "src.apps.courses.tasks",
     "src.apps.users.service.tasks",
     "src.apps.submissions.service",
+    "src.apps.notifications.tasks",
 )
 
 # Clean up a stray route pattern you had (this was a no-op/mismatch)
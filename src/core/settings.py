@@ -322,6 +322,11 @@ EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True)
 EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="email@example.com")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="password")
 
+# Outbound email queue, see src.apps.notifications.service.mail
+OUTBOUND_EMAIL_BATCH_SIZE = config("OUTBOUND_EMAIL_BATCH_SIZE", default=50, cast=int)
+OUTBOUND_EMAIL_RATE_LIMIT = config("OUTBOUND_EMAIL_RATE_LIMIT", default=10, cast=float)
+OUTBOUND_EMAIL_MAX_ATTEMPTS = 5
+
 GOOGLE_CLIENT_ID = config("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = config("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = config("GOOGLE_REDIRECT_URI")
@@ -364,7 +369,20 @@ CELERY_BEAT_SCHEDULE = {
     "delete-deactivated-users": {
         "task": "users.delete_deactivated_users",
         "schedule": crontab(hour=0, minute=1),
-    }
+    },
+    "reconcile-unread-notification-counters": {
+        "task": "notifications.reconcile_unread_counters",
+        "schedule": crontab(minute="*/15"),
+    },
+    # retries whose backoff ran out; new emails schedule their own drain
+    "drain-outbound-email": {
+        "task": "notifications.drain_outbound_email",
+        "schedule": crontab(),
+    },
+    "purge-outbound-email": {
+        "task": "notifications.purge_outbound_email",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
 
 CELERY_TASK_REJECT_ON_WORKER_LOST = True
@@ -459,6 +477,16 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Online/offline tracking of WebSocket users, see src.apps.chat.service.presence
+PRESENCE_BACKEND = "src.apps.chat.service.presence.RedisPresenceBackend"
+
+# Unread notification badge counters, see src.apps.notifications.service.unread
+NOTIFICATION_COUNTER_BACKEND = "src.apps.notifications.service.unread.RedisUnreadCounterBackend"
+
+# Seconds answer review notifications wait to be merged into one digest (0 to
+# deliver right away), see src.apps.notifications.service.digest
+NOTIFICATION_DIGEST_WINDOW = config("NOTIFICATION_DIGEST_WINDOW", default=60, cast=int)
+
 CKEDITOR_UPLOAD_PATH = "ckeditor_uploads/"
 CKEDITOR_ALLOW_NONIMAGE_FILES = True
 CKEDITOR_CONFIGS = {
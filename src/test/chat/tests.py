@@ -0,0 +1,612 @@
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from channels.db import database_sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from src.api.chat.consumers import ChatConsumer
+from src.api.notifications.consumers import NotificationConsumer
+from src.apps.chat.models import ArchivedMessage, ChatRoom, Message
+from src.apps.chat.service import presence
+from src.apps.chat.service.archive import table_stats
+from src.apps.chat.service.messages import ChatRoomClosed, post_message
+from src.apps.chat.service.rooms import mark_read, with_unread_count
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.users.models import User
+
+
+class ChatRoomFixture:
+    """A teacher and a student of one course group, and their chat room."""
+
+    def setUp(self):
+        super().setUp()
+        self.teacher = User.objects.create(email="teacher@example.com")
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.group = CourseGroup.objects.create(name="Group", course=self.course)
+        CourseEnrollment.objects.create(
+            user=self.teacher, course=self.course, group=self.group, role="teacher"
+        )
+        self.student = self.enroll_student("student@example.com")
+        self.room = self.create_room(self.student)
+
+    def enroll_student(self, email):
+        student = User.objects.create(email=email)
+        CourseEnrollment.objects.create(user=student, course=self.course, group=self.group)
+        return student
+
+    def create_room(self, student):
+        return ChatRoom.objects.create(teacher=self.teacher, student=student, course=self.course)
+
+
+class FastTypingConsumer(ChatConsumer):
+    typing_timeout = 0.2
+    typing_debounce = 0.05
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    PRESENCE_BACKEND="src.apps.chat.service.presence.InMemoryPresenceBackend",
+    PRESENCE_BROADCAST_DELAY=0.05,
+)
+class ChatSocketTestCase(ChatRoomFixture, TransactionTestCase):
+    consumer = FastTypingConsumer
+
+    def setUp(self):
+        super().setUp()
+        presence.get_backend().clear()
+
+        self.group_sends = []
+        original = InMemoryChannelLayer.group_send
+
+        async def counting_group_send(layer, group, message):
+            self.group_sends.append(message["type"])
+            await original(layer, group, message)
+
+        patcher = mock.patch.object(InMemoryChannelLayer, "group_send", counting_group_send)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _connect(self, user, query=""):
+        """
+        Open a chat socket; returns it with its initial presence frame. With
+        ``history=page`` the initial history frame is kept as
+        ``communicator.history``.
+        """
+        communicator = WebsocketCommunicator(
+            self.consumer.as_asgi(), f"/ws/chat/{self.room.pk}/?{query}"
+        )
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"chat_room_id": str(self.room.pk)}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame["type"], "presence")
+        if "history=page" in query:
+            communicator.history = json.loads(await communicator.receive_from())
+            self.assertEqual(communicator.history["type"], "history")
+        return communicator, frame["users"]
+
+    async def _receive(self, communicator, skip=("presence",)):
+        while True:
+            frame = json.loads(await communicator.receive_from())
+            if frame["type"] not in skip:
+                return frame
+
+    async def _nothing_but_presence(self, communicator, timeout=0.1):
+        while not await communicator.receive_nothing(timeout):
+            if json.loads(await communicator.receive_from())["type"] != "presence":
+                return False
+        return True
+
+    async def _settle(self):
+        """Wait for the pending batched presence broadcast."""
+        task = presence.get_broadcaster().task
+        if task is not None:
+            await task
+
+    async def _close(self, *communicators):
+        for communicator in communicators:
+            await communicator.disconnect()
+        # let the broadcast finish inside this event loop
+        await self._settle()
+
+
+class TypingCoalescingTests(ChatSocketTestCase):
+    async def _typing(self, communicator, is_typing=True):
+        await communicator.send_to(text_data=json.dumps({"type": "typing", "is_typing": is_typing}))
+
+    async def _received_typing(self, communicator):
+        frame = await self._receive(communicator)
+        self.assertEqual(frame["type"], "typing")
+        return frame["is_typing"]
+
+    def _typing_sends(self):
+        return self.group_sends.count("typing_status")
+
+    async def test_keystrokes_cost_one_group_send_per_transition(self):
+        student, _ = await self._connect(self.student)
+        teacher, _ = await self._connect(self.teacher)
+
+        for _ in range(50):
+            await self._typing(student)
+        self.assertTrue(await self._received_typing(teacher))
+        self.assertTrue(await self._nothing_but_presence(teacher))
+        self.assertEqual(self._typing_sends(), 1)
+
+        await self._typing(student, False)
+        self.assertFalse(await self._received_typing(teacher))
+        self.assertEqual(self._typing_sends(), 2)
+
+        await self._close(student, teacher)
+
+    async def test_typing_expires_without_frames(self):
+        student, _ = await self._connect(self.student)
+        teacher, _ = await self._connect(self.teacher)
+
+        await self._typing(student)
+        self.assertTrue(await self._received_typing(teacher))
+        self.assertFalse(await self._received_typing(teacher))
+        self.assertEqual(self._typing_sends(), 2)
+
+        await self._close(student, teacher)
+
+    async def test_stop_start_flap_within_debounce_is_dropped(self):
+        student, _ = await self._connect(self.student)
+        teacher, _ = await self._connect(self.teacher)
+
+        await self._typing(student)
+        self.assertTrue(await self._received_typing(teacher))
+        for _ in range(10):
+            await self._typing(student, False)
+            await self._typing(student)
+        self.assertTrue(await self._nothing_but_presence(teacher))
+        self.assertEqual(self._typing_sends(), 1)
+
+        await student.disconnect()
+        self.assertFalse(await self._received_typing(teacher))
+        await self._close(teacher)
+
+    async def test_sending_a_message_stops_typing(self):
+        student, _ = await self._connect(self.student)
+
+        await self._typing(student)
+        await student.send_to(text_data=json.dumps({"type": "send_message", "content": "hi"}))
+        frame = await self._receive(student)
+        self.assertEqual(frame["type"], "message")
+        sends = [send for send in self.group_sends if send != "presence_changed"]
+        self.assertEqual(sends, ["typing_status", "typing_status", "chat_message"])
+        await asyncio.sleep(0.3)
+        self.assertEqual(self._typing_sends(), 2)
+
+        await self._close(student)
+
+
+class PresenceTests(ChatSocketTestCase):
+    consumer = ChatConsumer
+
+    async def _connect_notifications(self, user):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_connections_are_reference_counted(self):
+        notifications = await self._connect_notifications(self.student)
+        chat, _ = await self._connect(self.student)
+        self.assertEqual(presence.lookup([self.student.pk]), {self.student.pk: True})
+
+        await chat.disconnect()
+        self.assertEqual(presence.lookup([self.student.pk]), {self.student.pk: True})
+        await self._close(notifications)
+        self.assertEqual(presence.lookup([self.student.pk]), {self.student.pk: False})
+
+    async def test_changes_are_broadcast_to_the_room_in_one_event(self):
+        teacher, users = await self._connect(self.teacher)
+        self.assertEqual(users, [{"user_id": self.student.pk, "online": False}])
+        await self._settle()
+        self.assertEqual(self.group_sends.count("presence_changed"), 1)
+
+        # two sockets of the student within one batch window
+        student, _ = await self._connect(self.student)
+        notifications = await self._connect_notifications(self.student)
+        frame = await self._receive(teacher, skip=())
+        self.assertEqual(
+            frame, {"type": "presence", "users": [{"user_id": self.student.pk, "online": True}]}
+        )
+        self.assertEqual(self.group_sends.count("presence_changed"), 2)
+
+        await self._close(student, notifications)
+        frame = await self._receive(teacher, skip=())
+        self.assertEqual(frame["users"], [{"user_id": self.student.pk, "online": False}])
+        await self._close(teacher)
+
+    def test_presence_lookup_only_reports_chat_partners(self):
+        stranger = User.objects.create(email="stranger@example.com")
+        backend = presence.get_backend()
+        backend.connect(self.student.pk)
+        backend.connect(stranger.pk)
+
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        ids = f"{self.student.pk},{stranger.pk},{self.teacher.pk}"
+        response = client.get(f"/api/chat/presence/?user_ids={ids}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {"user_id": self.teacher.pk, "online": False},
+                {"user_id": self.student.pk, "online": True},
+            ],
+        )
+        self.assertEqual(client.get("/api/chat/presence/?user_ids=a").status_code, 400)
+
+
+class ChatHistoryTests(ChatSocketTestCase):
+    consumer = ChatConsumer
+
+    async def _post(self, count):
+        for index in range(count):
+            await database_sync_to_async(post_message)(self.room, self.teacher, f"message {index}")
+
+    def _contents(self, messages):
+        return [message["content"] for message in messages]
+
+    async def test_connect_sends_the_newest_page_in_one_frame(self):
+        limit = ChatConsumer.recent_messages_limit
+        await self._post(limit + 5)
+
+        student, _ = await self._connect(self.student, "history=page")
+        history = student.history
+        self.assertEqual(
+            self._contents(history["messages"]),
+            [f"message {index}" for index in range(5, limit + 5)],
+        )
+        self.assertIsNotNone(history["next_cursor"])
+        self.assertTrue(await self._nothing_but_presence(student))
+
+        await student.send_json_to({"type": "load_history", "cursor": history["next_cursor"]})
+        older = await self._receive(student)
+        self.assertEqual(older["type"], "history")
+        self.assertEqual(
+            self._contents(older["messages"]), [f"message {index}" for index in range(5)]
+        )
+        self.assertIsNone(older["next_cursor"])
+
+        await student.send_json_to({"type": "load_history", "limit": 2})
+        newest = await self._receive(student)
+        self.assertEqual(
+            self._contents(newest["messages"]),
+            [f"message {index}" for index in range(limit + 3, limit + 5)],
+        )
+        await self._close(student)
+
+    async def test_connect_sends_one_frame_per_message_by_default(self):
+        await self._post(ChatConsumer.recent_messages_limit + 2)
+
+        student, _ = await self._connect(self.student)
+        frames = [await self._receive(student) for _ in range(ChatConsumer.recent_messages_limit)]
+        self.assertEqual({frame["type"] for frame in frames}, {"message"})
+        self.assertEqual(
+            self._contents(frame["data"] for frame in frames),
+            [f"message {index}" for index in range(2, ChatConsumer.recent_messages_limit + 2)],
+        )
+        self.assertTrue(await self._nothing_but_presence(student))
+        await self._close(student)
+
+    def test_rest_cursor_mode_pages_newest_first(self):
+        for index in range(5):
+            post_message(self.room, self.teacher, f"message {index}")
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = f"/api/chat/rooms/{self.room.pk}/messages/"
+
+        self.assertEqual(len(client.get(url).json()), 5)
+
+        page = client.get(url, {"pagination": "cursor", "page_size": 3}).json()
+        self.assertEqual(self._contents(page["results"]), ["message 4", "message 3", "message 2"])
+        page = client.get(page["next"]).json()
+        self.assertEqual(self._contents(page["results"]), ["message 1", "message 0"])
+        self.assertIsNone(page["next"])
+        page = client.get(page["previous"]).json()
+        self.assertEqual(self._contents(page["results"]), ["message 4", "message 3", "message 2"])
+
+
+@modify_settings(MIDDLEWARE={"remove": "silk.middleware.SilkyMiddleware"})
+class MessageWriteServiceTests(ChatRoomFixture, TestCase):
+    def _statements(self, context):
+        """Data statements only; savepoints and profiler EXPLAINs are not the write path."""
+        statements = (query["sql"].split()[0].upper() for query in context.captured_queries)
+        return [
+            statement
+            for statement in statements
+            if statement in ("SELECT", "INSERT", "UPDATE", "DELETE")
+        ]
+
+    def test_each_message_is_one_insert_and_one_update(self):
+        for index in range(3):
+            with CaptureQueriesContext(connection) as context:
+                message = post_message(self.room, self.student, f"message {index}")
+            self.assertEqual(self._statements(context), ["INSERT", "UPDATE"])
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message, message)
+        self.assertEqual(self.room.updated_at, message.created_at)
+
+    def test_inactive_room_rolls_the_message_back(self):
+        ChatRoom.objects.filter(pk=self.room.pk).update(is_active=False)
+        with self.assertRaises(ChatRoomClosed):
+            post_message(self.room, self.student, "too late")
+        self.assertFalse(Message.objects.exists())
+
+    def test_messages_created_elsewhere_still_move_the_room(self):
+        message = Message.objects.create(chat_room=self.room, sender=self.student, content="hi")
+        self.assertEqual(ChatRoom.objects.get(pk=self.room.pk).last_message, message)
+
+        # only post_message guards against closed rooms; the signal never raises
+        ChatRoom.objects.filter(pk=self.room.pk).update(is_active=False)
+        Message.objects.create(chat_room=self.room, sender=self.student, content="imported")
+        self.assertEqual(Message.objects.count(), 2)
+        self.assertEqual(ChatRoom.objects.get(pk=self.room.pk).last_message, message)
+
+    def test_rest_create_uses_the_write_service(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = f"/api/chat/rooms/{self.room.pk}/messages/"
+        response = client.post(url, {"content": "hello"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            ChatRoom.objects.get(pk=self.room.pk).last_message_id, response.json()["id"]
+        )
+
+        ChatRoom.objects.filter(pk=self.room.pk).update(is_active=False)
+        response = client.post(url, {"content": "again"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Message.objects.count(), 1)
+
+
+class ReadCursorTests(ChatRoomFixture, TestCase):
+    def _unread(self, user):
+        rooms = with_unread_count(ChatRoom.objects.filter(pk=self.room.pk), user)
+        return rooms.get().unread_count
+
+    def test_cursor_only_moves_forward(self):
+        first = post_message(self.room, self.teacher, "first")
+        second = post_message(self.room, self.teacher, "second")
+        self.room.refresh_from_db()
+
+        self.assertEqual(mark_read(self.room, self.student, second.pk), second.pk)
+        # a stale client marking an older message must not move the cursor back
+        stale = ChatRoom.objects.get(pk=self.room.pk)
+        stale.student_last_read_id = 0
+        self.assertIsNone(mark_read(stale, self.student, first.pk))
+        self.assertIsNone(mark_read(self.room, self.student, second.pk))
+        self.assertEqual(ChatRoom.objects.get(pk=self.room.pk).student_last_read_id, second.pk)
+
+    def test_outsiders_have_no_cursor(self):
+        message = post_message(self.room, self.teacher, "hello")
+        outsider = self.enroll_student("outsider@example.com")
+        self.assertIsNone(mark_read(self.room, outsider, message.pk))
+
+    def test_unread_count_annotation(self):
+        first = post_message(self.room, self.teacher, "first")
+        post_message(self.room, self.teacher, "second")
+        post_message(self.room, self.student, "reply")
+
+        self.assertEqual(self._unread(self.student), 2)
+        self.assertEqual(self._unread(self.teacher), 1)
+
+        mark_read(self.room, self.student, first.pk)
+        self.assertEqual(self._unread(self.student), 1)
+        self.room.refresh_from_db()
+        mark_read(self.room, self.teacher)
+        self.assertEqual(self._unread(self.teacher), 0)
+        self.assertEqual(self._unread(self.student), 1)
+
+    def test_rest_mark_as_read(self):
+        first = post_message(self.room, self.teacher, "first")
+        last = post_message(self.room, self.teacher, "second")
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = f"/api/chat/rooms/{self.room.pk}/mark_as_read/"
+
+        response = client.post(url, {"message_id": first.pk}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["last_read_message_id"], first.pk)
+
+        response = client.post(url, {}, format="json")
+        self.assertEqual(response.json()["last_read_message_id"], last.pk)
+
+        response = client.post(url, {"message_id": first.pk}, format="json")
+        self.assertEqual(response.json()["last_read_message_id"], last.pk)
+
+    def test_rest_mark_as_read_rejects_other_rooms_messages(self):
+        other_room = self.create_room(self.enroll_student("other@example.com"))
+        foreign = post_message(other_room, self.teacher, "not yours")
+        post_message(self.room, self.teacher, "yours")
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = f"/api/chat/rooms/{self.room.pk}/mark_as_read/"
+
+        for message_id in (foreign.pk, foreign.pk + 100, "abc"):
+            response = client.post(url, {"message_id": message_id}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(ChatRoom.objects.get(pk=self.room.pk).student_last_read_id, 0)
+
+
+class ReadCursorMigrationTests(TransactionTestCase):
+    migrate_from = [("chat", "0005_message_history_index")]
+    migrate_to = [("chat", "0006_read_cursors")]
+
+    def setUp(self):
+        super().setUp()
+        self.teacher = User.objects.create(email="teacher@example.com")
+        self.student = User.objects.create(email="student@example.com")
+        self.other = User.objects.create(email="other@example.com")
+        self.course = Course.objects.create(name="Course", description="Description")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.old_apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_cursors_point_at_the_newest_read_message(self):
+        ChatRoom = self.old_apps.get_model("chat", "ChatRoom")
+        Message = self.old_apps.get_model("chat", "Message")
+        room = ChatRoom.objects.create(
+            teacher_id=self.teacher.pk, student_id=self.student.pk, course_id=self.course.pk
+        )
+        unread_room = ChatRoom.objects.create(
+            teacher_id=self.teacher.pk, student_id=self.other.pk, course_id=self.course.pk
+        )
+
+        def message(sender, is_read, chat_room=room):
+            return Message.objects.create(
+                chat_room=chat_room, sender_id=sender.pk, content="text", is_read=is_read
+            )
+
+        message(self.teacher, True)
+        read_by_student = message(self.teacher, True)
+        message(self.teacher, False)
+        read_by_teacher = message(self.student, True)
+        message(self.student, False)
+        message(self.teacher, False, chat_room=unread_room)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        new_apps = executor.loader.project_state(self.migrate_to).apps
+        ChatRoom = new_apps.get_model("chat", "ChatRoom")
+
+        room = ChatRoom.objects.get(pk=room.pk)
+        self.assertEqual(room.student_last_read_id, read_by_student.pk)
+        self.assertEqual(room.teacher_last_read_id, read_by_teacher.pk)
+        unread_room = ChatRoom.objects.get(pk=unread_room.pk)
+        self.assertEqual(unread_room.student_last_read_id, 0)
+        self.assertEqual(unread_room.teacher_last_read_id, 0)
+
+
+class MessageSearchTests(ChatRoomFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = self.enroll_student("other@example.com")
+        self.other_room = self.create_room(self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _search(self, query, **params):
+        response = self.client.get("/api/chat/messages/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_hits_are_scoped_to_the_users_rooms(self):
+        post_message(self.room, self.teacher, "The homework deadline is Friday")
+        post_message(self.other_room, self.teacher, "Your homework is late")
+        post_message(self.room, self.student, "Thanks!")
+
+        data = self._search("homework")
+        self.assertEqual(len(data["results"]), 1)
+        hit = data["results"][0]
+        self.assertEqual(hit["chat_room"], self.room.pk)
+        self.assertEqual(hit["snippet"], "The <mark>homework</mark> deadline is Friday")
+
+    def test_snippets_escape_message_content(self):
+        post_message(self.room, self.teacher, "<b>bold</b> homework")
+        hit = self._search("homework")["results"][0]
+        self.assertEqual(hit["snippet"], "&lt;b&gt;bold&lt;/b&gt; <mark>homework</mark>")
+
+    def test_hits_are_keyset_paginated_newest_first(self):
+        for index in range(5):
+            post_message(self.room, self.teacher, f"homework {index}")
+
+        first = self._search("homework", page_size=3)
+        self.assertEqual(
+            [hit["content"] for hit in first["results"]], ["homework 4", "homework 3", "homework 2"]
+        )
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(
+            [hit["content"] for hit in second["results"]], ["homework 1", "homework 0"]
+        )
+        self.assertIsNone(second["next"])
+
+    def test_edits_are_searchable(self):
+        message = post_message(self.room, self.teacher, "draft")
+        message.content = "final exam schedule"
+        message.save(update_fields=["content"])
+        self.assertEqual(len(self._search("exam")["results"]), 1)
+        self.assertEqual(len(self._search("draft")["results"]), 0)
+
+    def test_short_queries_are_rejected(self):
+        response = self.client.get("/api/chat/messages/search/", {"q": " a "})
+        self.assertEqual(response.status_code, 400)
+
+
+class MessageArchiveTests(ChatRoomFixture, TestCase):
+    def _message(self, content, days_ago):
+        message = post_message(self.room, self.teacher, content)
+        created_at = timezone.now() - timedelta(days=days_ago)
+        Message.objects.filter(pk=message.pk).update(created_at=created_at)
+        return message
+
+    def test_old_messages_move_to_the_archive(self):
+        old = [self._message(f"old {index}", days_ago=400 - index) for index in range(3)]
+        recent = self._message("recent", days_ago=1)
+        # the room's last message always stays in the hot table
+        last = self._message("last but old", days_ago=300)
+
+        out = StringIO()
+        call_command("archive_chat_messages", "--keep-days=180", "--batch-size=2", stdout=out)
+
+        self.assertEqual(set(Message.objects.values_list("pk", flat=True)), {recent.pk, last.pk})
+        archived = ArchivedMessage.objects.order_by("pk")
+        self.assertEqual([message.pk for message in archived], [message.pk for message in old])
+        self.assertEqual(archived[0].content, "old 0")
+        self.assertIn("archived 3 messages", out.getvalue())
+        self.assertIn("after", out.getvalue())
+
+        client = APIClient()
+        client.force_authenticate(self.student)
+        response = client.get(f"/api/chat/rooms/{self.room.pk}/archived_messages/?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([hit["content"] for hit in data["results"]], ["old 2", "old 1"])
+        self.assertIsNotNone(data["next"])
+
+    def test_table_size_is_looked_up_by_quoted_name(self):
+        self._message("recent", days_ago=1)
+        fake = mock.MagicMock(vendor="postgresql")
+        fake.ops.quote_name = connection.ops.quote_name
+        cursor = fake.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (8192,)
+
+        with mock.patch("src.apps.chat.service.archive.connection", fake):
+            stats = table_stats(Message)
+
+        self.assertEqual(stats, {"rows": 1, "bytes": 8192})
+        cursor.execute.assert_called_once_with(
+            "SELECT pg_total_relation_size(%s)", ['"Chat_Messages"']
+        )
+
+    def test_dry_run_moves_nothing(self):
+        self._message("old", days_ago=400)
+        self._message("recent", days_ago=1)
+        out = StringIO()
+        call_command("archive_chat_messages", "--dry-run", stdout=out)
+        self.assertIn("1 messages", out.getvalue())
+        self.assertEqual(Message.objects.count(), 2)
+        self.assertFalse(ArchivedMessage.objects.exists())
@@ -0,0 +1,897 @@
+import csv
+import threading
+from contextlib import contextmanager
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+from django.test import TestCase, TransactionTestCase, modify_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from src.api.courses.serializers.courses.course_export_serializer import CourseExportSerializer
+from src.api.users.serializers.admin.files.export_user_serializer import ExportUserSerializer
+from src.apps.assignments.models import Task
+from src.apps.common.pagination import KeysetPagination
+from src.apps.common.utils.files.export_courses import (
+    export_courses_to_csv,
+    export_courses_to_xlsx,
+)
+from src.apps.common.utils.files.export_users import export_users_to_csv, export_users_to_xlsx
+from src.apps.courses.models import Category, Course, CourseEnrollment, CourseGroup
+from src.apps.courses.service.counters import (
+    COURSE_COUNTER_FIELDS,
+    GROUP_COUNTER_FIELDS,
+    deferred_counters,
+    rebuild_all_counters,
+)
+from src.apps.courses.service.enrollments import (
+    AlreadyEnrolled,
+    StudentsLimitExceeded,
+    enroll_students,
+    enroll_teachers,
+    self_enroll_student,
+    unenroll_students,
+    unenroll_teachers,
+)
+from src.apps.courses.service.list_cache import cache_stats
+from src.apps.courses.service.progress import apply_review, refresh_progress
+from src.apps.courses.service.reassign import delete_answers, reassign
+from src.apps.courses.service.scope import teacher_can_access_answer
+from src.apps.grades.models import Grade
+from src.apps.submissions.models import Answer
+from src.apps.users.models import User
+
+
+@modify_settings(MIDDLEWARE={"remove": "silk.middleware.SilkyMiddleware"})
+class CourseGroupTeachersQueryCountTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email="admin@example.com")
+        self.admin.groups.add(Group.objects.get_or_create(name="Admins")[0])
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.client.force_authenticate(self.admin)
+        self._users = 0
+
+    def _user(self):
+        self._users += 1
+        return User.objects.create(email=f"user{self._users}@example.com")
+
+    def _create_groups(self, count, teachers_per_group=2):
+        for index in range(count):
+            group = CourseGroup.objects.create(name=f"Group {index}", course=self.course)
+            for _ in range(teachers_per_group):
+                CourseEnrollment.objects.create(
+                    user=self._user(), course=self.course, group=group, role="teacher"
+                )
+
+    def _count_queries(self, url):
+        # fresh user instance so per-user caches don't skew the comparison
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_group_list_query_count_does_not_grow_with_groups(self):
+        self._create_groups(2)
+        small, data = self._count_queries("/api/course/groups/")
+        self.assertEqual(len(data), 2)
+
+        self._create_groups(10)
+        large, data = self._count_queries("/api/course/groups/")
+        self.assertEqual(len(data), 12)
+        self.assertEqual(small, large)
+        self.assertTrue(all(len(group["teachers"]) == 2 for group in data))
+
+    def test_course_groups_query_count_does_not_grow_with_groups(self):
+        url = f"/api/course/courses/{self.course.pk}/groups/"
+        self._create_groups(2)
+        small, _ = self._count_queries(url)
+
+        self._create_groups(10)
+        large, data = self._count_queries(url)
+        self.assertEqual(len(data), 12)
+        self.assertEqual(small, large)
+
+    def test_teachers_property_is_used_without_prefetch(self):
+        self._create_groups(1, teachers_per_group=3)
+        group = CourseGroup.objects.get()
+        self.assertFalse(hasattr(group, "teacher_enrollments"))
+        self.assertEqual(group.teachers.count(), 3)
+        self.assertEqual(len(CourseGroup.objects.with_teachers().get().teacher_enrollments), 3)
+
+
+class SelfEnrollSeatReservationTests(APITestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.group = CourseGroup.objects.create(
+            name="Group",
+            course=self.course,
+            students_limit=3,
+            self_registration=True,
+            registration_token="token",
+        )
+        self.users = [User.objects.create(email=f"s{i}@example.com") for i in range(5)]
+
+    def test_teachers_do_not_take_student_seats(self):
+        teacher = User.objects.create(email="teacher@example.com")
+        CourseEnrollment.objects.create(
+            user=teacher, course=self.course, group=self.group, role="teacher"
+        )
+        for user in self.users[:3]:
+            self_enroll_student(self.group, user)
+
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.students_count, 3)
+        self.assertEqual(self.group.members_count, 4)
+
+    def test_limit_is_not_exceeded(self):
+        for user in self.users[:3]:
+            self_enroll_student(self.group, user)
+        with self.assertRaises(StudentsLimitExceeded):
+            self_enroll_student(self.group, self.users[3])
+
+        self.group.refresh_from_db()
+        self.course.refresh_from_db()
+        self.assertEqual(self.group.students_count, 3)
+        self.assertEqual(self.course.students_count, 3)
+        self.assertEqual(CourseEnrollment.objects.filter(group=self.group).count(), 3)
+
+    def test_duplicate_enrollment_releases_the_seat(self):
+        self_enroll_student(self.group, self.users[0])
+        other = CourseGroup.objects.create(name="Other", course=self.course, students_limit=3)
+        with self.assertRaises(AlreadyEnrolled):
+            self_enroll_student(other, self.users[0])
+
+        other.refresh_from_db()
+        self.assertEqual(other.students_count, 0)
+        self.assertEqual(other.members_count, 0)
+
+    def test_zero_limit_means_no_limit(self):
+        CourseGroup.objects.filter(pk=self.group.pk).update(students_limit=0)
+        for user in self.users:
+            self_enroll_student(self.group, user)
+
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.students_count, 5)
+
+    def test_enroll_by_token_endpoint(self):
+        for user in self.users[:4]:
+            self.client.force_authenticate(user)
+            response = self.client.get("/api/course/groups/enroll/token/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Too many students"})
+        self.assertEqual(CourseEnrollment.objects.filter(group=self.group).count(), 3)
+
+
+class GroupEnrollmentTests(APITestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.group = CourseGroup.objects.create(name="Group", course=self.course)
+        self.users = [User.objects.create(email=f"g{i}@example.com") for i in range(4)]
+
+    def ids(self, users):
+        return [user.pk for user in users]
+
+    def test_zero_limit_means_no_limit(self):
+        CourseGroup.objects.filter(pk=self.group.pk).update(students_limit=0)
+        self.group.refresh_from_db()
+
+        result = enroll_students(self.group, self.ids(self.users))
+
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(CourseEnrollment.objects.filter(group=self.group).count(), 4)
+
+    def test_report_has_one_outcome_per_id(self):
+        other = CourseGroup.objects.create(name="Other", course=self.course)
+        enroll_students(self.group, self.ids(self.users[:1]))
+        enroll_students(other, self.ids(self.users[1:2]))
+
+        missing = max(self.ids(self.users)) + 1
+        result = enroll_students(self.group, self.ids(self.users[:3]) + [missing, self.users[2].pk])
+
+        self.assertEqual(
+            result["report"],
+            [
+                {"user_id": self.users[0].pk, "status": "already_enrolled"},
+                {"user_id": self.users[1].pk, "status": "moved"},
+                {"user_id": self.users[2].pk, "status": "created"},
+                {"user_id": missing, "status": "not_found"},
+            ],
+        )
+        self.assertEqual(result["errors"], [{"user_id": missing, "error": "not found"}])
+        self.assertEqual(sorted(e.user_id for e in result["enrollments"]), self.ids(self.users[:3]))
+
+    def test_moves_keep_one_enrollment_per_course(self):
+        other = CourseGroup.objects.create(name="Other", course=self.course)
+        enroll_students(other, self.ids(self.users[:2]))
+
+        enroll_students(self.group, self.ids(self.users[:2]))
+
+        self.assertEqual(
+            list(
+                CourseEnrollment.objects.filter(user__in=self.users[:2]).values_list(
+                    "group_id", flat=True
+                )
+            ),
+            [self.group.pk, self.group.pk],
+        )
+        self.group.refresh_from_db()
+        other.refresh_from_db()
+        self.course.refresh_from_db()
+        self.assertEqual((self.group.students_count, other.students_count), (2, 0))
+        self.assertEqual(self.course.students_count, 2)
+
+    def test_limit_counts_new_and_moved_students_only(self):
+        other = CourseGroup.objects.create(name="Other", course=self.course)
+        enroll_students(other, self.ids(self.users[3:]))
+        CourseGroup.objects.filter(pk=self.group.pk).update(students_limit=2)
+        enroll_students(self.group, self.ids(self.users[:1]))
+
+        with self.assertRaises(StudentsLimitExceeded) as raised:
+            enroll_students(self.group, self.ids(self.users[1:]))
+        self.assertEqual((raised.exception.requested, raised.exception.available), (3, 1))
+        # nothing was written
+        self.assertEqual(CourseEnrollment.objects.filter(group=self.group).count(), 1)
+        self.assertEqual(CourseEnrollment.objects.get(user=self.users[3]).group_id, other.pk)
+
+        # already enrolled students do not take another seat
+        result = enroll_students(self.group, self.ids(self.users[:2]))
+        self.assertEqual(
+            [row["status"] for row in result["report"]], ["already_enrolled", "created"]
+        )
+
+    def test_unenroll_reports_removed_and_missing(self):
+        enroll_students(self.group, self.ids(self.users[:2]))
+        enroll_teachers(self.group, self.ids(self.users[2:3]))
+
+        result = unenroll_students(self.group, self.ids(self.users[:3]))
+        self.assertEqual(
+            [row["status"] for row in result["report"]], ["removed", "removed", "not_enrolled"]
+        )
+        self.assertEqual(
+            result["errors"], [{"user_id": self.users[2].pk, "error": "enrollment not found"}]
+        )
+
+        result = unenroll_teachers(self.group, self.ids(self.users[2:4]))
+        self.assertEqual([row["status"] for row in result["report"]], ["removed", "not_enrolled"])
+        self.assertFalse(CourseEnrollment.objects.filter(group=self.group).exists())
+        self.group.refresh_from_db()
+        self.assertEqual((self.group.members_count, self.group.students_count), (0, 0))
+
+
+class ConcurrentSelfEnrollTests(TransactionTestCase):
+    limit = 5
+    workers = 20
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_concurrent_registrations_never_oversubscribe(self):
+        course = Course.objects.create(name="Course", description="Description")
+        group = CourseGroup.objects.create(name="Group", course=course, students_limit=self.limit)
+        users = [User.objects.create(email=f"c{i}@example.com") for i in range(self.workers)]
+
+        barrier = threading.Barrier(self.workers)
+        outcomes = []
+
+        def register(user):
+            try:
+                barrier.wait()
+                self_enroll_student(group, user)
+                outcomes.append("enrolled")
+            except StudentsLimitExceeded:
+                outcomes.append("full")
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=register, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        group.refresh_from_db()
+        self.assertEqual(outcomes.count("enrolled"), self.limit)
+        self.assertEqual(outcomes.count("full"), self.workers - self.limit)
+        self.assertEqual(group.students_count, self.limit)
+        self.assertEqual(
+            CourseEnrollment.objects.filter(group=group, role="student").count(), self.limit
+        )
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_concurrent_bulk_enrollments_never_oversubscribe(self):
+        course = Course.objects.create(name="Course", description="Description")
+        group = CourseGroup.objects.create(name="Group", course=course, students_limit=self.limit)
+        batches = [
+            [User.objects.create(email=f"b{i}-{j}@example.com").pk for j in range(2)]
+            for i in range(self.workers // 2)
+        ]
+
+        barrier = threading.Barrier(len(batches))
+        outcomes = []
+
+        def register(user_ids):
+            try:
+                barrier.wait()
+                enroll_students(group, user_ids)
+                outcomes.append("enrolled")
+            except StudentsLimitExceeded:
+                outcomes.append("full")
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=register, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        group.refresh_from_db()
+        self.assertEqual(outcomes.count("enrolled"), self.limit // 2)
+        self.assertEqual(group.students_count, self.limit // 2 * 2)
+        self.assertEqual(
+            CourseEnrollment.objects.filter(group=group, role="student").count(),
+            group.students_count,
+        )
+
+
+class StoredCounterTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(email="author@example.com")
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.group = CourseGroup.objects.create(name="Group", course=self.course)
+        self.other_group = CourseGroup.objects.create(name="Other", course=self.course)
+        self._users = 0
+
+    def user(self):
+        self._users += 1
+        return User.objects.create(email=f"member{self._users}@example.com")
+
+    def enroll(self, group=None, role="student", user=None):
+        return CourseEnrollment.objects.create(
+            user=user or self.user(), course=self.course, group=group or self.group, role=role
+        )
+
+    def task(self, **kwargs):
+        return Task.objects.create(
+            name="Task", course=self.course, created_by=self.author, **kwargs
+        )
+
+    def stored(self):
+        courses = {
+            course.pk: [getattr(course, field) for field in COURSE_COUNTER_FIELDS]
+            for course in Course._base_manager.all()
+        }
+        groups = {
+            group.pk: [getattr(group, field) for field in GROUP_COUNTER_FIELDS]
+            for group in CourseGroup._base_manager.all()
+        }
+        return courses, groups
+
+    def assertCounters(self, course, group=None, other_group=None):
+        """Stored values are as expected and a full recount leaves them unchanged."""
+        stored = self.stored()
+        self.assertEqual(stored[0][self.course.pk], course)
+        if group is not None:
+            self.assertEqual(stored[1][self.group.pk], group)
+        if other_group is not None:
+            self.assertEqual(stored[1][self.other_group.pk], other_group)
+        rebuild_all_counters()
+        self.assertEqual(self.stored(), stored)
+
+    def test_single_row_writes(self):
+        # students, teachers, groups, tasks
+        self.assertCounters([0, 0, 2, 0], [0, 0], [0, 0])
+        student = self.enroll()
+        self.enroll(group=self.other_group)
+        teacher = self.user()
+        self.enroll(role="teacher", user=teacher)
+        self.enroll(group=self.other_group, role="teacher", user=teacher)
+        first, _ = self.task(), self.task()
+        self.assertCounters([2, 1, 2, 2], [2, 1], [2, 1])
+
+        student.group = self.other_group
+        student.save()
+        self.assertCounters([2, 1, 2, 2], [1, 0], [3, 2])
+
+        student.role = "teacher"
+        student.save()
+        self.assertCounters([1, 2, 2, 2], [1, 0], [3, 1])
+
+        student.delete()
+        first.is_deleted = True
+        first.save()
+        self.assertCounters([1, 1, 2, 1], [1, 0], [2, 1])
+
+        self.other_group.is_deleted = True
+        self.other_group.save()
+        self.assertCounters([1, 1, 1, 1])
+        first.delete()
+        self.assertCounters([1, 1, 1, 1])
+
+    def test_rolled_back_writes_leave_counters_alone(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.enroll()
+            self.task()
+            raise RuntimeError
+        self.assertCounters([0, 0, 2, 0], [0, 0], [0, 0])
+
+    def test_bulk_writes_recount_once(self):
+        users = [self.user() for _ in range(3)]
+        CourseEnrollment.objects.bulk_create(
+            [CourseEnrollment(user=user, course=self.course, group=self.group) for user in users]
+        )
+        Task.objects.bulk_create(
+            [Task(name=f"Task {i}", course=self.course, created_by=self.author) for i in range(3)]
+        )
+        self.assertCounters([3, 0, 2, 3], [3, 3], [0, 0])
+
+        CourseEnrollment.objects.filter(user=users[0]).update(group=self.other_group)
+        CourseEnrollment.objects.filter(user=users[1]).update(role="teacher")
+        Task.objects.filter(name="Task 0").update(is_deleted=True)
+        self.assertCounters([2, 1, 2, 2], [2, 1], [1, 1])
+
+        CourseGroup.objects.filter(pk=self.other_group.pk).update(is_deleted=True)
+        self.assertCounters([2, 1, 1, 2])
+
+    def test_deferred_counters_recount_once_on_exit(self):
+        with deferred_counters():
+            with CaptureQueriesContext(connection) as context:
+                for _ in range(3):
+                    self.enroll()
+                self.task()
+            self.assertFalse(any(query["sql"].startswith('UPDATE "Courses"') for query in context))
+            # nothing is applied until the block ends
+            self.assertEqual(Course.objects.get().students_count, 0)
+        self.assertCounters([3, 0, 2, 1], [3, 3], [0, 0])
+
+    def test_rebuild_command_repairs_drift(self):
+        self.enroll()
+        self.task()
+        Course._base_manager.update(students_count=42, tasks_count=0)
+        CourseGroup._base_manager.update(members_count=7)
+
+        call_command("rebuild_course_counters", "--skip-progress", stdout=StringIO())
+
+        self.assertCounters([1, 0, 2, 1], [1, 1], [0, 0])
+
+
+class ProgressTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(email="teacher@example.com")
+        self.student = User.objects.create(email="student@example.com")
+        self.course = Course.objects.create(name="Course", description="Description")
+        group = CourseGroup.objects.create(name="Group", course=self.course)
+        self.enrollment = CourseEnrollment.objects.create(
+            user=self.student, course=self.course, group=group
+        )
+        self.tasks = [
+            Task.objects.create(name=f"Task {i}", course=self.course, created_by=self.teacher)
+            for i in range(2)
+        ]
+        self.answers = [Answer.objects.create(task=task, user=self.student) for task in self.tasks]
+
+    def review(self, answer, score):
+        """Approve and grade ``answer`` the way the review serializer does."""
+        answer.status = Answer.Status.approved
+        answer.save()
+        Grade.objects.create(answer=answer, score=score, max_score=10, graded_by=self.teacher)
+        return apply_review(answer, approved_delta=1, points_delta=score)
+
+    def stored(self):
+        self.enrollment.refresh_from_db()
+        return (
+            self.enrollment.approved_tasks_count,
+            self.enrollment.total_points,
+            self.enrollment.progress,
+            self.enrollment.finished_at is not None,
+        )
+
+    def assertProgress(self, expected):
+        """Stored values are as expected and a full recount leaves them unchanged."""
+        self.assertEqual(self.stored(), expected)
+        refresh_progress([self.course.pk])
+        self.assertEqual(self.stored(), expected)
+
+    def test_reviews_match_the_recount(self):
+        self.assertEqual(self.review(self.answers[0], 7), 1)
+        self.assertProgress((1, 7, 50.0, False))
+        self.review(self.answers[1], 9)
+        self.assertProgress((2, 16, 100.0, True))
+
+        # a new task reopens the course
+        Task.objects.create(name="Task 2", course=self.course, created_by=self.teacher)
+        self.assertProgress((2, 16, 2 * 100.0 / 3, False))
+
+    def test_reviews_of_soft_deleted_tasks_are_skipped(self):
+        task = self.tasks[1]
+        task.is_deleted = True
+        task.save()
+        self.assertEqual(self.review(self.answers[1], 9), 0)
+        self.assertProgress((0, 0, 0.0, False))
+
+    def test_reviews_of_deleted_answers_are_skipped(self):
+        Answer.objects.filter(pk=self.answers[0].pk).update(is_deleted=True)
+        self.answers[0].refresh_from_db()
+        self.assertEqual(self.review(self.answers[0], 7), 0)
+        self.assertProgress((0, 0, 0.0, False))
+
+
+class ReassignTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(email="teacher@example.com")
+        self.course = Course.objects.create(name="Course", description="Description")
+        group = CourseGroup.objects.create(name="Group", course=self.course)
+        self.students = [User.objects.create(email=f"student{i}@example.com") for i in range(2)]
+        for student in self.students:
+            CourseEnrollment.objects.create(user=student, course=self.course, group=group)
+        self.tasks = [
+            Task.objects.create(name=f"Task {i}", course=self.course, created_by=self.teacher)
+            for i in range(3)
+        ]
+        for task in self.tasks:
+            for student in self.students:
+                answer = Answer.objects.create(
+                    task=task, user=student, status=Answer.Status.approved
+                )
+                Grade.objects.create(answer=answer, score=6, max_score=10, graded_by=self.teacher)
+        refresh_progress([self.course.pk])
+
+    def progress(self):
+        return list(
+            CourseEnrollment.objects.filter(course=self.course)
+            .order_by("user_id")
+            .values_list("approved_tasks_count", "total_points")
+        )
+
+    def answer_deletes(self, context):
+        table = f'DELETE FROM "{Answer._meta.db_table}"'
+        return sum(query["sql"].startswith(table) for query in context.captured_queries)
+
+    def test_deletes_in_chunks_and_recounts_progress(self):
+        self.assertEqual(self.progress(), [(3, 18), (3, 18)])
+
+        with CaptureQueriesContext(connection) as context:
+            deleted = delete_answers(task_id=self.tasks[0].pk, chunk_size=1)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(self.answer_deletes(context), 2)
+        self.assertFalse(Answer.objects.filter(task=self.tasks[0]).exists())
+        self.assertEqual(Grade.objects.count(), 4)
+        self.assertEqual(self.progress(), [(2, 12), (2, 12)])
+        refresh_progress([self.course.pk])
+        self.assertEqual(self.progress(), [(2, 12), (2, 12)])
+
+    def test_user_scope_leaves_other_students_alone(self):
+        first, second = self.students
+        deleted = delete_answers(course_id=self.course.pk, user_ids=[first.pk], chunk_size=2)
+
+        self.assertEqual(deleted, 3)
+        self.assertFalse(Answer.objects.filter(user=first).exists())
+        self.assertEqual(Answer.objects.filter(user=second).count(), 3)
+        self.assertEqual(self.progress(), [(0, 0), (3, 18)])
+
+    @mock.patch("src.apps.courses.service.reassign.SYNC_LIMIT", 2)
+    def test_large_scopes_are_queued_after_commit(self):
+        with mock.patch("src.apps.courses.tasks.reassign_answers.delay") as delay:
+            # two answers fit the limit: deleted right away
+            self.assertFalse(reassign(task_id=self.tasks[0].pk))
+            self.assertEqual(Answer.objects.count(), 4)
+
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.assertTrue(reassign(course_id=self.course.pk))
+            delay.assert_not_called()
+            self.assertEqual(Answer.objects.count(), 4)
+
+            for callback in callbacks:
+                callback()
+        delay.assert_called_once_with(course_id=self.course.pk, task_id=None, user_ids=None)
+
+
+class TeacherScopeTests(APITestCase):
+    """A teacher sees the students of their groups, in those groups' course only."""
+
+    def setUp(self):
+        self.teacher = self.user("teacher@example.com", "Teachers")
+        self.colleague = self.user("colleague@example.com", "Teachers")
+        self.course = Course.objects.create(name="Course", description="Description")
+        self.other_course = Course.objects.create(name="Other", description="Description")
+        self.own_group = self.group(self.course, self.teacher)
+        self.colleague_group = self.group(self.course, self.colleague)
+        self.other_course_group = self.group(self.other_course, self.colleague)
+
+        # one student in both courses, another in the colleague's group
+        self.student = self.user("student@example.com", "Students")
+        self.colleague_student = self.user("other-student@example.com", "Students")
+        self.enroll(self.student, self.own_group)
+        self.enroll(self.student, self.other_course_group)
+        self.enroll(self.colleague_student, self.colleague_group)
+
+        task = self.task(self.course)
+        self.visible = self.answer(task, self.student)
+        self.other_course_answer = self.answer(self.task(self.other_course), self.student)
+        self.colleague_answer = self.answer(task, self.colleague_student)
+        self.client.force_authenticate(self.teacher)
+
+    def user(self, email, group_name):
+        user = User.objects.create(email=email)
+        user.groups.add(Group.objects.get_or_create(name=group_name)[0])
+        return user
+
+    def group(self, course, teacher):
+        group = CourseGroup.objects.create(name=f"Group of {teacher.email}", course=course)
+        CourseEnrollment.objects.create(user=teacher, course=course, group=group, role="teacher")
+        return group
+
+    def enroll(self, student, group):
+        CourseEnrollment.objects.create(user=student, course=group.course, group=group)
+
+    def task(self, course):
+        return Task.objects.create(name="Task", course=course, created_by=self.colleague)
+
+    def answer(self, task, student):
+        answer = Answer.objects.create(task=task, user=student)
+        Grade.objects.create(answer=answer, score=5, max_score=10, graded_by=self.colleague)
+        return answer
+
+    def ids(self, url, key=None):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return sorted(item["id"] for item in (data[key] if key else data))
+
+    def test_teacher_students_are_their_groups_in_that_course(self):
+        response = self.client.get("/api/course/enrollments/teacher-students/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["user_id"], row["course_id"]) for row in response.json()],
+            [(self.student.pk, self.course.pk)],
+        )
+
+    def test_answers_of_the_same_student_in_another_course_are_hidden(self):
+        self.assertEqual(self.ids("/api/answers/"), [self.visible.pk])
+        self.assertEqual(self.ids("/api/answers/teacher-review/", "answers"), [self.visible.pk])
+
+    def test_grades_of_the_same_student_in_another_course_are_hidden(self):
+        self.assertEqual(self.ids("/api/grades/"), [self.visible.grade.pk])
+
+    def test_group_filter_is_limited_to_own_groups(self):
+        url = "/api/answers/teacher-review/?group_id={}"
+        self.assertEqual(self.ids(url.format(self.own_group.pk), "answers"), [self.visible.pk])
+        self.assertEqual(self.ids(url.format(self.colleague_group.pk), "answers"), [])
+        self.assertEqual(self.ids(url.format(self.other_course_group.pk), "answers"), [])
+
+    def test_teacher_can_access_answer_denies_outsiders(self):
+        outsider = self.user("outsider@example.com", "Teachers")
+        self.assertTrue(teacher_can_access_answer(self.teacher, self.visible))
+        self.assertFalse(teacher_can_access_answer(self.teacher, self.other_course_answer))
+        self.assertFalse(teacher_can_access_answer(self.teacher, self.colleague_answer))
+        self.assertFalse(teacher_can_access_answer(outsider, self.visible))
+        self.assertTrue(teacher_can_access_answer(self.colleague, self.other_course_answer))
+
+
+class KeysetPaginationTests(APITestCase):
+    ordering = ("is_active", "-created_at", "-id")
+
+    def setUp(self):
+        courses = [
+            Course.objects.create(name=f"Course {i}", description="Description") for i in range(8)
+        ]
+        Course.objects.filter(pk__in=[c.pk for c in courses[::3]]).update(is_active=False)
+        # equal sort keys must be told apart by id
+        Course.objects.filter(pk__in=[c.pk for c in courses[2:6]]).update(
+            created_at=courses[2].created_at
+        )
+        self.expected = list(Course.objects.order_by(*self.ordering).values_list("pk", flat=True))
+
+    def page(self, url):
+        paginator = KeysetPagination(ordering=self.ordering)
+        request = Request(APIRequestFactory().get(url))
+        rows = paginator.paginate_queryset(Course.objects.all(), request)
+        return [row.pk for row in rows], paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_mixed_directions_walk_forward_and_back(self):
+        pages = []
+        url, previous = "/courses/?pagination=cursor&page_size=3", None
+        while url:
+            ids, url, previous = self.page(url)
+            if not pages:
+                self.assertIsNone(previous)
+            pages.append(ids)
+        self.assertEqual([pk for ids in pages for pk in ids], self.expected)
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 2])
+
+        backwards = []
+        while previous:
+            ids, _, previous = self.page(previous)
+            backwards.insert(0, ids)
+        self.assertEqual(backwards, pages[:-1])
+
+    def test_without_the_flag_nothing_is_paginated(self):
+        paginator = KeysetPagination(ordering=self.ordering)
+        request = Request(APIRequestFactory().get("/courses/"))
+        self.assertIsNone(paginator.paginate_queryset(Course.objects.all(), request))
+
+    def test_invalid_cursors_are_rejected(self):
+        paginator = KeysetPagination(ordering=self.ordering)
+        wrong_length = paginator.encode_cursor([True, "2026-01-01T00:00:00"], False)
+        wrong_values = [
+            paginator.encode_cursor(values, False)
+            for values in (
+                ["garbage", "2026-01-01T00:00:00", 1],
+                [True, "not a date", 1],
+                [True, "2026-01-01T00:00:00", "x"],
+                [True, {"not": "a date"}, 1],
+            )
+        ]
+        for cursor in ("garbage", "e30", wrong_length, *wrong_values):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                self.page(f"/courses/?pagination=cursor&cursor={cursor}")
+
+    def test_list_action_opt_in(self):
+        admin = User.objects.create(email="admin@example.com")
+        admin.groups.add(Group.objects.get_or_create(name="Admins")[0])
+        self.client.force_authenticate(admin)
+
+        response = self.client.get("/api/course/courses/light-list/")
+        self.assertIsInstance(response.json(), list)
+
+        response = self.client.get("/api/course/courses/light-list/?pagination=cursor&page_size=5")
+        data = response.json()
+        self.assertEqual(len(data["results"]), 5)
+        self.assertIsNone(data["previous"])
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertIsNone(data["next"])
+
+        response = self.client.get("/api/course/courses/light-list/?pagination=cursor&cursor=x")
+        self.assertEqual(response.status_code, 404)
+        cursor = KeysetPagination().encode_cursor(["garbage", 1], False)
+        response = self.client.get(
+            f"/api/course/courses/light-list/?pagination=cursor&cursor={cursor}"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class CourseListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(email="author@example.com", first_name="Ann")
+        self.student = User.objects.create(email="student@example.com")
+        self.course = Course.objects.create(
+            name="Course", description="Description", author=self.author
+        )
+        self.group = CourseGroup.objects.create(name="Group", course=self.course)
+        self.client.force_authenticate(self.student)
+
+    def my_courses(self):
+        response = self.client.get("/api/course/courses/my-courses/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def write(self, callback):
+        with self.captureOnCommitCallbacks(execute=True):
+            callback()
+
+    def test_repeated_requests_hit_the_cache(self):
+        self.assertEqual(self.my_courses(), [])
+        self.assertEqual(self.my_courses(), [])
+        self.assertEqual(cache_stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_enrollment_and_course_changes_invalidate(self):
+        self.my_courses()
+        self.write(
+            lambda: CourseEnrollment.objects.create(
+                user=self.student, course=self.course, group=self.group
+            )
+        )
+        self.assertEqual([course["name"] for course in self.my_courses()], ["Course"])
+
+        self.course.name = "Renamed course"
+        self.write(self.course.save)
+        self.assertEqual([course["name"] for course in self.my_courses()], ["Renamed course"])
+        self.assertEqual(cache_stats()["hits"], 0)
+
+    def test_author_changes_invalidate(self):
+        self.write(
+            lambda: CourseEnrollment.objects.create(
+                user=self.student, course=self.course, group=self.group
+            )
+        )
+        self.assertEqual(self.my_courses()[0]["author"]["first_name"], "Ann")
+
+        self.author.first_name = "Anna"
+        self.write(self.author.save)
+        self.assertEqual(self.my_courses()[0]["author"]["first_name"], "Anna")
+
+        self.write(lambda: self.author.groups.add(Group.objects.create(name="Teachers")))
+        self.assertEqual(self.my_courses()[0]["author"]["groups"], ["Teachers"])
+        self.assertEqual(cache_stats()["hits"], 0)
+
+        # users who author nothing do not touch the catalog
+        self.my_courses()
+        self.write(lambda: User.objects.create(email="other@example.com").save())
+        self.my_courses()
+        self.assertEqual(cache_stats()["hits"], 2)
+
+
+class StreamingExportTests(TestCase):
+    """The streamed exports keep the columns and values of the serializer based ones."""
+
+    def setUp(self):
+        author = User.objects.create(email="author@example.com", first_name="Ann")
+        category = Category.objects.create(name="Science")
+        for index in range(5):
+            Course.objects.create(
+                name=f"Course {index}",
+                description="Description",
+                author=author,
+                category=category,
+                deadline_to_finish_course=timezone.now() if index % 2 else None,
+            )
+            User.objects.create(email=f"user{index}@example.com", first_name=f"User {index}")
+
+    def expected(self, serializer_class, queryset):
+        """Header and rows of the previous, serializer based export."""
+        data = serializer_class(queryset.order_by("pk"), many=True).data
+        return [list(data[0].keys())] + [list(row.values()) for row in data]
+
+    @contextmanager
+    def iterated_only(self):
+        """Fail if a queryset is materialized; rows may only come from ``iterator()``."""
+        with (
+            mock.patch.object(QuerySet, "_fetch_all", side_effect=AssertionError("materialized")),
+            mock.patch.object(
+                QuerySet, "iterator", autospec=True, side_effect=QuerySet.iterator
+            ) as iterator,
+        ):
+            yield
+        iterator.assert_called_once()
+
+    def csv_rows(self, content):
+        text = content.decode("utf-8")
+        self.assertTrue(text.startswith("\ufeff"))
+        return list(csv.reader(StringIO(text[1:])))
+
+    def xlsx_rows(self, content):
+        workbook = load_workbook(BytesIO(content))
+        return [list(row) for row in workbook.active.iter_rows(values_only=True)]
+
+    @staticmethod
+    def as_csv(rows):
+        return [["" if value is None else str(value) for value in row] for row in rows]
+
+    def test_csv_exports(self):
+        for export, serializer_class, queryset in (
+            (export_users_to_csv, ExportUserSerializer, User.objects.all()),
+            (export_courses_to_csv, CourseExportSerializer, Course.objects.all()),
+        ):
+            with self.subTest(export=export.__name__):
+                expected = self.as_csv(self.expected(serializer_class, queryset))
+                with self.iterated_only():
+                    with CaptureQueriesContext(connection) as context:
+                        response = export(queryset)
+                    # nothing is read before the body is streamed
+                    self.assertEqual(context.captured_queries, [])
+                    self.assertIsInstance(response, StreamingHttpResponse)
+                    content = b"".join(response.streaming_content)
+                self.assertEqual(self.csv_rows(content), expected)
+
+    def test_xlsx_exports(self):
+        for export, serializer_class, queryset in (
+            (export_users_to_xlsx, ExportUserSerializer, User.objects.all()),
+            (export_courses_to_xlsx, CourseExportSerializer, Course.objects.all()),
+        ):
+            with self.subTest(export=export.__name__):
+                expected = self.expected(serializer_class, queryset)
+                with self.iterated_only():
+                    content = b"".join(export(queryset).streaming_content)
+                self.assertEqual(self.xlsx_rows(content), expected)
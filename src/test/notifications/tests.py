@@ -0,0 +1,540 @@
+import json
+import smtplib
+from contextlib import contextmanager
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.admin import site
+from django.core import mail as outbox
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    modify_settings,
+    override_settings,
+)
+from rest_framework.test import APIClient
+
+from src.api.notifications.consumers import NotificationConsumer
+from src.apps.courses.models import Course, CourseEnrollment, CourseGroup
+from src.apps.notifications.models import Notification, OutboundEmail
+from src.apps.notifications.service import broadcast, digest, mail, unread
+from src.apps.notifications.tasks import flush_notification_digest, push_notifications
+from src.apps.users.models import User
+from src.apps.users.service.send_mail_tasks import (
+    send_activation_invite_task,
+    send_otp_verification_task,
+)
+
+IN_MEMORY_COUNTERS = "src.apps.notifications.service.unread.InMemoryUnreadCounterBackend"
+
+
+@contextmanager
+def recording():
+    """
+    SQL run inside the block. ``CaptureQueriesContext`` does not work across
+    test client requests, which reset ``connection.queries``.
+    """
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield statements
+
+
+@modify_settings(MIDDLEWARE={"remove": "silk.middleware.SilkyMiddleware"})
+@override_settings(NOTIFICATION_COUNTER_BACKEND=IN_MEMORY_COUNTERS)
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="student@example.com")
+        self.other = User.objects.create(email="other@example.com")
+        unread.get_backend().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, receiver=None, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(
+                title="Graded",
+                content="Your answer was graded",
+                receiver=receiver or self.user,
+                **kwargs,
+            )
+
+    def badge(self):
+        return self.client.get("/api/notifications/unread-count/").json()["unread_count"]
+
+    def test_counter_follows_creates_reads_and_deletes(self):
+        self.notify()
+        self.assertEqual(self.badge(), 1)
+
+        with recording() as statements:
+            self.assertEqual(self.badge(), 1)
+        self.assertEqual(statements, [])
+
+        second = self.notify()
+        self.notify(is_read=True)
+        self.notify(receiver=self.other)
+        self.assertEqual(self.badge(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.badge(), 1)
+
+    def test_mark_read_runs_one_update(self):
+        first, second, third = self.notify(), self.notify(), self.notify()
+        foreign = self.notify(receiver=self.other)
+        self.assertEqual(self.badge(), 3)
+
+        with recording() as statements, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/notifications/mark-read/",
+                {"ids": [first.pk, second.pk, foreign.pk]},
+                format="json",
+            )
+        self.assertEqual(response.json(), {"updated": 2})
+        self.assertEqual(self.badge(), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith("UPDATE")]), 1)
+        foreign.refresh_from_db()
+        self.assertFalse(foreign.is_read)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/notifications/mark-read/", {}, format="json")
+        self.assertEqual(response.json(), {"updated": 1})
+        self.assertEqual(self.badge(), 0)
+        third.refresh_from_db()
+        self.assertTrue(third.is_read)
+
+    def test_reconcile_repairs_drift(self):
+        self.notify()
+        self.notify(receiver=self.other)
+        self.assertEqual(self.badge(), 1)
+        # writes that bypass the signals
+        Notification.objects.filter(receiver=self.user).update(is_read=True)
+        Notification.objects.create(title="Bulk", content="", receiver=self.other)
+        unread.get_backend().seed(self.other.pk, 1)
+
+        self.assertEqual(unread.reconcile(), 2)
+        self.assertEqual(unread.unread_count(self.user.pk), 0)
+        self.assertEqual(unread.unread_count(self.other.pk), 2)
+
+    def test_inbox_pages_unread_first(self):
+        read = [self.notify(is_read=True) for _ in range(2)]
+        fresh = [self.notify() for _ in range(3)]
+
+        response = self.client.get("/api/notifications/inbox/?pagination=cursor&page_size=2").json()
+        self.assertEqual([item["id"] for item in response["results"]], [fresh[2].pk, fresh[1].pk])
+        response = self.client.get(response["next"]).json()
+        self.assertEqual([item["id"] for item in response["results"]], [fresh[0].pk, read[1].pk])
+        response = self.client.get(response["next"]).json()
+        self.assertEqual([item["id"] for item in response["results"]], [read[0].pk])
+        self.assertIsNone(response["next"])
+
+        response = self.client.get("/api/notifications/inbox/?unread=true").json()
+        self.assertEqual([item["id"] for item in response], [n.pk for n in fresh[::-1]])
+
+    def test_lists_are_plain_without_pagination_flag(self):
+        read = self.notify(is_read=True)
+        fresh = self.notify()
+
+        response = self.client.get("/api/notifications/inbox/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.json()], [fresh.pk, read.pk])
+        response = self.client.get("/api/notifications/")
+        self.assertEqual([item["id"] for item in response.json()], [fresh.pk, read.pk])
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    PRESENCE_BACKEND="src.apps.chat.service.presence.InMemoryPresenceBackend",
+    NOTIFICATION_COUNTER_BACKEND=IN_MEMORY_COUNTERS,
+)
+class BroadcastTests(TransactionTestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(email="teacher@example.com")
+        self.students = [User.objects.create(email=f"student{i}@example.com") for i in range(3)]
+        course = Course.objects.create(name="Course", description="Description")
+        self.group = CourseGroup.objects.create(name="Group", course=course)
+        other_group = CourseGroup.objects.create(name="Other", course=course)
+        CourseEnrollment.objects.create(
+            user=self.teacher, course=course, group=self.group, role="teacher"
+        )
+        for student in self.students[:2]:
+            CourseEnrollment.objects.create(user=student, course=course, group=self.group)
+        CourseEnrollment.objects.create(user=self.students[2], course=course, group=other_group)
+        unread.get_backend().clear()
+        # run the push inline instead of through the broker
+        patcher = mock.patch.object(push_notifications, "delay", push_notifications)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_group_broadcast_reaches_open_sockets(self):
+        receiver = self.students[0]
+        await database_sync_to_async(unread.unread_count)(receiver.pk)
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        communicator.scope["user"] = receiver
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        created = await database_sync_to_async(broadcast.broadcast)(
+            "Exam moved",
+            "The exam is on Friday",
+            sender=self.teacher,
+            event="announcement",
+            group=self.group,
+        )
+        self.assertEqual(created, 2)
+
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame["type"], "announcement")
+        self.assertEqual(frame["data"]["title"], "Exam moved")
+        self.assertEqual(frame["data"]["sender"], self.teacher.pk)
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+        self.assertEqual(await database_sync_to_async(unread.unread_count)(receiver.pk), 1)
+        receivers = await database_sync_to_async(
+            lambda: sorted(Notification.objects.values_list("receiver_id", flat=True))
+        )()
+        self.assertEqual(receivers, [student.pk for student in self.students[:2]])
+
+    def test_only_teachers_of_the_target_may_broadcast(self):
+        client = APIClient()
+        payload = {"title": "Hello", "content": "Hi", "group": self.group.pk}
+
+        client.force_authenticate(self.students[0])
+        self.assertEqual(client.post("/api/notifications/broadcast/", payload).status_code, 403)
+
+        self.teacher.groups.create(name="Teachers")
+        client.force_authenticate(self.teacher)
+        response = client.post("/api/notifications/broadcast/", payload)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {"recipients": 2})
+
+        other = CourseGroup.objects.exclude(pk=self.group.pk).get()
+        response = client.post("/api/notifications/broadcast/", {**payload, "group": other.pk})
+        self.assertEqual(response.status_code, 400)
+        response = client.post(
+            "/api/notifications/broadcast/",
+            {"title": "Hello", "content": "Hi", "user_ids": [self.students[2].pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_event_is_one_of_the_broadcast_events(self):
+        self.teacher.groups.create(name="Teachers")
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        payload = {"title": "Hello", "content": "Hi", "group": self.group.pk}
+
+        # the event becomes the socket frame type
+        for event in ("replay", "error", digest.DIGEST_EVENT):
+            response = client.post("/api/notifications/broadcast/", {**payload, "event": event})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("event", response.json())
+        with self.assertRaises(ValueError):
+            broadcast.broadcast(
+                "Hello", "Hi", sender=self.teacher, event="replay", group=self.group
+            )
+        self.assertFalse(Notification.objects.exists())
+
+        response = client.post(
+            "/api/notifications/broadcast/", {**payload, "event": "announcement"}
+        )
+        self.assertEqual(response.status_code, 202)
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+    fail_after = None
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if self.fail_after is not None and len(outbox.outbox) >= self.fail_after:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+@override_settings(
+    OUTBOUND_EMAIL_BACKEND="src.test.notifications.tests.CountingBackend",
+    OUTBOUND_EMAIL_BATCH_SIZE=4,
+    OUTBOUND_EMAIL_RATE_LIMIT=0,
+)
+class OutboundEmailTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.fail_after = None
+
+    def queue(self, count, subject="Invite", **kwargs):
+        for index in range(count):
+            message = EmailMultiAlternatives(
+                f"{subject} {index}", "text", "noreply@example.com", [f"user{index}@example.com"]
+            )
+            message.attach_alternative(f"<p>{subject} {index}</p>", "text/html")
+            mail.enqueue(message, **kwargs)
+
+    def test_drain_reuses_one_connection_per_batch(self):
+        self.queue(10)
+        self.queue(1, subject="Code", priority=OutboundEmail.Priority.HIGH)
+
+        stats = mail.drain()
+
+        self.assertEqual(stats["sent"], 11)
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(CountingBackend.opened, 3)
+        # the high priority email goes out first
+        self.assertEqual(outbox.outbox[0].subject, "Code 0")
+        invite = outbox.outbox[1]
+        self.assertEqual((invite.subject, invite.to), ("Invite 0", ["user0@example.com"]))
+        self.assertEqual(invite.alternatives[0][0], "<p>Invite 0</p>")
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count(), 11)
+        self.assertEqual(mail.drain()["sent"], 0)
+
+    def test_lost_connection_requeues_the_rest_of_the_batch(self):
+        self.queue(4)
+        CountingBackend.fail_after = 2
+
+        stats = mail.drain()
+
+        self.assertEqual((stats["sent"], stats["retried"]), (2, 2))
+        retried = OutboundEmail.objects.filter(status=OutboundEmail.Status.QUEUED)
+        self.assertEqual(retried.count(), 2)
+        for email in retried:
+            self.assertEqual(email.attempts, 1)
+            self.assertIn("unexpectedly closed", email.last_error)
+        self.assertFalse(mail.has_due())
+
+        retried.update(next_attempt_at=retried[0].created_at)
+        CountingBackend.fail_after = None
+        self.assertEqual(mail.drain()["sent"], 2)
+
+    @override_settings(OUTBOUND_EMAIL_MAX_ATTEMPTS=1)
+    def test_gives_up_after_max_attempts(self):
+        self.queue(1)
+        CountingBackend.fail_after = 0
+
+        mail.drain()
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual((email.body, email.html_body), ("", ""))
+
+    def test_sent_code_emails_do_not_keep_the_code(self):
+        send_otp_verification_task.apply(args=("user@example.com", "User", "482913"))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.priority, OutboundEmail.Priority.HIGH)
+        self.assertIn("482913", email.html_body)
+
+        self.assertEqual(mail.drain()["sent"], 1)
+
+        self.assertIn("482913", outbox.outbox[0].alternatives[0][0])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.SENT)
+        self.assertNotIn("482913", email.body + email.html_body)
+
+    def test_admin_hides_the_bodies(self):
+        email_admin = site._registry[OutboundEmail]
+        fields = email_admin.get_fields(RequestFactory().get("/"))
+        self.assertNotIn("body", fields)
+        self.assertNotIn("html_body", fields)
+
+    def test_mail_tasks_queue_instead_of_sending(self):
+        send_activation_invite_task.apply(args=("new@example.com", "New", "uid", "token"))
+
+        self.assertEqual(outbox.outbox, [])
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, ["new@example.com"])
+        self.assertEqual(email.status, OutboundEmail.Status.QUEUED)
+        self.assertTrue(email.html_body)
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    NOTIFICATION_COUNTER_BACKEND=IN_MEMORY_COUNTERS,
+    NOTIFICATION_DIGEST_WINDOW=60,
+)
+class DigestTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(email="student@example.com", first_name="Ann")
+        cache.delete(digest._key(self.student.pk))
+        self.addCleanup(cache.delete, digest._key(self.student.pk))
+        self.channel_layer = get_channel_layer()
+        self.channel = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(
+            f"user_notifications_{self.student.pk}", self.channel
+        )
+
+    def review(self, answer_id, title, status, grade=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            digest.add(
+                self.student,
+                title,
+                f"Status: {status}",
+                feedback="Well done",
+                data={
+                    "answer_id": answer_id,
+                    "task_number": answer_id,
+                    "task_name": f"Task {answer_id}",
+                    "status": status,
+                    "grade": grade,
+                },
+            )
+
+    def receive(self):
+        return async_to_sync(self.channel_layer.receive)(self.channel)
+
+    @mock.patch("src.apps.submissions.service.send_answer_review_digest")
+    @mock.patch.object(flush_notification_digest, "apply_async")
+    def test_grading_burst_is_delivered_as_one_digest(self, apply_async, send_digest):
+        grade = {"score": 9, "max_score": 10, "percentage": 90.0, "letter": "A"}
+        self.review(1, "Answer 1 reviewed", "approved")
+        self.review(2, "Answer 2 reviewed", "have_flaws")
+        self.review(1, "Answer 1 graded", "approved", grade=grade)
+
+        apply_async.assert_called_once_with(args=[self.student.pk], countdown=60)
+        # the inbox does not wait for the digest
+        self.assertEqual(Notification.objects.filter(receiver=self.student).count(), 3)
+
+        self.assertEqual(digest.flush(self.student.pk), 2)
+
+        message = self.receive()
+        self.assertEqual(message["event"], "answer_review_digest")
+        self.assertEqual(message["data"]["count"], 2)
+        entries = message["data"]["notifications"]
+        self.assertEqual([entry["answer_id"] for entry in entries], [2, 1])
+        self.assertEqual(entries[1]["grade"], grade)
+        send_digest.assert_called_once_with("student@example.com", "Ann", entries)
+        self.assertFalse(Notification.objects.filter(pending_delivery=True).exists())
+        self.assertEqual(digest.flush(self.student.pk), 0)
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    @mock.patch("src.apps.common.utils.notifications.send_answer_status_notification")
+    def test_zero_window_delivers_on_commit(self, send_status):
+        self.review(3, "Answer 3 reviewed", "rejected")
+
+        message = self.receive()
+        self.assertEqual(message["type"], "send_answer_status_notification")
+        self.assertEqual(message["data"]["title"], "Answer 3 reviewed")
+        send_status.assert_called_once_with(
+            receiver_email="student@example.com",
+            first_name="Ann",
+            task_name="Task 3",
+            task_number=3,
+            status="rejected",
+            feedback_text="Well done",
+        )
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    PRESENCE_BACKEND="src.apps.chat.service.presence.InMemoryPresenceBackend",
+    NOTIFICATION_COUNTER_BACKEND=IN_MEMORY_COUNTERS,
+)
+class ReplayTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="student@example.com")
+        self.other = User.objects.create(email="other@example.com")
+
+    def notify(self, title, receiver=None):
+        return Notification.objects.create(title=title, content="", receiver=receiver or self.user)
+
+    async def connect(self, query=""):
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), f"/ws/notifications/?{query}"
+        )
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def replay(self, communicator):
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame["type"], "replay")
+        return frame["data"]
+
+    async def test_resuming_client_gets_only_what_it_missed(self):
+        seen = await database_sync_to_async(self.notify)("Seen")
+        missed = [
+            await database_sync_to_async(self.notify)(f"Missed {index}") for index in range(3)
+        ]
+        await database_sync_to_async(self.notify)("Someone else's", receiver=self.other)
+
+        # the client only remembers the last notification it saw, which is
+        # replayed as well since it may have changed after the client saw it
+        communicator = await self.connect(f"last_id={seen.pk}")
+        with mock.patch.object(NotificationConsumer, "replay_limit", 2):
+            data = await self.replay(communicator)
+            self.assertEqual(
+                [item["id"] for item in data["notifications"]], [seen.pk, missed[0].pk]
+            )
+            self.assertTrue(data["has_more"])
+
+            await communicator.send_json_to({"type": "resume", "cursor": data["cursor"]})
+            data = await self.replay(communicator)
+        self.assertEqual(
+            [item["id"] for item in data["notifications"]], [missed[1].pk, missed[2].pk]
+        )
+        self.assertFalse(data["has_more"])
+        cursor = data["cursor"]
+        await communicator.disconnect()
+
+        # offline again: a new notification and an update to an old one
+        fresh = await database_sync_to_async(self.notify)("Fresh")
+        seen.content = "Edited"
+        await database_sync_to_async(seen.save)()
+
+        communicator = await self.connect(f"cursor={cursor}")
+        data = await self.replay(communicator)
+        self.assertEqual([item["id"] for item in data["notifications"]], [fresh.pk, seen.pk])
+        self.assertEqual(data["notifications"][1]["content"], "Edited")
+
+        # caught up: an empty replay keeps the cursor
+        await communicator.send_json_to({"type": "resume", "cursor": data["cursor"]})
+        caught_up = await self.replay(communicator)
+        self.assertEqual(caught_up, {**data, "notifications": [], "has_more": False})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_last_id_resume_survives_an_edit_of_the_seen_notification(self):
+        seen = await database_sync_to_async(self.notify)("Seen")
+        missed = await database_sync_to_async(self.notify)("Missed")
+        # edited after the client went offline, so its updated_at is past "Missed"
+        seen.content = "Edited"
+        await database_sync_to_async(seen.save)()
+
+        communicator = await self.connect(f"last_id={seen.pk}")
+        data = await self.replay(communicator)
+        self.assertEqual([item["id"] for item in data["notifications"]], [missed.pk, seen.pk])
+        self.assertEqual(data["notifications"][1]["content"], "Edited")
+        self.assertFalse(data["has_more"])
+        await communicator.disconnect()
+
+    async def test_last_id_of_a_deleted_notification(self):
+        gone = await database_sync_to_async(self.notify)("Gone")
+        gone_id = gone.pk
+        fresh = await database_sync_to_async(self.notify)("Fresh")
+        await database_sync_to_async(gone.delete)()
+
+        communicator = await self.connect(f"last_id={gone_id}")
+        data = await self.replay(communicator)
+        self.assertEqual([item["id"] for item in data["notifications"]], [fresh.pk])
+        await communicator.disconnect()
+
+    async def test_invalid_cursor_is_reported(self):
+        communicator = await self.connect("cursor=garbage")
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame, {"type": "error", "message": "Invalid cursor"})
+        await communicator.disconnect()